@@ -0,0 +1,16 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Benchmarks of the freehand tool.
+
+Not distributed (like the demo app.)  Run from the project directory, for example:
+>python -m benchmark.benchTrace --output trace.json
+>python -m benchmark.benchTrace --baseline trace.json
+
+A run saves results as JSON.  Given a baseline (results of an earlier run)
+a run compares, and exits with status 1 on a regression (see results.py.)
+'''
@@ -0,0 +1,138 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Benchmark of editing: dragging ControlPoints of long SegmentStrings.
+
+>python -m benchmark.benchDrag [--output file] [--baseline file]
+
+The drag path: SegmentString.moveRelated() -> SegmentActions -> RelationWalker.walk()
+-> ControlPoint.updateCoordinate() -> SegmentString.updateSegment().
+Requires Qt (headless when QT_QPA_PLATFORM=offscreen, set by default here.)
+
+For SegmentStrings of SIZES segments (every CUSP_INTERVAL'th a cusp), measures:
+- getControlPointSetMs: milliseconds of SegmentString.getControlPointSet()
+- per drag of a ControlPoint by role (anchor, direction, cusp: an anchor at a cusp) and mode (alternate or not):
+  msPerMove (median), maxMsPerMove, peakBytesPerMove (allocated during a move, under tracemalloc).
+And maxSegmentsAt60fps: the greatest size at which every drag's median move is within a frame at 60 fps.
+
+A drag is a sequence of moves, each a call of moveRelated(), as a GUI calls per pointer event.
+A move that raises is a defect: the benchmark fails.
+'''
+
+import os
+import sys
+import time
+import tracemalloc
+
+from freehandTool.type.freehandPoint import FreehandPoint
+
+from . import results
+
+
+'''
+Parameters: sizes (count of segments) of SegmentStrings; every CUSP_INTERVAL'th segment is a cusp.
+'''
+SIZES = (100, 1000, 10000, 100000)
+CUSP_INTERVAL = 10
+
+'''
+Parameter: count of moves per drag, fewer for larger SegmentStrings (at most SEGMENT_MOVES / size.)
+'''
+MOVES = 10
+SEGMENT_MOVES = 100000
+
+DRAGS = (('anchor', False), ('anchor', True), ('direction', False), ('direction', True), ('cusp', False), ('cusp', True))
+
+DELTA = FreehandPoint(1, 1)
+
+FRAME_MS = 1000.0 / 60
+
+
+
+def buildSegmentString(SegmentString, size):
+  ''' SegmentString of size segments: a wave of curves, every CUSP_INTERVAL'th a cusp. '''
+  segmentString = SegmentString()
+  controlPoints = []
+  for ordinal in range(size):
+    x = 3.0 * ordinal
+    y = 4.0 if ordinal % 2 else -4.0
+    controlPoints.append(((x, 0.0), (x + 1, y), (x + 2, y), (x + 3, 0.0)))
+  segmentString.appendControlPoints(controlPoints, [ordinal % CUSP_INTERVAL == CUSP_INTERVAL // 2
+                                                    for ordinal in range(size)])
+  return segmentString
+
+
+def findControlPoint(segmentString, controlPoints, role):
+  '''
+  A ControlPoint playing role, searched from the middle of the string, by the role tests of SegmentActions.
+  '''
+  actions = segmentString.actions
+  count = len(controlPoints) // 4
+  # Not the last segment: its end anchor is not tied
+  for ordinal in list(range(count // 2, count - 1)) + list(range(0, count // 2)):
+    if role == 'direction':
+      return controlPoints[4 * ordinal + 1]
+    anchor = controlPoints[4 * ordinal + 3]
+    if actions.isRoleAnchorAtCusp(anchor) == (role == 'cusp'):
+      return anchor
+  return None
+
+
+def measureDrag(segmentString, role, alternateMode, moves):
+  controlPoint = findControlPoint(segmentString, segmentString.getControlPointSet(), role)
+  assert controlPoint is not None, 'No ControlPoint plays role ' + role
+  times = []
+  for _ in range(moves):
+    start = time.perf_counter()
+    segmentString.moveRelated(controlPoint, DELTA, alternateMode)
+    times.append(1000.0 * (time.perf_counter() - start))
+
+  tracemalloc.start()
+  try:
+    segmentString.moveRelated(controlPoint, DELTA, alternateMode)
+    peak = tracemalloc.get_traced_memory()[1]
+  finally:
+    tracemalloc.stop()
+
+  times.sort()
+  return {'msPerMove': times[len(times) // 2], 'maxMsPerMove': times[-1], 'peakBytesPerMove': peak}
+
+
+def benchmark(options):
+  ''' Dragging ControlPoints of SegmentStrings of increasing length. '''
+  os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+  try:
+    from PyQt5.QtWidgets import QApplication
+  except ImportError:
+    from PySide.QtGui import QApplication
+  from freehandTool.segmentString.segmentString import SegmentString
+  application = QApplication.instance() or QApplication(sys.argv[:1])
+
+  sizes = SIZES[:2] if options.quick else SIZES
+  cases = {}
+  maxSegmentsAt60fps = 0
+  isWithinFrame = True  # At all sizes so far
+  for size in sizes:
+    segmentString = buildSegmentString(SegmentString, size)
+    start = time.perf_counter()
+    segmentString.getControlPointSet()
+    case = {'getControlPointSetMs': 1000.0 * (time.perf_counter() - start)}
+    moves = max(1, min(3 if options.quick else MOVES, SEGMENT_MOVES // size))
+    for role, alternateMode in DRAGS:
+      measures = measureDrag(segmentString, role, alternateMode, moves)
+      case[role + (' alternate' if alternateMode else '')] = measures
+      isWithinFrame = isWithinFrame and measures['msPerMove'] <= FRAME_MS
+    if isWithinFrame:
+      maxSegmentsAt60fps = size
+    cases['%d segments' % size] = case
+  cases['summary'] = {'maxSegmentsAt60fps': maxSegmentsAt60fps}
+  return {'benchmark': 'drag' + (' (quick)' if options.quick else ''), 'cases': cases}
+
+
+
+if __name__ == '__main__':
+  sys.exit(results.main(benchmark))
@@ -0,0 +1,91 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Benchmark of tracing under load: quality and throughput as an overloaded OS loses events.
+
+>python -m benchmark.benchLoad [--output file] [--baseline file]
+
+A circle drawn by a pen (RATE samples per second, jitter) is synthesized (see freehandTool.core.synthesis),
+then delivered to an app busy HANDLING milliseconds per event (synthesis.coalesce()), and traced by a Tracer (no Qt.)
+
+Measures per load (a case):
+- events delivered, segments, cusps
+- pointsPerSecond: events traced per second, best of REPEAT runs
+- maxDeviation, meanDeviation: pixels from the circle, of the anchors and midpoints of traced segments
+Plot them against the load to see where tracing degrades.
+'''
+
+import math
+import sys
+import time
+
+from freehandTool.core import synthesis
+from freehandTool.core.tracer import Tracer
+from freehandTool.core.segmentSink import SegmentSink
+
+from . import results
+
+
+'''
+Parameters: the stroke: a circle of RADIUS, TURNS in DURATION milliseconds, by a pen at RATE with JITTER pixels.
+'''
+RADIUS = 200
+TURNS = 3
+DURATION = 4000
+RATE = 500
+JITTER = 0.5
+
+'''
+Parameter: loads, milliseconds the app is busy per event.
+'''
+HANDLING = (0, 2, 4, 8, 16, 32, 64)
+
+REPEAT = 5
+
+
+
+def deviations(segments, radius):
+  ''' Pixels from the circle (centered at origin) of the end anchor and midpoint of each segment. '''
+  result = []
+  for segment in segments:
+    points = [(point.x(), point.y()) for point in segment.asPointsScene()]
+    midpoint = [(points[0][axis] + 3 * points[1][axis] + 3 * points[2][axis] + points[3][axis]) / 8.0 for axis in (0, 1)]
+    for x, y in (points[3], midpoint):
+      result.append(abs(math.hypot(x, y) - radius))
+  return result
+
+
+def measure(stroke, repeat):
+  ''' Dictionary of measures of tracing stroke. '''
+  best = None
+  for _ in range(repeat):
+    tracer = Tracer()
+    sink = SegmentSink()
+    tracer.setSegmentString(sink)
+    start = time.perf_counter()
+    stroke.feed(tracer)
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+  errors = deviations(sink.segments, RADIUS)
+  return {'events': len(stroke), 'segments': sink.countSegments(), 'cusps': sum(sink.segmentCuspness()),
+          'pointsPerSecond': len(stroke) / best,
+          'maxDeviation': max(errors), 'meanDeviation': sum(errors) / len(errors)}
+
+
+def benchmark(options):
+  ''' Tracing a synthesized stroke with events lost to increasing load. '''
+  stroke = synthesis.synthesize(synthesis.circle(radius=RADIUS, turns=TURNS), DURATION, rate=RATE, jitter=JITTER, seed=1)
+  repeat = 1 if options.quick else REPEAT
+  cases = {}
+  for handling in HANDLING:
+    cases['busy %02d ms' % handling] = measure(synthesis.coalesce(stroke, handling), repeat)
+  return {'benchmark': 'load' + (' (quick)' if options.quick else ''), 'cases': cases}
+
+
+
+if __name__ == '__main__':
+  sys.exit(results.main(benchmark))
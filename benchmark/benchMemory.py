@@ -0,0 +1,128 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Benchmark of memory: bytes per traced segment, and per ControlPoint, by structure.
+
+>python -m benchmark.benchMemory [--output file] [--baseline file]
+
+Draws strokes of increasing length (a zigzag, many segments per position, see corpus.py)
+with a FreehandTool (see benchTrace.QtDriver), then gets the ControlPointSet of the SegmentString.
+
+Measures per stroke:
+- segments, controlPoints
+- pythonBytesPerSegment: Python memory retained (tracemalloc) by drawing, and pythonBytesPerControlPoint: by getControlPointSet()
+  and getting every ControlPoint (a ControlPointSet instantiates them as got)
+- peakBytesPerSegment: peak Python memory (tracemalloc) while drawing
+- bytesPerSegment: by structure (sys.getsizeof of the structure's Python objects):
+  coordinates (array of control points, the source of truth),
+  path (QPainterPath elements, for painting, estimated: C++, not seen by tracemalloc), cuspness (Cuspness dict),
+  controlPoints (ControlPoint instances, their dicts and coordinates), segments (Segment instances),
+  relations (Relations exceptions: the standard relations are implicit)
+- ghostElements: greatest count of elements of the ghost's path while drawing, and ghostBytes, estimated as for path
+
+A measure per segment that grows with the length of the stroke is super-linear: see growth,
+the ratio of bytes per segment (by structure) of the longest to the shortest stroke.
+'''
+
+import sys
+import time
+import tracemalloc
+
+from . import corpus
+from . import results
+from .benchTrace import QtDriver
+
+
+'''
+Parameter: lengths (count of positions) of strokes.
+'''
+LENGTHS = (1000, 10000, 100000)
+
+'''
+Parameter: estimated bytes of a QPainterPath element (x, y double, type int, padded.)
+'''
+PATH_ELEMENT_BYTES = 24
+
+
+
+class GhostMeter(object):
+  ''' Instrument (see module freehandTool.instrument): greatest count of elements of the driver's ghost's path. '''
+
+  def __init__(self, driver):
+    self.driver = driver
+    self.clock = time.perf_counter
+    self.maxElements = 0
+
+  def beginStroke(self):
+    self.maxElements = 0
+
+  def record(self, stage, input, output, elapsed):
+    if stage == 'ghost':
+      self.maxElements = max(self.maxElements, self.driver.ghost.path.elementCount())
+
+
+
+def sizeOfInstances(instances):
+  ''' Bytes of instances and their attribute dicts. '''
+  return sum(sys.getsizeof(instance) + sys.getsizeof(instance.__dict__) for instance in instances)
+
+
+def measureStroke(driver, stroke):
+  events = driver.prepare(stroke)
+  ghostMeter = GhostMeter(driver)
+
+  tracemalloc.start()
+  try:
+    start = tracemalloc.get_traced_memory()[0]
+    segmentString = driver.trace(events, stroke.timestamps, ghostMeter)
+    drawn, peak = tracemalloc.get_traced_memory()
+    controlPoints = segmentString.getControlPointSet()
+    for controlPoint in controlPoints:
+      pass
+    edited = tracemalloc.get_traced_memory()[0]
+  finally:
+    tracemalloc.stop()
+
+  segments = segmentString.countSegments()
+  segmentInstances = list(dict((id(controlPoint.parentSegment), controlPoint.parentSegment)
+                               for controlPoint in controlPoints).values())
+  relations = segmentString.relations.exceptions
+  structures = {
+    'coordinates': sys.getsizeof(segmentString.coordinates),
+    'path': segmentString.myPath().elementCount() * PATH_ELEMENT_BYTES,
+    'cuspness': sys.getsizeof(segmentString.cuspness.cuspness),
+    'controlPoints': sizeOfInstances(controlPoints)
+                     + sum(sys.getsizeof(controlPoint.coordinate) for controlPoint in controlPoints),
+    'segments': sizeOfInstances(segmentInstances)
+                + sum(sys.getsizeof(segment.controlPoints) for segment in segmentInstances),
+    'relations': sys.getsizeof(relations) + sum(sys.getsizeof(key) for key in relations),
+  }
+  return {'segments': segments, 'controlPoints': len(controlPoints),
+          'pythonBytesPerSegment': (drawn - start) / float(segments),
+          'peakBytesPerSegment': (peak - start) / float(segments),
+          'pythonBytesPerControlPoint': (edited - drawn) / float(len(controlPoints)),
+          'bytesPerSegment': dict((name, size / float(segments)) for name, size in structures.items()),
+          'ghostElements': ghostMeter.maxElements,
+          'ghostBytes': ghostMeter.maxElements * PATH_ELEMENT_BYTES}
+
+
+def benchmark(options):
+  ''' Memory per segment and per ControlPoint, by structure, of strokes of increasing length. '''
+  driver = QtDriver()
+  lengths = LENGTHS[:2] if options.quick else LENGTHS
+  cases = {}
+  for length in lengths:
+    cases['%d positions' % length] = measureStroke(driver, corpus.zigzag(length))
+  shortest, longest = cases['%d positions' % lengths[0]], cases['%d positions' % lengths[-1]]
+  cases['growth'] = dict((name, longest['bytesPerSegment'][name] / shortest['bytesPerSegment'][name])
+                         for name in shortest['bytesPerSegment'] if shortest['bytesPerSegment'][name])
+  return {'benchmark': 'memory' + (' (quick)' if options.quick else ''), 'cases': cases}
+
+
+
+if __name__ == '__main__':
+  sys.exit(results.main(benchmark))
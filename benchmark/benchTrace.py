@@ -0,0 +1,191 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Benchmark of tracing: the full pipe, fed event by event, over the fixed corpus (see corpus.py.)
+
+>python -m benchmark.benchTrace [--driver core|qt] [--output file] [--baseline file]
+
+Drivers:
+- core: a core.tracer.Tracer (no Qt) writing to a SegmentSink
+- qt: a FreehandTool in a QGraphicsView, writing to a SegmentString and ghost in a scene.
+  Headless when QT_QPA_PLATFORM=offscreen (set by default here.)
+A pause (a gap between timestamps longer than PAUSE_TIMEOUT) is fed as the timer would:
+pointerPause() (core), or handleTimeout() by the timer on a ReplayClock (qt, see FreehandTool.replayStroke().)
+
+Measures per stroke (a case):
+- events, segments, cusps
+- pointsPerSecond: best of REPEAT runs, not instrumented
+- usPerEvent: microseconds per event by stage, from a run instrumented by instrument.StageProfile,
+  and 'total', from the best run (not instrumented, so less than the sum of stages)
+- peakMemoryBytes: peak memory allocated while tracing, from a run under tracemalloc
+'''
+
+import os
+import sys
+import time
+import tracemalloc
+
+from freehandTool.core.tracer import Tracer
+from freehandTool.core.segmentSink import SegmentSink
+from freehandTool.instrument import StageProfile
+from freehandTool.type.pointerPoint import PointerPoint
+
+from . import corpus
+from . import results
+
+
+'''
+Parameter: count of runs of each stroke, the best is reported.
+'''
+REPEAT = 5
+
+
+
+class CoreDriver(object):
+  ''' Feed a Tracer, no Qt. '''
+
+  name = 'core'
+
+  def __init__(self):
+    self.tracer = Tracer()
+
+
+  def prepare(self, stroke):
+    ''' Events of stroke, as the tracer's client would have them (not timed.) '''
+    return [PointerPoint(x, y) for x, y in stroke.positions]
+
+
+  def trace(self, events, timestamps, instrument=None):
+    ''' Trace events, pausing where timestamps have gaps.  Returns the segment string. '''
+    tracer = self.tracer
+    tracer.setInstrument(instrument)
+    pauses = pausesOf(timestamps, tracer.PAUSE_TIMEOUT)
+    sink = SegmentSink()
+    tracer.setSegmentString(sink)
+    tracer.pointerPress(events[0])
+    for ordinal in range(1, len(events)):
+      tracer.pointerMove(events[ordinal])
+      if ordinal in pauses:
+        tracer.pointerPause()
+    tracer.pointerRelease()
+    return sink
+
+
+
+class QtDriver(object):
+  ''' Feed a FreehandTool in a view, as the demo app does. '''
+
+  name = 'qt'
+
+  def __init__(self):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    try:
+      from PyQt5.QtCore import QPoint, QRectF
+      from PyQt5.QtWidgets import QApplication, QGraphicsScene, QGraphicsView
+    except ImportError:
+      from PySide.QtCore import QPoint, QRectF
+      from PySide.QtGui import QApplication, QGraphicsScene, QGraphicsView
+    from freehandTool.freehand import FreehandTool
+    from freehandTool.core.replayClock import ReplayClock
+    from freehandTool.freehandHead import PointerTrackGhost
+    from freehandTool.pointerEvent import PointerEvent
+    from freehandTool.segmentString.segmentString import SegmentString
+    self.QPoint, self.PointerEvent = QPoint, PointerEvent
+    self.PointerTrackGhost, self.SegmentString = PointerTrackGhost, SegmentString
+    self.ReplayClock = ReplayClock
+
+    self.application = QApplication.instance() or QApplication(sys.argv[:1])
+    self.scene = QGraphicsScene()
+    self.view = QGraphicsView(self.scene)
+    self.view.setGeometry(0, 0, 1000, 1000)
+    self.view.setSceneRect(QRectF(-1000, -1000, 2000, 2000))
+    self.tool = FreehandTool(view=self.view)
+
+
+  def prepare(self, stroke):
+    events = []
+    for x, y in stroke.positions:
+      viewPoint = self.QPoint(x, y)
+      event = self.PointerEvent()
+      event.makeFromPoints(self.view.mapToScene(viewPoint), viewPoint)
+      events.append(event)
+    return events
+
+
+  def trace(self, events, timestamps, instrument=None):
+    tool = self.tool
+    tool.setInstrument(instrument)
+    segmentString = self.SegmentString()
+    ghost = self.PointerTrackGhost()
+    self.ghost = ghost  # Of current or last stroke, e.g. to measure
+    self.scene.addItem(segmentString)
+    self.scene.addItem(ghost)
+    segmentString.setPos(events[0].scenePos)
+    tool.setSegmentString(segmentString=segmentString, pathHeadGhost=ghost, scenePosition=events[0].scenePos)
+    # A new clock per stroke: timestamps of each stroke start again
+    tool.setClock(self.ReplayClock(timestamps[0]))
+    tool.replayStroke(events, timestamps)
+    self.scene.removeItem(segmentString)
+    self.scene.removeItem(ghost)
+    return segmentString
+
+
+
+def pausesOf(timestamps, pauseTimeout):
+  ''' Set of ordinals of positions followed by a pause, as in Tracer.trace(). '''
+  return set(ordinal for ordinal in range(1, len(timestamps) - 1)
+             if timestamps[ordinal + 1] - timestamps[ordinal] > pauseTimeout)
+
+
+def measure(driver, stroke, repeat):
+  ''' Dictionary of measures of tracing stroke. '''
+  events = driver.prepare(stroke)
+
+  best = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    segments = driver.trace(events, stroke.timestamps).countSegments()
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+
+  profile = StageProfile()
+  driver.trace(events, stroke.timestamps, profile)
+  statistics = profile.statistics()
+  usPerEvent = dict((stage, 1000.0 * stats['time'] / len(events)) for stage, stats in statistics['stages'].items())
+  usPerEvent['total'] = 1000000.0 * best / len(events)
+
+  tracemalloc.start()
+  try:
+    driver.trace(events, stroke.timestamps)
+    peak = tracemalloc.get_traced_memory()[1]
+  finally:
+    tracemalloc.stop()
+
+  return {'events': len(events), 'segments': segments, 'cusps': statistics['cusps'],
+          'pointsPerSecond': len(events) / best, 'usPerEvent': usPerEvent, 'peakMemoryBytes': peak}
+
+
+def benchmark(options):
+  ''' Tracing the fixed corpus of strokes. '''
+  driver = QtDriver() if options.driver == 'qt' else CoreDriver()
+  repeat = 1 if options.quick else REPEAT
+  cases = {}
+  for stroke in corpus.corpus():
+    if options.quick:
+      stroke = corpus.Stroke(stroke.name, stroke.positions[:200], stroke.timestamps[:200])
+    cases[stroke.name] = measure(driver, stroke, repeat)
+  name = 'trace (driver %s%s)' % (driver.name, ', quick' if options.quick else '')
+  return {'benchmark': name, 'driver': driver.name, 'cases': cases}
+
+
+def addOptions(parser):
+  parser.add_argument('--driver', choices=('core', 'qt'), default='core', help='feed a Tracer (core) or a FreehandTool (qt)')
+
+
+
+if __name__ == '__main__':
+  sys.exit(results.main(benchmark, addOptions=addOptions))
@@ -0,0 +1,101 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Fixed corpus of synthetic strokes.
+
+Fixed: same strokes every run (seeded), so results of runs compare.
+A stroke is positions (int (x, y), device CS) and timestamps (milliseconds), as from a pointer device.
+Sampled at SAMPLE_INTERVAL, except where a stroke pauses or loses events.
+'''
+
+from collections import namedtuple
+import math
+import random
+
+
+Stroke = namedtuple('Stroke', 'name positions timestamps')
+
+'''
+Parameter: milliseconds between positions (a mouse at about 120 Hz.)
+'''
+SAMPLE_INTERVAL = 8
+
+'''
+Parameter: count of positions of most strokes.
+'''
+LENGTH = 2000
+
+
+
+def _timed(name, positions, interval=SAMPLE_INTERVAL):
+  return Stroke(name, positions, [ordinal * interval for ordinal in range(len(positions))])
+
+
+def circle(length=LENGTH, radius=200):
+  ''' Several turns of a circle, a few pixels per position. '''
+  return _timed('circle', [(int(round(radius * math.cos(ordinal / 40.0))), int(round(radius * math.sin(ordinal / 40.0))))
+                           for ordinal in range(length)])
+
+
+def spiral(length=LENGTH):
+  ''' Outward spiral: curvature decreasing. '''
+  positions = []
+  for ordinal in range(length):
+    radius = 10 + ordinal / 8.0
+    angle = ordinal / (radius / 3.0)
+    positions.append((int(round(radius * math.cos(angle))), int(round(radius * math.sin(angle)))))
+  return _timed('spiral', positions)
+
+
+def zigzag(length=LENGTH, amplitude=40, period=24):
+  ''' Straight runs and sharp corners (cusps.) '''
+  positions = []
+  for ordinal in range(length):
+    phase = ordinal % period
+    y = phase if phase < period // 2 else period - phase
+    positions.append((ordinal, y * 2 * amplitude // period))
+  return _timed('zigzag', positions)
+
+
+def jitteredDiagonal(length=LENGTH, seed=1):
+  ''' A diagonal with a shaky hand: one pixel of jitter. '''
+  rnd = random.Random(seed)
+  return _timed('jitteredDiagonal', [(ordinal + rnd.randint(-1, 1), ordinal + rnd.randint(-1, 1))
+                                     for ordinal in range(length)])
+
+
+def axisReversals(length=LENGTH, seed=2):
+  ''' Back and forth along an axis, slowly drifting: many reversals for ReverseDetector. '''
+  rnd = random.Random(seed)
+  x, y = 0, 0
+  positions = []
+  for _ in range(length):
+    x += rnd.choice((-3, -1, 1, 2, 3))
+    y += rnd.choice((0, 0, 0, 0, 1))
+    positions.append((x, y))
+  return _timed('axisReversals', positions)
+
+
+def pauses(length=LENGTH, every=100, pause=400):
+  ''' A circle, pausing (longer than PAUSE_TIMEOUT) every so many positions: flushes the pipe. '''
+  stroke = circle(length)
+  timestamps = [time + (ordinal // every) * pause for ordinal, time in enumerate(stroke.timestamps)]
+  return Stroke('pauses', stroke.positions, timestamps)
+
+
+def sparse(length=LENGTH, keep=0.25, seed=3):
+  ''' A fast circle, most events lost (as when the OS coalesces events of a busy app): large gaps. '''
+  rnd = random.Random(seed)
+  stroke = circle(length * 4, radius=400)
+  kept = [0] + [ordinal for ordinal in range(1, len(stroke.positions)) if rnd.random() < keep]
+  return Stroke('sparse', [stroke.positions[ordinal] for ordinal in kept],
+                [stroke.timestamps[ordinal] for ordinal in kept])
+
+
+def corpus():
+  ''' List of Strokes, the fixed corpus. '''
+  return [circle(), spiral(), zigzag(), jitteredDiagonal(), axisReversals(), pauses(), sparse()]
@@ -0,0 +1,133 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Results of a benchmark: save, load, compare with a baseline.
+
+Results are a dictionary (JSON): 'benchmark', 'environment', and 'cases', a dictionary of case name to measures.
+A measure is a number.  Its name tells which way is worse:
+- names in HIGHER_IS_BETTER (e.g. pointsPerSecond): a regression is a decrease
+- names in EXACT (e.g. segments): a regression is any change (the output changed, not the speed)
+- other names (times, bytes): a regression is an increase
+Nested dictionaries of measures (e.g. usPerEvent by stage) compare likewise.
+'''
+
+import json
+import platform
+import sys
+
+
+'''
+Parameter: relative change that is a regression (timing is noisy.)
+'''
+TOLERANCE = 0.25
+
+HIGHER_IS_BETTER = ('pointsPerSecond', 'maxSegmentsAt60fps')
+EXACT = ('segments', 'cusps', 'events')
+
+
+
+def environment():
+  return {'python': platform.python_version(), 'platform': platform.platform(), 'machine': platform.machine()}
+
+
+def save(results, filename):
+  with open(filename, 'w') as file:
+    json.dump(results, file, indent=2, sort_keys=True)
+
+
+def load(filename):
+  with open(filename) as file:
+    return json.load(file)
+
+
+def compare(baseline, current, tolerance=TOLERANCE):
+  '''
+  List of regressions (strings) of current from baseline.
+  Only cases and measures in both are compared, and only results of the same benchmark (and options.)
+  '''
+  if baseline['benchmark'] != current['benchmark']:
+    return ['baseline is another benchmark: %s' % baseline['benchmark']]
+  regressions = []
+  for case, measures in sorted(current['cases'].items()):
+    if case in baseline['cases']:
+      _compareMeasures(case, baseline['cases'][case], measures, tolerance, regressions)
+  return regressions
+
+
+def _compareMeasures(prefix, baseline, current, tolerance, regressions):
+  for name, value in sorted(current.items()):
+    if name not in baseline:
+      continue
+    old = baseline[name]
+    label = prefix + '.' + name
+    if isinstance(value, dict):
+      _compareMeasures(label, old, value, tolerance, regressions)
+    elif not isinstance(value, (int, float)) or isinstance(value, bool):
+      continue
+    elif name in EXACT:
+      if value != old:
+        regressions.append('%s changed: %s -> %s' % (label, old, value))
+    elif name in HIGHER_IS_BETTER:
+      if value < old * (1 - tolerance):
+        regressions.append('%s decreased: %.4g -> %.4g' % (label, old, value))
+    elif value > old * (1 + tolerance) and value - old > _noise(name):
+      regressions.append('%s increased: %.4g -> %.4g' % (label, old, value))
+  return regressions
+
+
+def _noise(name):
+  ''' Absolute change not a regression, however large relative to a tiny measure (microseconds, bytes.) '''
+  return 1024 if name.lower().endswith('bytes') or name.lower().endswith('memory') else 0.5
+
+
+def report(results, regressions=None, stream=None):
+  ''' Print results (and regressions) as a table. '''
+  stream = stream or sys.stdout
+  print(results['benchmark'], file=stream)
+  for case, measures in sorted(results['cases'].items()):
+    print('  %s' % case, file=stream)
+    for name, value in sorted(measures.items()):
+      print('    %s: %s' % (name, _format(value)), file=stream)
+  if regressions is not None:
+    print('%d regressions' % len(regressions), file=stream)
+    for regression in regressions:
+      print('  ' + regression, file=stream)
+
+
+def _format(value):
+  if isinstance(value, dict):
+    return ', '.join('%s %s' % (name, _format(item)) for name, item in sorted(value.items()))
+  if isinstance(value, float):
+    return '%.4g' % value
+  return str(value)
+
+
+def main(benchmark, arguments=None, addOptions=None):
+  '''
+  Command line of a benchmark: run benchmark(options) (returns results), report, save, compare.
+  addOptions: optional, callable adding options of the benchmark to an argparse parser.
+  Returns exit status: 1 if regressions.
+  '''
+  import argparse
+  parser = argparse.ArgumentParser(description=benchmark.__doc__)
+  parser.add_argument('--output', help='save results as JSON')
+  parser.add_argument('--baseline', help='JSON results of an earlier run, to compare')
+  parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='relative change that is a regression')
+  parser.add_argument('--quick', action='store_true', help='fewer repetitions and shorter strokes, e.g. to check it runs')
+  if addOptions is not None:
+    addOptions(parser)
+  options = parser.parse_args(arguments)
+
+  results = benchmark(options)
+  results['environment'] = environment()
+  regressions = None
+  if options.baseline:
+    regressions = compare(load(options.baseline), results, options.tolerance)
+  report(results, regressions)
+  if options.output:
+    save(results, options.output)
+  return 1 if regressions else 0
@@ -0,0 +1,30 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+from .tracer import Tracer
+from ..type.freehandPoint import FreehandPoint
+
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+class AffineTracer(Tracer):
+  '''
+  Tracer that maps from device CS to Scene CS by an affine transform (m11, m12, m21, m22, dx, dy) (as Qt QTransform.)
+
+  As does FreehandTool by its view (see FreehandTool.viewTransform()), but without Qt:
+  for replay of recordings, and for tracing on a thread other than the GUI thread.
+  '''
+
+  def __init__(self, transform=IDENTITY):
+    super(AffineTracer, self).__init__()
+    self.transform = transform
+
+  def mapFromDeviceToScene(self, pointVCS):
+    # Same float operations as arrayCurves.mapFromDeviceToScene()
+    m11, m12, m21, m22, dx, dy = self.transform
+    x, y = pointVCS.x(), pointVCS.y()
+    return FreehandPoint(m11 * x + m21 * y + dx, m12 * x + m22 * y + dy)
@@ -0,0 +1,184 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Curve fitting over an array of PathLines (batch), using numpy.
+
+Same segments as CurveGenerator, fed the same PathLines one at a time
+(with mapFromDeviceToScene identity as in core.tracer.Tracer, or the affine map of a transform.)
+Requires numpy.
+
+CurveGenerator fits each new PathLine with the PathLine in its history (the previous PathLine,
+or a null PathLine at the end of the previous PathLine if that was forced.)
+So every triple of points (history.p1, history.p2, newPathLine.p2) is known from the array of PathLines,
+and the math of segmentsFromLineMidToMid() (midpoints, alpha, cusp decision, control points)
+is done for all triples at once, in the same order of float operations (so same results, to the bit.)
+
+Each PathLine yields a few segments, in slots:
+- slot 0: the curve, or first line of a cusp (from the last point generated to the cusp)
+- slot 1: second line of a cusp (from the cusp to the midpoint)
+- slot 2: a forced PathLine's line to its end (or the only line when history is null)
+Slots not used, or whose segment is null (CurveGenerator's FreehandNullSegmentError) are dropped.
+
+Differs from CurveGenerator only where CurveGenerator raises:
+- a cusp before any segment was generated: the last point generated is taken to be the start
+- a null segment other than in a cusp: dropped
+'''
+
+import numpy
+
+from ..generator.curveGenerator import CurveGeneratorMixin
+
+
+# Count of slots per PathLine, see above
+SLOTS = 3
+
+
+def _fuzzyEqual(a, b):
+  ''' Vectorized freehandPoint.fuzzyEqual() (Qt's qFuzzyCompare.) '''
+  isEitherZero = (a == 0.0) | (b == 0.0)
+  difference = numpy.abs(a - b)
+  return numpy.where(isEitherZero, difference <= 0.000000000001,
+                     difference * 1000000000000.0 <= numpy.minimum(numpy.abs(a), numpy.abs(b)))
+
+
+def _arePointsEqual(ax, ay, bx, by):
+  return _fuzzyEqual(ax, bx) & _fuzzyEqual(ay, by)
+
+
+def mapFromDeviceToScene(transform, x, y):
+  '''
+  Map coordinates (arrays or floats) by an affine transform (m11, m12, m21, m22, dx, dy), as does Qt QTransform.
+  None is identity.
+  '''
+  if transform is None:
+    return x, y
+  m11, m12, m21, m22, dx, dy = transform
+  return m11 * x + m21 * y + dx, m12 * x + m22 * y + dy
+
+
+def _interval(ax, ay, bx, by, fraction):
+  ''' Vectorized FreehandPoint.interval(): point fractionally along line from a to b. '''
+  return ax + fraction * (bx - ax), ay + fraction * (by - ay)
+
+
+def _lineControlPoints(ax, ay, bx, by):
+  ''' Control points of LineSegments from a to b, shape (n, 4, 2): both direction points at the midpoint. '''
+  midX, midY = _interval(ax, ay, bx, by, 1/2.0)
+  return numpy.stack((numpy.stack((ax, ay), axis=-1),
+                      numpy.stack((midX, midY), axis=-1),
+                      numpy.stack((midX, midY), axis=-1),
+                      numpy.stack((bx, by), axis=-1)), axis=1)
+
+
+def _alpha(x1, y1, x2, y2, x3, y3):
+  ''' Vectorized alpha of segmentsFromLineMidToMid(), using ddenom() and areaOfParallelogram(). '''
+  # ddenom(point1, point3)
+  rX = -numpy.sign(y3 - y1)
+  rY = numpy.sign(x3 - x1)
+  denom = rY * (x3 - x1) - rX * (y3 - y1)
+  # areaOfParallelogram(point1, point2, point3)
+  area = (x2 - x1) * (y3 - y1) - (x3 - x1) * (y2 - y1)
+  isDenomZero = denom == 0.0
+  with numpy.errstate(divide='ignore', invalid='ignore'):
+    dd = numpy.abs(area / numpy.where(isDenomZero, 1.0, denom))
+    alpha = numpy.where(dd > 1, (1 - 1.0 / dd) / 0.75, 0.0)
+  return numpy.where(isDenomZero, 4/3.0, alpha)
+
+
+def segmentsFromLines(startPosition, lines, isLineForced, alphamax=CurveGeneratorMixin.ALPHAMAX, transform=None):
+  '''
+  Segments, as CurveGenerator would put them (in Scene CS, as reals.)
+
+  startPosition: (x, y) of pointerPress (CurveGenerator's initial null PathLine is there.)
+  lines, isLineForced: see arrayLines.linesFromTurns()
+  alphamax: see CurveGeneratorMixin.ALPHAMAX
+  transform: map from device CS to Scene CS, see mapFromDeviceToScene(), None is identity
+
+  Returns (controlPoints, cuspness):
+  - controlPoints: float64 array shape (s, 4, 2), the four control points of each segment
+  - cuspness: bool array length s
+  '''
+  lines = numpy.asarray(lines, dtype=numpy.float64).reshape(-1, 4)
+  isLineForced = numpy.asarray(isLineForced, dtype=bool)
+  count = len(lines)
+  startX, startY = float(startPosition[0]), float(startPosition[1])
+
+  # History (of CurveGenerator) for each PathLine: previous PathLine, or null PathLine at its end if forced
+  historyX1 = numpy.empty(count)
+  historyY1 = numpy.empty(count)
+  historyX2 = numpy.empty(count)
+  historyY2 = numpy.empty(count)
+  historyX1[0] = historyX2[0] = startX
+  historyY1[0] = historyY2[0] = startY
+  historyX2[1:] = lines[:-1, 2]
+  historyY2[1:] = lines[:-1, 3]
+  wasForced = isLineForced[:-1]
+  historyX1[1:] = numpy.where(wasForced, lines[:-1, 2], lines[:-1, 0])
+  historyY1[1:] = numpy.where(wasForced, lines[:-1, 3], lines[:-1, 1])
+  isHistoryNull = (historyX1 == historyX2) & (historyY1 == historyY2)
+  isLineNull = (lines[:, 0] == lines[:, 2]) & (lines[:, 1] == lines[:, 3])
+
+  # Real math from here on, in Scene CS
+  startX, startY = mapFromDeviceToScene(transform, startX, startY)
+  historyX1, historyY1 = mapFromDeviceToScene(transform, historyX1, historyY1)
+  historyX2, historyY2 = mapFromDeviceToScene(transform, historyX2, historyY2)
+  lineX2, lineY2 = mapFromDeviceToScene(transform, lines[:, 2], lines[:, 3])
+
+  # Three points of segmentsFromLineMidToMid(history, line)
+  x1, y1, x2, y2 = historyX1, historyY1, historyX2, historyY2
+  x3, y3 = lineX2, lineY2
+  midX1, midY1 = _interval(x2, y2, x1, y1, 1/2.0)
+  midX2, midY2 = _interval(x3, y3, x2, y2, 1/2.0)
+  alpha = _alpha(x1, y1, x2, y2, x3, y3)
+  isCusp = alpha > alphamax
+  fraction = 0.5 + 0.5 * numpy.clip(alpha, 0.55, 1)
+  controlX1, controlY1 = _interval(x1, y1, x2, y2, fraction)
+  controlX2, controlY2 = _interval(x3, y3, x2, y2, fraction)
+
+  # Which PathLines are fit mid to mid (unforced, or forced with history not null: segmentsFromLineMidToEnd())
+  isMidToMid = ~isLineForced | ~isHistoryNull
+  # Which PathLines put (CurveGenerator._putSegments()), and the end point they put
+  isPut = isMidToMid | ~isLineNull
+  endX = numpy.where(isLineForced, x3, midX2)
+  endY = numpy.where(isLineForced, y3, midY2)
+  # Last point generated before each PathLine (the start, before any)
+  putOrdinals = numpy.maximum.accumulate(numpy.where(isPut, numpy.arange(count), -1))
+  lastOrdinals = numpy.empty(count, dtype=numpy.int64)
+  lastOrdinals[0] = -1
+  lastOrdinals[1:] = putOrdinals[:-1]
+  hasLast = lastOrdinals >= 0
+  lastX = numpy.where(hasLast, endX[lastOrdinals], startX)
+  lastY = numpy.where(hasLast, endY[lastOrdinals], startY)
+
+  controlPoints = numpy.empty((count, SLOTS, 4, 2))
+  isSlotUsed = numpy.zeros((count, SLOTS), dtype=bool)
+  isSlotCusp = numpy.zeros((count, SLOTS), dtype=bool)
+
+  # Slot 0: curve, or first line of cusp (segmentsForCusp(), a cusp unless the second is null)
+  isCurve = isMidToMid & ~isCusp
+  isCuspFit = isMidToMid & isCusp
+  controlPoints[:, 0] = _lineControlPoints(lastX, lastY, x2, y2)
+  controlPoints[isCurve, 0] = numpy.stack((numpy.stack((midX1, midY1), axis=-1),
+                                           numpy.stack((controlX1, controlY1), axis=-1),
+                                           numpy.stack((controlX2, controlY2), axis=-1),
+                                           numpy.stack((midX2, midY2), axis=-1)), axis=1)[isCurve]
+  isFirstNull = _arePointsEqual(lastX, lastY, x2, y2)
+  isSecondNull = _arePointsEqual(x2, y2, midX2, midY2)
+  isSlotUsed[:, 0] = (isCurve & ~_arePointsEqual(midX1, midY1, midX2, midY2)) | (isCuspFit & ~isFirstNull)
+  isSlotCusp[:, 0] = isCuspFit & ~isSecondNull
+  # Slot 1: second line of cusp
+  controlPoints[:, 1] = _lineControlPoints(x2, y2, midX2, midY2)
+  isSlotUsed[:, 1] = isCuspFit & ~isSecondNull
+  # Slot 2: forced: line from midpoint (or from end of null history) to end of PathLine, a cusp
+  fromX = numpy.where(isHistoryNull, x2, midX2)
+  fromY = numpy.where(isHistoryNull, y2, midY2)
+  controlPoints[:, 2] = _lineControlPoints(fromX, fromY, x3, y3)
+  isSlotUsed[:, 2] = isLineForced & isPut & ~_arePointsEqual(fromX, fromY, x3, y3)
+  isSlotCusp[:, 2] = True
+
+  isSlotUsed = isSlotUsed.reshape(-1)
+  return controlPoints.reshape(-1, 4, 2)[isSlotUsed], isSlotCusp.reshape(-1)[isSlotUsed]
@@ -0,0 +1,89 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Line fitting over an array of turns (batch), using numpy for input and output.
+
+Same PathLines as LineGenerator (with Constraints), fed the same turns one at a time.
+Requires numpy.
+
+The constraint sweep is inherently sequential (each line starts where the previous line ended.)
+It is one tight loop on ints, per turn (not per position), without PointerPoint, History, or Constraints objects.
+'''
+
+import numpy
+
+
+def linesFromTurns(startPosition, turns, isForced):
+  '''
+  PathLines, as LineGenerator would send them to CurveGenerator (including those sent when flushed.)
+
+  startPosition: (x, y) of pointerPress
+  turns, isForced: see arrayTurns.turnsFromPositions()
+
+  Returns (lines, isLineForced):
+  - lines: int64 array shape (k, 4) of (x1, y1, x2, y2), a null line has p1 == p2
+  - isLineForced: bool array length k
+  '''
+  startX, startY = int(startPosition[0]), int(startPosition[1])
+  # History of turns
+  endX, endY = startX, startY
+  # Constraints
+  leftX = leftY = rightX = rightY = 0
+
+  lines = []
+  appendLine = lines.append
+  forcedLineOrdinals = []
+  turns = numpy.asarray(turns).reshape(-1, 2)
+  turnXs = turns[:, 0].tolist()
+  turnYs = turns[:, 1].tolist()
+  # Spans of unforced turns, each ended by a forced turn (or the end of turns)
+  forcedTurnOrdinals = numpy.flatnonzero(isForced).tolist()
+  spanStart = 0
+  for spanEnd in forcedTurnOrdinals + [len(turnXs)]:
+    for turnX, turnY in zip(turnXs[spanStart:spanEnd], turnYs[spanStart:spanEnd]):
+      # _lineFromPath
+      vX = turnX - startX
+      vY = turnY - startY
+      if leftX * vY - leftY * vX < 0 or rightX * vY - rightY * vX > 0:
+        # Violated: line to last satisfying turn, reset constraints, roll
+        appendLine((startX, startY, endX, endY))
+        leftX = leftY = rightX = rightY = 0
+        startX = endX
+        startY = endY
+      else:
+        # Constraints.update()
+        offsetX = vX + (1 if vY >= 0 and (vY > 0 or vX < 0) else -1)
+        offsetY = vY + (1 if vX <= 0 and (vX < 0 or vY < 0) else -1)
+        if leftX * offsetY - leftY * offsetX >= 0:
+          leftX = offsetX
+          leftY = offsetY
+        offsetX = vX + (1 if vY <= 0 and (vY < 0 or vX < 0) else -1)
+        offsetY = vY + (1 if vX >= 0 and (vX > 0 or vY < 0) else -1)
+        if rightX * offsetY - rightY * offsetX <= 0:
+          rightX = offsetX
+          rightY = offsetY
+      endX = turnX
+      endY = turnY
+
+    if spanEnd < len(turnXs):
+      # _forcedLineFromPath: line to the forced turn (null if it reverses to start), reset constraints, collapse
+      turnX = turnXs[spanEnd]
+      turnY = turnYs[spanEnd]
+      forcedLineOrdinals.append(len(lines))
+      lines.append((startX, startY, turnX, turnY))
+      leftX = leftY = rightX = rightY = 0
+      startX = endX = turnX
+      startY = endY = turnY
+      spanStart = spanEnd + 1
+
+  # _flushedLine: line from start to end, else null line at end
+  forcedLineOrdinals.append(len(lines))
+  lines.append((startX, startY, endX, endY))
+
+  isLineForced = numpy.zeros(len(lines), dtype=bool)
+  isLineForced[forcedLineOrdinals] = True
+  return numpy.array(lines, dtype=numpy.int64).reshape(-1, 4), isLineForced
@@ -0,0 +1,48 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Batch tracing of recorded PointerPaths over numpy arrays.
+
+Same segments as batch.trace() (the generators), but computed stage by stage over whole arrays:
+arrayTurns, arrayLines, arrayCurves.
+Results are packed arrays instead of Segment instances.
+Requires numpy.
+
+For re-tracing (e.g. re-smoothing with another alphamax) stored drawings.
+'''
+
+from ..generator.curveGenerator import CurveGeneratorMixin
+from .tracer import Tracer
+from .arrayTurns import turnsFromPositions, pausesFromTimestamps, positionArray
+from .arrayLines import linesFromTurns
+from .arrayCurves import segmentsFromLines
+
+
+
+def trace(positions, timestamps=None, alphamax=CurveGeneratorMixin.ALPHAMAX, pauseTimeout=Tracer.PAUSE_TIMEOUT,
+          pauses=None, transform=None):
+  '''
+  Trace a complete recorded PointerPath.
+
+  positions: int array shape (n, 2) (or sequence of (x, y) int pairs), the first is where the pointer was pressed.
+  timestamps: None, or array of milliseconds, one per position.  Pauses flush the pipe, see Tracer.trace().
+  alphamax: degree of smoothing, see CurveGeneratorMixin.
+  pauses: None, or bool array, one per position, True where the pointer paused (instead of pauses from timestamps.)
+  transform: map from device CS to Scene CS, see arrayCurves.mapFromDeviceToScene(), None is identity.
+
+  Returns (controlPoints, cuspness): see arrayCurves.segmentsFromLines().
+  '''
+  positions = positionArray(positions)
+  assert len(positions) > 0
+  if pauses is not None:
+    assert len(pauses) == len(positions)
+  elif timestamps is not None:
+    assert len(timestamps) == len(positions)
+    pauses = pausesFromTimestamps(timestamps, pauseTimeout)
+  turns, isTurnForced, _ = turnsFromPositions(positions, pauses)
+  lines, isLineForced = linesFromTurns(positions[0], turns, isTurnForced)
+  return segmentsFromLines(positions[0], lines, isLineForced, alphamax, transform)
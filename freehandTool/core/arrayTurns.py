@@ -0,0 +1,227 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Turn detection over an array of positions (batch), using numpy.
+
+Same turns as TurnGenerator with ReverseDetector, fed the same positions (and pauses) one at a time.
+Requires numpy (unlike the rest of package core.)
+
+Diagonal turns
+==============
+ReverseDetector knows an axis through its startPosition (the last turn.)
+Until the axis orientation is known (while positions equal startPosition)
+a position is a turn if it differs from startPosition in both x and y.
+Once known, a position is a turn if it leaves the axis (differs in y for horizontal, x for vertical.)
+Either way, the next turn after the turn at index k is at:
+  max(first index after k where x differs from x[k], first index after k where y differs from y[k])
+Those are computed for all indexes at once from run lengths of x and y (array diffs.)
+Only following the chain of turns is a Python loop, one iteration per turn (not per position.)
+
+Reversal turns
+==============
+A reversal does not change the axis, only its startPosition along the axis.
+So reversals don't change the diagonal turns, and are detected separately in each run between diagonal turns.
+A run whose values along its axis are monotonic (no sign change in its diffs)
+or that spans fewer than three pixels has no reversal.
+Only the few remaining runs are scanned, by the same logic as ReverseDetector, but on ints.
+'''
+
+import itertools
+
+import numpy
+
+
+def positionArray(positions):
+  '''
+  positions (an array, or a sequence of (x, y) int pairs) as an int64 array shape (n, 2).
+  '''
+  if isinstance(positions, numpy.ndarray):
+    return positions.astype(numpy.int64, copy=False).reshape(-1, 2)
+  return numpy.fromiter(itertools.chain.from_iterable(positions), dtype=numpy.int64,
+                        count=2 * len(positions)).reshape(-1, 2)
+
+
+def pausesFromTimestamps(timestamps, pauseTimeout):
+  '''
+  Bool array, True at index of a position after which the pointer paused (see Tracer.trace().)
+  No pause after the first (pointerPress) nor last position.
+  '''
+  timestamps = numpy.asarray(timestamps, dtype=numpy.float64)
+  result = numpy.zeros(len(timestamps), dtype=bool)
+  if len(timestamps) > 2:
+    result[1:-1] = numpy.diff(timestamps)[1:] > pauseTimeout
+  return result
+
+
+def _nextChange(values):
+  '''
+  For each index i, the first index j > i where values[j] != values[i], else len(values).
+  '''
+  isChange = numpy.zeros(len(values), dtype=numpy.int64)
+  isChange[1:] = values[1:] != values[:-1]
+  # Each run of same values ends where the next run starts
+  runEnds = numpy.append(numpy.flatnonzero(isChange), len(values))
+  return runEnds[numpy.cumsum(isChange)]
+
+
+def _diagonalTurnOrdinals(nextChangeX, nextChangeY):
+  ''' Indexes of positions that are diagonal turns, in order. '''
+  nextTurn = numpy.maximum(nextChangeX, nextChangeY).tolist()
+  count = len(nextTurn)
+  result = []
+  ordinal = nextTurn[0] if count > 0 else 0
+  while ordinal < count:
+    result.append(ordinal)
+    ordinal = nextTurn[ordinal]
+  return result
+
+
+def _candidateRuns(xs, ys, isHorizontal, runStarts, runEnds):
+  '''
+  Indexes (into runStarts) of runs that might have a reversal.
+
+  A run starts at a diagonal turn (or the first position) and ends before the next diagonal turn.
+  Within a run, only x (horizontal axis) or only y (vertical axis) changes.
+
+  The first reversal in a run is at a value two inside the limit (running max or min in the run)
+  that was most recently extended.
+  This finds runs having such a value: a superset of runs having a reversal.
+  '''
+  runOfOrdinal = numpy.repeat(numpy.arange(len(runStarts)), runEnds - runStarts)
+  values = numpy.where(isHorizontal[runOfOrdinal], xs, ys)
+  # Running max and min restricted to each run: offset each run beyond the values of prior runs
+  runOffset = runOfOrdinal * (int(values.max()) - int(values.min()) + 1)
+  runningMax = numpy.maximum.accumulate(values + runOffset) - runOffset
+  runningMin = -numpy.maximum.accumulate(runOffset - values) + runOffset
+  # Ordinal where each limit was last extended (or run start)
+  ordinals = numpy.arange(len(values))
+  runStartOfOrdinal = runStarts[runOfOrdinal]
+  isExtended = numpy.zeros(len(values), dtype=bool)
+  isExtended[1:] = runningMax[1:] > runningMax[:-1]
+  lastMaxOrdinal = numpy.maximum.accumulate(numpy.where(isExtended, ordinals, runStartOfOrdinal))
+  isExtended[1:] = runningMin[1:] < runningMin[:-1]
+  lastMinOrdinal = numpy.maximum.accumulate(numpy.where(isExtended, ordinals, runStartOfOrdinal))
+  isCandidate = ((runningMax - values >= 2) & (lastMaxOrdinal > lastMinOrdinal)) \
+                | ((values - runningMin >= 2) & (lastMinOrdinal > lastMaxOrdinal))
+  return numpy.unique(runOfOrdinal[isCandidate])
+
+
+def _reversalsInRun(values):
+  '''
+  Reversals in one run: list of (ordinal in run where detected, ordinal in run of extreme position (the turn.))
+
+  values[0] is at the startPosition (a turn), values along the axis of the run.
+  Same logic as ReverseDetector.detectReversal(), on ints.
+  '''
+  result = []
+  start = values[0]
+  count = len(values)
+  # Orientation is determined by first position not at startPosition
+  ordinal = 1
+  while ordinal < count and values[ordinal] == start:
+    ordinal += 1
+  if ordinal >= count:
+    return result
+  # _setInitialLimits
+  lowerLimit, upperLimit = (start, values[ordinal]) if start < values[ordinal] else (values[ordinal], start)
+  extreme = ordinal
+  isGrowingLower = None
+  for ordinal in range(ordinal + 1, count):
+    value = values[ordinal]
+    # _expandLimits
+    if value < lowerLimit:
+      lowerLimit = value
+      isGrowingLower = True
+      extreme = ordinal
+    elif value > upperLimit:
+      upperLimit = value
+      isGrowingLower = False
+      extreme = ordinal
+    # _isReverse
+    if isGrowingLower is not None and upperLimit - lowerLimit + 1 > 2:
+      if isGrowingLower:
+        isReversal = value > lowerLimit + 1
+      else:
+        isReversal = value < upperLimit - 1
+      if isReversal:
+        result.append((ordinal, extreme))
+        # _resetAfterReversal
+        extremeValue = values[extreme]
+        isGrowingLower = not isGrowingLower
+        lowerLimit, upperLimit = (extremeValue, value) if extremeValue < value else (value, extremeValue)
+        extreme = ordinal
+  return result
+
+
+def turnsFromPositions(positions, pauses=None):
+  '''
+  Turns, as TurnGenerator would send them to LineGenerator.
+
+  positions: int array shape (n, 2) or sequence of (x, y), positions[0] is the pointerPress.
+  pauses: None or bool array length n, see pausesFromTimestamps().
+
+  Returns (turns, isForced, ordinals):
+  - turns: int64 array shape (m, 2)
+  - isForced: bool array length m (forced by a pause, or by the final flush)
+  - ordinals: int array length m, index of the position at which the turn was sent
+  '''
+  positions = positionArray(positions)
+  count = len(positions)
+  xs = positions[:, 0]
+  ys = positions[:, 1]
+
+  # For each turn: ordinal where sent, and ordinal of its position (differs for a reversal)
+  nextChangeX = _nextChange(xs)
+  nextChangeY = _nextChange(ys)
+  diagonalOrdinals = numpy.array(_diagonalTurnOrdinals(nextChangeX, nextChangeY), dtype=numpy.int64)
+  turnOrdinals = [diagonalOrdinals]
+  turnPositionOrdinals = [diagonalOrdinals]
+
+  runStarts = numpy.concatenate(([0], diagonalOrdinals)).astype(numpy.int64)
+  runEnds = numpy.append(runStarts[1:], count)
+  # Horizontal if y does not change before the run ends
+  isHorizontal = nextChangeY[runStarts] >= runEnds
+  candidates = _candidateRuns(xs, ys, isHorizontal, runStarts, runEnds)
+  reversalOrdinals = []
+  reversalPositionOrdinals = []
+  if len(candidates) > 0:
+    # Slicing lists is faster than slicing arrays (then converting to lists)
+    axisValues = (xs.tolist(), ys.tolist())
+  for runStart, runEnd, isRunHorizontal in zip(runStarts[candidates].tolist(), runEnds[candidates].tolist(),
+                                              isHorizontal[candidates].tolist()):
+    values = axisValues[0] if isRunHorizontal else axisValues[1]
+    for ordinal, extreme in _reversalsInRun(values[runStart:runEnd]):
+      reversalOrdinals.append(runStart + ordinal)
+      reversalPositionOrdinals.append(runStart + extreme)
+  turnOrdinals.append(numpy.array(reversalOrdinals, dtype=numpy.int64))
+  turnPositionOrdinals.append(numpy.array(reversalPositionOrdinals, dtype=numpy.int64))
+
+  if pauses is not None:
+    pauseOrdinals = numpy.flatnonzero(numpy.asarray(pauses, dtype=bool))
+  else:
+    pauseOrdinals = numpy.zeros(0, dtype=numpy.int64)
+  turnOrdinals.append(pauseOrdinals)
+  turnPositionOrdinals.append(pauseOrdinals)
+
+  ordinals = numpy.concatenate(turnOrdinals)
+  positionOrdinals = numpy.concatenate(turnPositionOrdinals)
+  isForced = numpy.concatenate((numpy.zeros(len(diagonalOrdinals) + len(reversalOrdinals), dtype=bool),
+                                numpy.ones(len(pauseOrdinals), dtype=bool)))
+  # At the same ordinal, the turn precedes the forced turn of a pause
+  order = numpy.lexsort((isForced, ordinals))
+  ordinals = ordinals[order]
+  positionOrdinals = positionOrdinals[order]
+  isForced = isForced[order]
+
+  # Final flush (flushTurnGenerator): last position, unless TurnGenerator history is collapsed on it
+  lastSentOrdinal = int(ordinals[-1]) if len(ordinals) > 0 else 0
+  if count > 0 and (xs[lastSentOrdinal] != xs[-1] or ys[lastSentOrdinal] != ys[-1]):
+    ordinals = numpy.append(ordinals, count - 1)
+    positionOrdinals = numpy.append(positionOrdinals, count - 1)
+    isForced = numpy.append(isForced, True)
+
+  return positions[positionOrdinals], isForced, ordinals
@@ -0,0 +1,35 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Batch tracing of recorded PointerPaths, without a GUI toolkit.
+
+Same segments as FreehandTool would generate, if fed the same positions with the same timing
+(and a view whose map from View CS to Scene CS is identity.)
+'''
+
+from ..generator.curveGenerator import CurveGeneratorMixin
+from .tracer import Tracer
+from .segmentSink import SegmentSink
+
+
+
+def trace(points, timestamps=None, alphamax=CurveGeneratorMixin.ALPHAMAX):
+  '''
+  Trace a complete recorded PointerPath.
+  
+  points: sequence of (x, y) int pairs (or PointerPoint), the first is where the pointer was pressed.
+  timestamps: None, or sequence of milliseconds, one per point. Pauses flush the pipe, see Tracer.trace().
+  alphamax: degree of smoothing, see CurveGeneratorMixin.
+  
+  Returns (segments, cuspness): list of Segment (in Scene CS, here same as device CS) and list of Bool.
+  '''
+  tracer = Tracer()
+  tracer.ALPHAMAX = alphamax
+  sink = SegmentSink()
+  tracer.setSegmentString(sink)
+  tracer.trace(points, timestamps)
+  return sink.segments, sink.segmentCuspness()
@@ -0,0 +1,142 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Governor of the quality/speed tradeoff of incremental tracing, adapting to measured latency and gaps.
+
+See freehand.py, on the tradeoff of incrementality, and on ALPHAMAX:
+when the pointer moves fast (or the tool falls behind and the GUI toolkit condenses pointer events)
+the PointerPath has gaps, long PathLines, and CurveGenerator fits cusps (a polygon) rather than splines.
+"A simple fix MIGHT be to dynamically adjust ALPHAMAX to a value near 4/3 when the pointer is moving very fast."
+
+The governor observes, per pointer event:
+- latency: milliseconds the tool spent on the event
+- gap: pixels (greatest of dx, dy, in device CS) from the previous position
+and chooses, within bounds:
+- alphamax: from the average gap, from ALPHAMAX_BOUNDS[0] (no gaps) to ALPHAMAX_BOUNDS[1] (large gaps)
+- ghostInterval: update the ghost every ghostInterval events, more when latency is over target
+- pauseTimeout: longer when latency is over target (so late events are not mistaken for a pause, which forces a cusp)
+
+Averages are exponential.  Latency choices are revised every ADJUST_INTERVAL events, by steps, so they don't oscillate.
+'''
+
+from .replayClock import milliseconds
+
+
+
+class QualityGovernor(object):
+  '''
+  Algebra of the API (called by FreehandTool, see FreehandTool.setGovernor()):
+  governor := create (beginStroke (observe isGhostDue?)*)*
+  Choices: alphamax, ghostInterval, pauseTimeout.  Telemetry: telemetry(), decisions.
+  '''
+
+  '''
+  Parameter: target milliseconds of latency per pointer event.
+  '''
+  TARGET_LATENCY = 4.0
+
+  '''
+  Parameters: bounds (least, greatest) of choices.
+  '''
+  ALPHAMAX_BOUNDS = (1.2, 4/3.0)
+  GHOST_INTERVAL_BOUNDS = (1, 8)
+  PAUSE_TIMEOUT_BOUNDS = (300, 600)
+
+  '''
+  Parameters: gaps (pixels) at which alphamax is least and greatest (interpolated between.)
+  '''
+  GAP_BOUNDS = (2.0, 8.0)
+
+  '''
+  Parameters: weight of a new observation in averages; count of events between revisions of latency choices;
+  step of pauseTimeout (milliseconds.)
+  '''
+  SMOOTHING = 0.1
+  ADJUST_INTERVAL = 16
+  PAUSE_TIMEOUT_STEP = 50
+
+  def __init__(self, clock=milliseconds):
+    self.clock = clock
+    self.alphamax = self.ALPHAMAX_BOUNDS[0]
+    self.ghostInterval = self.GHOST_INTERVAL_BOUNDS[0]
+    self.pauseTimeout = self.PAUSE_TIMEOUT_BOUNDS[0]
+    self.latency = 0.0
+    self.gap = 0.0
+    self._lastPosition = None
+    self._ghostCountdown = 0
+    self.resetTelemetry()
+
+
+  def beginStroke(self, position):
+    ''' A stroke starts at position (PointerPoint.)  Choices carry over from previous strokes. '''
+    self._lastPosition = position
+    self._ghostCountdown = 0
+
+
+  def observe(self, latency, position):
+    ''' The tool spent latency (milliseconds) on an event at position (PointerPoint.)  Revise choices. '''
+    gap = max(abs(position.x() - self._lastPosition.x()), abs(position.y() - self._lastPosition.y()))
+    self._lastPosition = position
+    self.latency += self.SMOOTHING * (latency - self.latency)
+    self.gap += self.SMOOTHING * (gap - self.gap)
+    self.events += 1
+    if latency > self.maxLatency:
+      self.maxLatency = latency
+    if latency > self.TARGET_LATENCY:
+      self.eventsOverTarget += 1
+
+    # alphamax: interpolated between bounds by gap
+    low, high = self.GAP_BOUNDS
+    fraction = min(1.0, max(0.0, (self.gap - low) / (high - low)))
+    alphamax = self.ALPHAMAX_BOUNDS[0] + fraction * (self.ALPHAMAX_BOUNDS[1] - self.ALPHAMAX_BOUNDS[0])
+    # Rounded, so small changes in gap don't make a decision
+    isChanged = round(alphamax, 2) != round(self.alphamax, 2)
+    self.alphamax = alphamax
+
+    if self.events % self.ADJUST_INTERVAL == 0:
+      isChanged = self._adjustForLatency() or isChanged
+    if isChanged:
+      self.decisions.append((self.events, self.alphamax, self.ghostInterval, self.pauseTimeout))
+
+
+  def _adjustForLatency(self):
+    ''' Step latency choices toward target.  Returns whether changed. '''
+    ghostInterval, pauseTimeout = self.ghostInterval, self.pauseTimeout
+    if self.latency > self.TARGET_LATENCY:
+      self.ghostInterval = min(self.GHOST_INTERVAL_BOUNDS[1], self.ghostInterval * 2)
+      self.pauseTimeout = min(self.PAUSE_TIMEOUT_BOUNDS[1], self.pauseTimeout + self.PAUSE_TIMEOUT_STEP)
+    elif self.latency < self.TARGET_LATENCY / 2:
+      self.ghostInterval = max(self.GHOST_INTERVAL_BOUNDS[0], self.ghostInterval // 2)
+      self.pauseTimeout = max(self.PAUSE_TIMEOUT_BOUNDS[0], self.pauseTimeout - self.PAUSE_TIMEOUT_STEP)
+    return (ghostInterval, pauseTimeout) != (self.ghostInterval, self.pauseTimeout)
+
+
+  def isGhostDue(self):
+    ''' Whether to update the ghost for this event: every ghostInterval events. '''
+    if self._ghostCountdown <= 0:
+      self._ghostCountdown = self.ghostInterval
+    self._ghostCountdown -= 1
+    return self._ghostCountdown == 0
+
+
+  def resetTelemetry(self):
+    self.events = 0
+    self.eventsOverTarget = 0
+    self.maxLatency = 0.0
+    # (event ordinal, alphamax, ghostInterval, pauseTimeout) each time a choice changed
+    self.decisions = []
+
+
+  def telemetry(self):
+    '''
+    Dictionary: current choices, averages (latency milliseconds, gap pixels),
+    and since creation or resetTelemetry(): count of events, of events over target, greatest latency, count of decisions.
+    '''
+    return {'alphamax': self.alphamax, 'ghostInterval': self.ghostInterval, 'pauseTimeout': self.pauseTimeout,
+            'latency': self.latency, 'gap': self.gap, 'targetLatency': self.TARGET_LATENCY,
+            'events': self.events, 'eventsOverTarget': self.eventsOverTarget, 'maxLatency': self.maxLatency,
+            'decisions': len(self.decisions)}
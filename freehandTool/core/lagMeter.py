@@ -0,0 +1,135 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Meter of the lag of the pipe: from the end of the traced path (lastEndPointGenerated) to the pointer.
+
+See freehand.py: the pipe lags the pointer (a turn, a PathLine, and the midpoint of the next PathLine are needed to fit a segment.)
+The ghost head hides the lag.  This measures it, in device CS:
+- pixels: length of the pointer track from the traced end to the last position
+- pending: count of positions fed but not yet traced
+- milliseconds: since the oldest pending position was fed
+
+A position is traced when a segment ends at or beyond it:
+the traced end is the midpoint of the last PathLine fitted (or its end, when forced by a pause.)
+Here the pending positions are those after the position nearest the traced end.
+
+Large lag means the tracer is effectively batching (few, late segments);
+then a pause (which flushes the pipe) would be worth forcing, see isLagging().
+'''
+
+from collections import deque
+import math
+
+from .replayClock import milliseconds
+
+
+
+class LagMeter(object):
+  '''
+  Algebra of the API (called by a Tracer, see Tracer.setLagMeter()):
+  meter := create (beginStroke (observeInput | observeTraced)* endStroke)*
+  Live: lag(), isLagging().  Per stroke (current or last ended): summary().
+  '''
+
+  '''
+  Parameters: lag (pixels, milliseconds) over which isLagging().
+  '''
+  LAGGING_PIXELS = 20.0
+  LAGGING_MILLISECONDS = 100.0
+
+  def __init__(self, clock=milliseconds):
+    self.clock = clock
+    self.beginStroke(None)
+
+
+  def beginStroke(self, position):
+    ''' A stroke starts at position (PointerPoint), traced (there is nothing to lag.) '''
+    # (position, time fed, length of pointer track from start of stroke to position)
+    self._pending = deque()
+    self._tracedEnd = position
+    self._lastPosition = position
+    self._length = 0.0
+    self._samples = 0
+    self._sums = [0.0, 0, 0.0]
+    self._maxima = [0.0, 0, 0.0]
+    self._traces = 0
+
+
+  def observeInput(self, position):
+    ''' The pipe was fed position (PointerPoint.)  Samples the lag. '''
+    self._length += _distance(self._lastPosition, position)
+    self._lastPosition = position
+    self._pending.append((position, self.clock(), self._length))
+    self._sample()
+
+
+  def observeTraced(self, point):
+    ''' The pipe generated segments ending at point (in device CS, e.g. a FreehandPoint.) '''
+    self._traces += 1
+    self._tracedEnd = point
+    pending = self._pending
+    if not pending:
+      return
+    nearest = min(range(len(pending)), key=lambda ordinal: _distance(point, pending[ordinal][0]))
+    for _ in range(nearest + 1):
+      pending.popleft()
+
+
+  def endStroke(self):
+    ''' The pipe was closed: everything is traced. '''
+    self._pending.clear()
+    self._tracedEnd = self._lastPosition
+
+
+  def lag(self):
+    ''' Dictionary, the current lag: pixels, pending (count of positions), milliseconds. '''
+    pixels, pending, elapsed = self._lag()
+    return {'pixels': pixels, 'pending': pending, 'milliseconds': elapsed}
+
+
+  def _lag(self):
+    try:
+      oldest, fedTime, oldestLength = self._pending[0]
+    except IndexError:
+      # Nothing pending (test by exception: the pipe may be on another thread, see ThreadedTracer)
+      if self._tracedEnd is None:
+        return 0.0, 0, 0.0
+      return _distance(self._tracedEnd, self._lastPosition), 0, 0.0
+    pixels = _distance(self._tracedEnd, oldest) + self._length - oldestLength
+    return pixels, len(self._pending), self.clock() - fedTime
+
+
+  def isLagging(self):
+    ''' Whether the current lag is over LAGGING_PIXELS or LAGGING_MILLISECONDS. '''
+    pixels, _, elapsed = self._lag()
+    return pixels > self.LAGGING_PIXELS or elapsed > self.LAGGING_MILLISECONDS
+
+
+  def _sample(self):
+    for ordinal, value in enumerate(self._lag()):
+      self._sums[ordinal] += value
+      if value > self._maxima[ordinal]:
+        self._maxima[ordinal] = value
+    self._samples += 1
+
+
+  def summary(self):
+    '''
+    Dictionary, of the current (or last ended) stroke, sampled at each position:
+    samples, traces (count of observeTraced), and mean and max of pixels, pending, milliseconds,
+    e.g. 'meanPixels', 'maxPending'.
+    '''
+    result = {'samples': self._samples, 'traces': self._traces}
+    for ordinal, name in enumerate(('Pixels', 'Pending', 'Milliseconds')):
+      result['mean' + name] = self._sums[ordinal] / self._samples if self._samples else 0.0
+      result['max' + name] = self._maxima[ordinal]
+    return result
+
+
+
+def _distance(point1, point2):
+  return math.hypot(point2.x() - point1.x(), point2.y() - point1.y())
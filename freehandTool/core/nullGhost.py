@@ -0,0 +1,26 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+
+class NullGhost(object):
+  '''
+  Ghost for head of being-drawn freehand curve, that draws nothing.
+
+  Same API as PointerTrackGhost (freehandHead.py) but no GUI toolkit.
+  For tracing without a display, where there is no pointer for the head to follow.
+  '''
+
+  def showAt(self, initialPosition):
+    return
+
+  def updateStart(self, pointSCS):
+    return
+
+  def updateEnd(self, point):
+    return
+
+  def hide(self):
+    return
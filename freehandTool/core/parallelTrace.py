@@ -0,0 +1,169 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Parallel batch tracing of many recorded PointerPaths (strokes), in a pool of processes.
+
+Strokes are independent: each has its own filter pipe.
+So strokes are spread across worker processes, each traced by arrayTrace.trace().
+Results are compact numpy arrays (not Segment instances, nor Qt objects), cheap to send between processes.
+Requires numpy.
+
+Pieces of one long stroke
+=========================
+A pause forces a turn, which collapses the histories of LineGenerator and CurveGenerator
+(but not the state of the TurnDetector.)
+After a forced turn, lines and segments are fitted independently of everything before it.
+So traceLong() detects turns over the whole stroke (arrayTurns is fast),
+splits the turns after each forced turn into pieces,
+and fits lines and segments of the pieces in worker processes.
+Each piece starts (as does a stroke) with null histories at its start position, the forced turn ending the previous piece.
+Each piece ends with the cusp segment of its forced turn, so cuspness at the seams is that of the whole stroke.
+
+Strokes of an archive
+=====================
+traceArchive() sends workers only ordinals of strokes.
+Each worker opens the archive (see strokeArchive) itself, and traces views of the memory mapped file,
+so positions are not pickled, and the OS shares the pages of the file among workers.
+'''
+
+from functools import partial
+from multiprocessing import Pool, cpu_count
+
+import numpy
+
+from ..generator.curveGenerator import CurveGeneratorMixin
+from .tracer import Tracer
+from .arrayTurns import positionArray, turnsFromPositions, pausesFromTimestamps
+from .arrayLines import linesFromTurns
+from .arrayCurves import segmentsFromLines
+from .strokeArchive import StrokeArchive
+from . import arrayTrace
+
+
+'''
+Parameter: chunks per worker.
+More chunks balance load better (strokes differ in length), fewer chunks cost less in communication.
+'''
+CHUNKS_PER_WORKER = 4
+
+
+def _traceStroke(strokeAndTimestamps, alphamax, pauseTimeout):
+  ''' Body of a worker: trace one stroke. '''
+  positions, timestamps = strokeAndTimestamps
+  return arrayTrace.trace(positions, timestamps, alphamax=alphamax, pauseTimeout=pauseTimeout)
+
+
+def _fitPiece(piece, alphamax):
+  ''' Body of a worker: fit lines and segments to turns of one piece of a stroke. '''
+  startPosition, turns, isTurnForced = piece
+  lines, isLineForced = linesFromTurns(startPosition, turns, isTurnForced)
+  return segmentsFromLines(startPosition, lines, isLineForced, alphamax)
+
+
+# Archives opened by this (worker) process, by filename
+_archives = {}
+
+def _traceArchived(ordinal, filename, alphamax, pauseTimeout):
+  ''' Body of a worker: trace one stroke of an archive. '''
+  archive = _archives.get(filename)
+  if archive is None:
+    archive = _archives[filename] = StrokeArchive(filename)
+  positions, timestamps = archive[ordinal]
+  return arrayTrace.trace(positions, timestamps, alphamax=alphamax, pauseTimeout=pauseTimeout)
+
+
+def _map(function, work, workers, chunksize):
+  '''
+  List of function applied to each item of work, in order of work.
+  In a pool of workers processes, or in this process if workers <= 1.
+  '''
+  if workers is None:
+    workers = cpu_count()
+  if workers <= 1 or len(work) <= 1:
+    return [function(item) for item in work]
+
+  if chunksize is None:
+    chunksize = max(1, len(work) // (workers * CHUNKS_PER_WORKER))
+  pool = Pool(processes=workers)
+  try:
+    # imap (unlike imap_unordered) yields results in order of work
+    result = list(pool.imap(function, work, chunksize=chunksize))
+  finally:
+    pool.close()
+    pool.join()
+  return result
+
+
+def traceMany(strokes, timestamps=None, workers=None, chunksize=None,
+              alphamax=CurveGeneratorMixin.ALPHAMAX, pauseTimeout=Tracer.PAUSE_TIMEOUT):
+  '''
+  Trace many recorded PointerPaths.
+
+  strokes: sequence of positions (each an int array shape (n, 2) or sequence of (x, y), see arrayTrace.trace())
+  timestamps: None, or sequence (parallel to strokes) of timestamps (each None or an array)
+  workers: count of processes, default count of cpus.  1 means trace in this process, without a pool.
+  chunksize: count of strokes sent to a worker at a time, default so each worker gets CHUNKS_PER_WORKER chunks.
+
+  Returns list of (controlPoints, cuspness), one per stroke, in the same order as strokes.
+  '''
+  if timestamps is None:
+    timestamps = [None] * len(strokes)
+  assert len(timestamps) == len(strokes)
+  # Arrays pickle compactly
+  work = [(positionArray(positions), strokeTimestamps) for positions, strokeTimestamps in zip(strokes, timestamps)]
+  return _map(partial(_traceStroke, alphamax=alphamax, pauseTimeout=pauseTimeout), work, workers, chunksize)
+
+
+def traceLong(positions, timestamps, workers=None, chunksize=None,
+              alphamax=CurveGeneratorMixin.ALPHAMAX, pauseTimeout=Tracer.PAUSE_TIMEOUT):
+  '''
+  Trace one long recorded PointerPath, fitting its pieces between pauses in parallel.
+
+  Same parameters as arrayTrace.trace(), and workers, chunksize as for traceMany() (but chunks of pieces.)
+  Without timestamps (no pauses) there is only one piece.
+
+  Returns (controlPoints, cuspness), same as arrayTrace.trace().
+  '''
+  positions = positionArray(positions)
+  assert len(positions) > 0
+  pauses = pausesFromTimestamps(timestamps, pauseTimeout) if timestamps is not None else None
+  turns, isTurnForced, _ = turnsFromPositions(positions, pauses)
+
+  # A piece ends with a forced turn (or the end of turns)
+  boundaries = numpy.flatnonzero(isTurnForced) + 1
+  boundaries = boundaries[boundaries < len(turns)]
+  startPositions = [positions[0]] + list(turns[boundaries - 1])
+  work = list(zip(startPositions, numpy.split(turns, boundaries), numpy.split(isTurnForced, boundaries)))
+
+  pieces = _map(partial(_fitPiece, alphamax=alphamax), work, workers, chunksize)
+  return (numpy.concatenate([controlPoints for controlPoints, _ in pieces]),
+          numpy.concatenate([cuspness for _, cuspness in pieces]))
+
+
+def traceArchive(filename, ordinals=None, workers=None, chunksize=None,
+                 alphamax=CurveGeneratorMixin.ALPHAMAX, pauseTimeout=Tracer.PAUSE_TIMEOUT):
+  '''
+  Trace strokes of an archive file (see strokeArchive.)
+
+  ordinals: which strokes, default all (e.g. StrokeArchive.ordinalsIntersecting() to re-trace a region.)
+  Other parameters as for traceMany().
+
+  Returns list of (controlPoints, cuspness), one per ordinal, in the same order.
+  '''
+  if ordinals is None:
+    archive = StrokeArchive(filename)
+    ordinals = range(len(archive))
+    archive.close()
+  work = [int(ordinal) for ordinal in ordinals]
+  try:
+    return _map(partial(_traceArchived, filename=filename, alphamax=alphamax, pauseTimeout=pauseTimeout),
+                work, workers, chunksize)
+  finally:
+    # When traced in this process: don't keep the archive open (it might be appended to)
+    archive = _archives.pop(filename, None)
+    if archive is not None:
+      archive.close()
@@ -0,0 +1,131 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Queue of positions deferred from pointer events, drained within a time budget.
+
+See freehand.py, Flushing the pipe, and the tradeoff of incrementality:
+if tracing in pointerMoveEvent falls behind the pointer, the GUI toolkit condenses pointer events.
+Deferring: a pointer event only puts its position (constant time),
+and the pipe is fed from the queue when the event loop is idle, for at most a budget of time.
+
+A ring buffer: a fixed list, reused, no allocation per position.
+Statistics show how close the queue comes to falling behind (depth, overflows, drain times.)
+'''
+
+from .replayClock import milliseconds
+
+
+
+class PositionQueue(object):
+  '''
+  FIFO of positions, fixed capacity.
+
+  Algebra of the API:
+  queue := create (put | drain | drainAll)*
+  '''
+
+  '''
+  Parameter: count of positions fed to the pipe between checks of the time budget.
+  '''
+  DRAIN_CHUNK = 8
+
+  def __init__(self, capacity, clock=milliseconds):
+    assert capacity > 0
+    self._buffer = [None] * capacity
+    self._head = 0   # index of oldest
+    self._count = 0
+    self.clock = clock
+    self.resetStatistics()
+
+
+  def __len__(self):
+    return self._count
+
+
+  def put(self, position):
+    ''' Put position at tail.  Returns False (and does not put) if full. '''
+    capacity = len(self._buffer)
+    if self._count == capacity:
+      self.overflows += 1
+      return False
+    self._buffer[(self._head + self._count) % capacity] = position
+    self._count += 1
+    if self._count > self.maxDepth:
+      self.maxDepth = self._count
+    return True
+
+
+  def take(self, maxCount):
+    ''' List of up to maxCount positions from head, oldest first. '''
+    capacity = len(self._buffer)
+    count = min(maxCount, self._count)
+    end = self._head + count
+    if end <= capacity:
+      result = self._buffer[self._head:end]
+    else:
+      result = self._buffer[self._head:] + self._buffer[:end - capacity]
+    self._head = end % capacity
+    self._count -= count
+    return result
+
+
+  def drain(self, consume, budget):
+    '''
+    Take positions and pass them, in chunks, to consume (e.g. Tracer.pointerMoves)
+    until empty or budget (milliseconds) is spent.  At least one chunk (if any.)
+    Returns whether empty.
+    '''
+    start = self.clock()
+    drained = 0
+    while self._count > 0:
+      chunk = self.take(self.DRAIN_CHUNK)
+      consume(chunk)
+      drained += len(chunk)
+      if self.clock() - start >= budget:
+        break
+    self._recordDrain(self.clock() - start, drained)
+    return self._count == 0
+
+
+  def drainAll(self, consume):
+    ''' Take all positions and pass them to consume, without a budget. '''
+    if self._count > 0:
+      start = self.clock()
+      drained = self._count
+      consume(self.take(self._count))
+      self._recordDrain(self.clock() - start, drained)
+
+
+  def _recordDrain(self, elapsed, drained):
+    self.drains += 1
+    self.drainedPositions += drained
+    self.drainTime += elapsed
+    self.lastDrainTime = elapsed
+    if elapsed > self.maxDrainTime:
+      self.maxDrainTime = elapsed
+
+
+  def resetStatistics(self):
+    self.maxDepth = self._count
+    self.overflows = 0
+    self.drains = 0
+    self.drainedPositions = 0
+    self.drainTime = 0.0
+    self.lastDrainTime = 0.0
+    self.maxDrainTime = 0.0
+
+
+  def statistics(self):
+    '''
+    Dictionary of statistics since creation or resetStatistics(). Times in milliseconds.
+    depth: current count of positions, maxDepth: greatest count, capacity
+    overflows: count of puts refused (full; the caller drained without a budget)
+    drains, drainedPositions, drainTime (total), lastDrainTime, maxDrainTime
+    '''
+    return {'depth': self._count, 'maxDepth': self.maxDepth, 'capacity': len(self._buffer),
+            'overflows': self.overflows, 'drains': self.drains, 'drainedPositions': self.drainedPositions,
+            'drainTime': self.drainTime, 'lastDrainTime': self.lastDrainTime, 'maxDrainTime': self.maxDrainTime}
@@ -0,0 +1,92 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Virtual clock and timers, for replaying recorded strokes deterministically, at unlimited speed.
+
+A live FreehandTool learns of a pause from a QTimer (handleTimeout() flushes the pipe.)
+With a ReplayClock (FreehandTool.setClock()) its timers are ReplayTimers instead:
+the replayer advances the clock to the timestamp of each event, firing timers that came due meanwhile,
+so pauses flush the pipe exactly where the recorded timestamps say, however fast the replay runs.
+
+A ReplayClock is also a clock (call it for milliseconds) as taken by e.g. StrokeRecorder, LagMeter, QualityGovernor.
+Their default clock is milliseconds(), of real time.
+'''
+
+import time
+
+
+
+def milliseconds():
+  ''' Default clock, of real time: monotonic, milliseconds. '''
+  return time.perf_counter() * 1000.0
+
+
+
+class ReplayClock(object):
+  '''
+  Algebra of the API:
+  clock := create (createTimer | advance | call)*
+  Time only moves by advance().
+  '''
+
+  def __init__(self, start=0.0):
+    self.now = start
+    self._timers = []
+
+
+  def __call__(self):
+    ''' Milliseconds. '''
+    return self.now
+
+
+  def createTimer(self, callback):
+    ''' Single shot timer calling callback when it times out.  Same API as QTimer: start(), stop(), isActive(). '''
+    timer = ReplayTimer(self, callback)
+    self._timers.append(timer)
+    return timer
+
+
+  def advance(self, time):
+    '''
+    Move time to time (milliseconds), firing timers due before then, in order of due time.
+    A timer fires with the clock at its due time.  A timer (re)started by a callback fires if due before time.
+    Not a timer due at time: the event at time comes first (as in Tracer.trace(), a pause is a gap longer than PAUSE_TIMEOUT.)
+    '''
+    assert time >= self.now, 'Clock cannot go back'
+    while True:
+      due = [timer for timer in self._timers if timer.isActive() and timer.due < time]
+      if not due:
+        break
+      timer = min(due, key=lambda timer: timer.due)
+      self.now = max(self.now, timer.due)
+      timer.fire()
+    self.now = time
+
+
+
+class ReplayTimer(object):
+  ''' Timer of a ReplayClock.  Create by ReplayClock.createTimer(). '''
+
+  def __init__(self, clock, callback):
+    self.clock = clock
+    self.callback = callback
+    self.due = None
+
+
+  def start(self, milliseconds):
+    self.due = self.clock.now + milliseconds
+
+  def stop(self):
+    self.due = None
+
+  def isActive(self):
+    return self.due is not None
+
+
+  def fire(self):
+    self.due = None
+    self.callback()
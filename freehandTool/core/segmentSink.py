@@ -0,0 +1,45 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+from ..segmentString.cuspness import Cuspness
+
+
+class SegmentSink(object):
+  '''
+  Receiver of segments generated by a Tracer, without a GUI toolkit.
+
+  Same API that CurveGenerator uses on a SegmentString: appendSegments(), countSegments().
+
+  Unlike SegmentString (which keeps an internal QPainterPath) this keeps the Segment instances,
+  in the frame they were generated in (Scene CS of the Tracer.)
+  No coordinate conversion, so no segment is refused.
+
+  Cuspness is indexed by segment ordinal, as in SegmentString.
+  '''
+
+  def __init__(self):
+    self.segments = []
+    self.cuspness = Cuspness()
+
+
+  def appendSegments(self, segments, segmentCuspness):
+    ''' Append segments sequentially to end of self. cuspness is [Bool,] equal in length to segments. '''
+    for segment, isCusp in zip(segments, segmentCuspness):
+      if isCusp:
+        self.cuspness.setCuspness(len(self.segments))
+      self.segments.append(segment)
+
+
+  def countSegments(self):
+    return len(self.segments)
+
+  def isSegmentCusp(self, segmentOrdinal):
+    assert segmentOrdinal >= 0 and segmentOrdinal < self.countSegments()
+    return self.cuspness.isCusp(segmentOrdinal)
+
+  def segmentCuspness(self):
+    ''' List of Bool, one per segment. '''
+    return [self.cuspness.isCusp(ordinal) for ordinal in range(0, len(self.segments))]
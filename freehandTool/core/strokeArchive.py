@@ -0,0 +1,239 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Archive of many strokes (recorded PointerPaths) in one file, for random access without loading it.
+
+Storage for batch re-tracing (arrayTrace, parallelTrace.traceArchive().)
+Requires numpy.
+
+Unlike a recording (see strokeRecording), positions are stored raw (not delta encoded):
+the positions of a stroke are a zero-copy numpy view of the memory mapped file,
+which the batch tracer consumes directly.
+
+Format
+======
+Little endian.  A file is a file header, then index pages and stroke data, interleaved as appended:
+  file header:  magic 'FHSA', version (uint16), reserved (uint16), offset of first index page (uint64)
+  index page:   magic 'FHSI', count of entries used (uint32), offset of next index page (uint64, 0 if last),
+                then PAGE_CAPACITY entries, see INDEX_ENTRY:
+                offset of stroke data, count of positions, flags, bounding box (int32 left, top, right, bottom)
+  stroke data:  positions, int32 (x, y) pairs, then timestamps (float64 ms, one per position) if flag TIMED
+
+Stroke data is aligned to 8 bytes (so views of it are aligned.)
+
+Appending
+=========
+Appending writes only at the end of the file, and into the last index page:
+stroke data, then its index entry, then the count of entries in the page (which commits the stroke.)
+When the last index page is full, a new page is written at the end of the file and linked from the last page.
+So no append rewrites existing strokes, and a reader never sees a stroke whose data is incomplete.
+'''
+
+import mmap
+import os
+import struct
+
+import numpy
+
+
+FILE_MAGIC = b'FHSA'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<4sHHQ')
+
+PAGE_MAGIC = b'FHSI'
+PAGE_HEADER = struct.Struct('<4sIQ')
+INDEX_ENTRY = numpy.dtype([('offset', '<u8'), ('count', '<u4'), ('flags', '<u4'),
+                           ('left', '<i4'), ('top', '<i4'), ('right', '<i4'), ('bottom', '<i4')])
+
+# Flags of an index entry
+TIMED = 1
+
+POSITION = numpy.dtype('<i4')
+TIMESTAMP = numpy.dtype('<f8')
+ALIGNMENT = 8
+
+'''
+Parameter: count of entries per index page.
+Larger wastes space in a small archive, smaller makes a longer chain of pages to read when opening.
+'''
+PAGE_CAPACITY = 4096
+
+
+
+def _aligned(offset):
+  return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+
+class StrokeArchive(object):
+  '''
+  An archive file of strokes: read by index (archive[i]), append.
+
+  Opening reads only the index pages.
+  Stroke data is read (paged in by the OS) only when a view of it is used.
+
+  Views returned by positions() and timestamps() are read only.
+  A view keeps its map of the file alive (even after close(), or a remap after append().)
+  '''
+
+  def __init__(self, filename, writable=False):
+    '''
+    Open an archive.  writable: allow append(), create the file if it does not exist.
+    '''
+    self.writable = writable
+    if writable and not os.path.exists(filename):
+      with open(filename, 'wb') as newFile:
+        newFile.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, 0, FILE_HEADER.size))
+        newFile.write(self._emptyPage())
+    self.file = open(filename, 'r+b' if writable else 'rb')
+    # Entries appended but not yet in self.index (nor in the map)
+    self._appended = []
+    self._mapFile()
+    magic, version, _, firstPageOffset = FILE_HEADER.unpack_from(self.map, 0)
+    assert magic == FILE_MAGIC and version == FILE_VERSION, 'Not a stroke archive'
+    self._readIndex(firstPageOffset)
+
+
+  @staticmethod
+  def _emptyPage():
+    return PAGE_HEADER.pack(PAGE_MAGIC, 0, 0) + bytes(PAGE_CAPACITY * INDEX_ENTRY.itemsize)
+
+
+  def _mapFile(self):
+    # A previous map is not closed: it is freed with the last view of it
+    self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+  def _readIndex(self, pageOffset):
+    ''' Follow the chain of index pages, collecting the used entries. '''
+    pages = []
+    while True:
+      magic, count, nextPageOffset = PAGE_HEADER.unpack_from(self.map, pageOffset)
+      assert magic == PAGE_MAGIC, 'Corrupt stroke archive'
+      pages.append(numpy.frombuffer(self.map, dtype=INDEX_ENTRY, count=count,
+                                    offset=pageOffset + PAGE_HEADER.size))
+      if nextPageOffset == 0:
+        break
+      pageOffset = nextPageOffset
+    # Copy: the index is small, and must survive remapping
+    self.index = numpy.concatenate(pages)
+    self._lastPageOffset = pageOffset
+    self._lastPageCount = count
+
+
+  def _sync(self):
+    ''' Make appended strokes readable: batched, so a run of appends costs one remap. '''
+    if self._appended:
+      self.index = numpy.concatenate([self.index] + self._appended)
+      self._appended = []
+      self._mapFile()
+
+
+  def close(self):
+    try:
+      self.map.close()
+    except BufferError:
+      pass  # Views still in use, map is freed with them
+    self.file.close()
+
+
+  def __len__(self):
+    return len(self.index) + len(self._appended)
+
+
+  def __getitem__(self, ordinal):
+    ''' (positions, timestamps) of stroke at ordinal, see positions(), timestamps(). '''
+    return self.positions(ordinal), self.timestamps(ordinal)
+
+
+  def __iter__(self):
+    for ordinal in range(len(self)):
+      yield self[ordinal]
+
+
+  def positions(self, ordinal):
+    ''' View of positions of stroke: int32 array shape (n, 2), device CS. '''
+    self._sync()
+    entry = self.index[ordinal]
+    return numpy.frombuffer(self.map, dtype=POSITION, count=2 * int(entry['count']),
+                            offset=int(entry['offset'])).reshape(-1, 2)
+
+
+  def timestamps(self, ordinal):
+    ''' View of timestamps of stroke: float64 array, milliseconds.  None if stroke was archived without. '''
+    self._sync()
+    entry = self.index[ordinal]
+    if not entry['flags'] & TIMED:
+      return None
+    count = int(entry['count'])
+    return numpy.frombuffer(self.map, dtype=TIMESTAMP, count=count,
+                            offset=int(entry['offset']) + count * 2 * POSITION.itemsize)
+
+
+  def bounds(self):
+    ''' Bounding boxes of all strokes: int array shape (len, 4) of (left, top, right, bottom). '''
+    self._sync()
+    return numpy.stack((self.index['left'], self.index['top'], self.index['right'], self.index['bottom']), axis=1)
+
+
+  def ordinalsIntersecting(self, left, top, right, bottom):
+    ''' Ordinals of strokes whose bounding box intersects the rectangle (inclusive), from the index only. '''
+    self._sync()
+    index = self.index
+    return numpy.flatnonzero((index['left'] <= right) & (index['right'] >= left)
+                             & (index['top'] <= bottom) & (index['bottom'] >= top))
+
+
+  def append(self, positions, timestamps=None):
+    '''
+    Append a stroke: positions (int array shape (n, 2) or sequence of (x, y)), optional timestamps.
+    Returns its ordinal.
+    '''
+    assert self.writable, 'Stroke archive not opened writable'
+    positions = numpy.ascontiguousarray(positions, dtype=POSITION).reshape(-1, 2)
+    assert len(positions) > 0
+    flags = 0
+    data = positions.tobytes()
+    if timestamps is not None:
+      assert len(timestamps) == len(positions)
+      flags |= TIMED
+      data += numpy.ascontiguousarray(timestamps, dtype=TIMESTAMP).tobytes()
+
+    self.file.seek(0, os.SEEK_END)
+    if self._lastPageCount == PAGE_CAPACITY:
+      self._appendPage(_aligned(self.file.tell()))
+      self.file.seek(0, os.SEEK_END)
+    dataOffset = _aligned(self.file.tell())
+    self.file.seek(dataOffset)
+    self.file.write(data)
+
+    entry = numpy.zeros(1, dtype=INDEX_ENTRY)
+    entry['offset'] = dataOffset
+    entry['count'] = len(positions)
+    entry['flags'] = flags
+    entry['left'], entry['top'] = positions.min(axis=0)
+    entry['right'], entry['bottom'] = positions.max(axis=0)
+    self.file.seek(self._lastPageOffset + PAGE_HEADER.size + self._lastPageCount * INDEX_ENTRY.itemsize)
+    self.file.write(entry.tobytes())
+    # Commit: count of entries in page
+    self._lastPageCount += 1
+    self.file.seek(self._lastPageOffset + 4)
+    self.file.write(struct.pack('<I', self._lastPageCount))
+    self.file.flush()
+
+    self._appended.append(entry)
+    return len(self) - 1
+
+
+  def _appendPage(self, pageOffset):
+    ''' Write an empty index page at pageOffset (the end of the file) and link it from the last page. '''
+    self.file.seek(pageOffset)
+    self.file.write(self._emptyPage())
+    self.file.seek(self._lastPageOffset + 8)
+    self.file.write(struct.pack('<Q', pageOffset))
+    self._lastPageOffset = pageOffset
+    self._lastPageCount = 0
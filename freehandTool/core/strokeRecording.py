@@ -0,0 +1,269 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Recording of strokes (raw input to the tool) in a compact binary file, and replay.
+
+To reproduce tracing issues, and to re-trace with new parameters (e.g. ALPHAMAX.)
+Requires numpy.
+
+A stroke is what the tool consumes from pointerPress to pointerRelease:
+- int positions in device (View) CS
+- timestamps (milliseconds)
+- pauses (the timer timed out, and the pipe was flushed) after a position
+- the map from View CS to Scene CS (an affine transform), at pointerPress
+
+Format
+======
+Little endian.  A file is a file header and a sequence of strokes, each appended as recorded:
+  file header:    magic 'FHSR', version (uint16), reserved (uint16)
+  stroke header:  see STROKE_HEADER: magic 'STRK', flags, count of positions, count of pauses,
+                  first position (int32 x, y), time of first position (float64 ms),
+                  transform (six float64: m11, m12, m21, m22, dx, dy, as Qt QTransform)
+  deltas:         (count - 1) records of (dx, dy, dt) from the previous position
+  pauses:         (count of pauses) uint32 ordinals of positions after which the pointer paused
+
+Deltas are int16, int16, uint16: six bytes per position.
+A stroke with a larger delta (a jump of the pointer, or a long wait) is flagged WIDE: int32, int32, uint32.
+
+The reader memory maps the file: deltas are decoded from views of the map, without reading the whole file.
+'''
+
+import mmap
+import os
+import struct
+
+import numpy
+
+from ..generator.curveGenerator import CurveGeneratorMixin
+from ..type.pointerPoint import PointerPoint
+from .affineTracer import AffineTracer, IDENTITY
+from .replayClock import milliseconds
+from .segmentSink import SegmentSink
+from . import arrayTrace
+
+
+FILE_MAGIC = b'FHSR'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<4sHH')
+
+STROKE_MAGIC = b'STRK'
+STROKE_HEADER = struct.Struct('<4sIIIiid6d')
+# Flags in stroke header
+WIDE = 1
+
+NARROW_DELTA = numpy.dtype([('dx', '<i2'), ('dy', '<i2'), ('dt', '<u2')])
+WIDE_DELTA = numpy.dtype([('dx', '<i4'), ('dy', '<i4'), ('dt', '<u4')])
+PAUSE_ORDINAL = numpy.dtype('<u4')
+
+
+
+class StrokeRecorder(object):
+  '''
+  Writes strokes to a file, appending.
+
+  Algebra of the API (called by FreehandTool, see FreehandTool.setRecorder()):
+  recorder := create stroke* close
+  stroke := beginStroke (recordPosition | recordPause)* endStroke
+
+  A stroke is buffered (in arrays) and written at endStroke, so the file always holds whole strokes.
+  '''
+
+  def __init__(self, filename, clock=milliseconds):
+    self.clock = clock
+    self.file = open(filename, 'ab')
+    if self.file.tell() == 0:
+      self.file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, 0))
+    self._positions = None
+
+
+  def close(self):
+    self.file.close()
+
+
+  def isRecording(self):
+    return self._positions is not None
+
+
+  def beginStroke(self, position, transform=IDENTITY):
+    ''' Start a stroke at position (PointerPoint, at pointerPress.) transform: View CS to Scene CS. '''
+    self._positions = [position.x(), position.y()]
+    self._timestamps = [self.clock()]
+    self._pauses = []
+    self._transform = tuple(float(coefficient) for coefficient in transform)
+
+
+  def recordPosition(self, position):
+    ''' A position (PointerPoint) that was fed to the pipe. '''
+    self._positions.extend((position.x(), position.y()))
+    self._timestamps.append(self.clock())
+
+
+  def recordPause(self):
+    ''' The pipe was flushed (pointer paused) after the last recorded position. '''
+    self._pauses.append(len(self._timestamps) - 1)
+
+
+  def endStroke(self):
+    ''' Encode and write the stroke. '''
+    positions = numpy.array(self._positions, dtype=numpy.int64).reshape(-1, 2)
+    timestamps = numpy.array(self._timestamps, dtype=numpy.float64)
+    self.file.write(encodeStroke(positions, timestamps, self._pauses, self._transform))
+    self.file.flush()
+    self._positions = None
+
+
+
+def encodeStroke(positions, timestamps, pauseOrdinals, transform=IDENTITY):
+  ''' Bytes of one stroke, see Format. '''
+  positions = numpy.asarray(positions, dtype=numpy.int64).reshape(-1, 2)
+  timestamps = numpy.asarray(timestamps, dtype=numpy.float64)
+  # Deltas of integral milliseconds (from rounded times, so rounding errors do not accumulate)
+  times = numpy.rint(timestamps - timestamps[0]).astype(numpy.int64)
+  deltaPositions = numpy.diff(positions, axis=0)
+  deltaTimes = numpy.diff(times)
+  isNarrow = (numpy.abs(deltaPositions).max(initial=0) <= 32767) and (deltaTimes.max(initial=0) <= 65535)
+  deltas = numpy.empty(len(deltaTimes), dtype=NARROW_DELTA if isNarrow else WIDE_DELTA)
+  deltas['dx'] = deltaPositions[:, 0]
+  deltas['dy'] = deltaPositions[:, 1]
+  deltas['dt'] = deltaTimes
+  header = STROKE_HEADER.pack(STROKE_MAGIC, 0 if isNarrow else WIDE, len(positions), len(pauseOrdinals),
+                              int(positions[0, 0]), int(positions[0, 1]), float(timestamps[0]), *transform)
+  return header + deltas.tobytes() + numpy.asarray(pauseOrdinals, dtype=PAUSE_ORDINAL).tobytes()
+
+
+
+class RecordedStroke(object):
+  '''
+  A stroke decoded from a recording.
+
+  positions: int64 array shape (n, 2), device CS
+  timestamps: float64 array length n, milliseconds
+  pauses: bool array length n, True after a position where the pointer paused
+  transform: (m11, m12, m21, m22, dx, dy) map from device CS to Scene CS
+  '''
+
+  def __init__(self, positions, timestamps, pauses, transform):
+    self.positions = positions
+    self.timestamps = timestamps
+    self.pauses = pauses
+    self.transform = transform
+
+
+  def __len__(self):
+    return len(self.positions)
+
+
+  def replay(self, segmentString=None, alphamax=CurveGeneratorMixin.ALPHAMAX, tracer=None):
+    '''
+    Replay through the incremental (live) pipe: pointerPress, pointerMove and pointerPause as recorded, pointerRelease.
+
+    segmentString: receives segments, default a new SegmentSink.
+    tracer: default a new ReplayTracer (mapping by self.transform, with alphamax.)
+    Returns segmentString.
+    '''
+    if segmentString is None:
+      segmentString = SegmentSink()
+    if tracer is None:
+      tracer = ReplayTracer(self.transform)
+      tracer.ALPHAMAX = alphamax
+    tracer.setSegmentString(segmentString)
+    positions = self.positions.tolist()
+    tracer.pointerPress(PointerPoint(*positions[0]))
+    for position, isPause in zip(positions[1:], self.pauses[1:].tolist()):
+      tracer.pointerMove(PointerPoint(*position))
+      if isPause:
+        tracer.pointerPause()
+    tracer.pointerRelease()
+    return segmentString
+
+
+  def trace(self, alphamax=CurveGeneratorMixin.ALPHAMAX):
+    '''
+    Trace by the batch tracer (arrayTrace), with recorded pauses and transform.
+    Returns (controlPoints, cuspness), see arrayTrace.trace().
+    '''
+    return arrayTrace.trace(self.positions, alphamax=alphamax, pauses=self.pauses, transform=self.transform)
+
+
+
+class ReplayTracer(AffineTracer):
+  ''' Tracer that maps from device CS to Scene CS by a recorded transform (as does FreehandTool by its view.) '''
+  pass
+
+
+
+class StrokeReader(object):
+  '''
+  Strokes of a recording, read through a memory map of the file.
+
+  Random access (reader[i]) after one scan of the stroke headers when opened.
+  '''
+
+  def __init__(self, filename):
+    self.file = open(filename, 'rb')
+    size = os.fstat(self.file.fileno()).st_size
+    assert size >= FILE_HEADER.size, 'Not a stroke recording'
+    self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, _ = FILE_HEADER.unpack_from(self.map, 0)
+    assert magic == FILE_MAGIC and version == FILE_VERSION, 'Not a stroke recording'
+    self._offsets = self._scan(size)
+
+
+  def _scan(self, size):
+    ''' Offsets of stroke headers. '''
+    result = []
+    offset = FILE_HEADER.size
+    while offset + STROKE_HEADER.size <= size:
+      magic, flags, count, pauseCount = STROKE_HEADER.unpack_from(self.map, offset)[:4]
+      assert magic == STROKE_MAGIC, 'Corrupt stroke recording'
+      deltaType = WIDE_DELTA if flags & WIDE else NARROW_DELTA
+      end = offset + STROKE_HEADER.size + (count - 1) * deltaType.itemsize + pauseCount * PAUSE_ORDINAL.itemsize
+      if end > size:
+        # Truncated (recorder did not finish writing): ignore
+        break
+      result.append(offset)
+      offset = end
+    return result
+
+
+  def close(self):
+    self.map.close()
+    self.file.close()
+
+
+  def __len__(self):
+    return len(self._offsets)
+
+
+  def __iter__(self):
+    for ordinal in range(len(self)):
+      yield self[ordinal]
+
+
+  def __getitem__(self, ordinal):
+    offset = self._offsets[ordinal]
+    header = STROKE_HEADER.unpack_from(self.map, offset)
+    _, flags, count, pauseCount, x, y, startTime = header[:7]
+    transform = header[7:]
+    offset += STROKE_HEADER.size
+    deltas = numpy.frombuffer(self.map, dtype=WIDE_DELTA if flags & WIDE else NARROW_DELTA,
+                              count=count - 1, offset=offset)
+    offset += deltas.nbytes
+    pauseOrdinals = numpy.frombuffer(self.map, dtype=PAUSE_ORDINAL, count=pauseCount, offset=offset)
+
+    positions = numpy.empty((count, 2), dtype=numpy.int64)
+    positions[0] = (x, y)
+    numpy.cumsum(deltas['dx'], dtype=numpy.int64, out=positions[1:, 0])
+    numpy.cumsum(deltas['dy'], dtype=numpy.int64, out=positions[1:, 1])
+    positions[1:] += positions[0]
+    timestamps = numpy.empty(count, dtype=numpy.float64)
+    timestamps[0] = 0
+    numpy.cumsum(deltas['dt'], dtype=numpy.float64, out=timestamps[1:])
+    timestamps += startTime
+    pauses = numpy.zeros(count, dtype=bool)
+    pauses[pauseOrdinals] = True
+    return RecordedStroke(positions, timestamps, pauses, transform)
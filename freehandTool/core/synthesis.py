@@ -0,0 +1,210 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Synthesis of strokes, for load testing: parametric curves sampled as by a pointer device.
+
+A curve is a function from t in [0, 1] to a point (x, y) float in device CS, see circle(), spiral(), zigzag(), line().
+synthesize() samples a curve into a SyntheticStroke: positions (PointerPoint) and timestamps (milliseconds.)
+- rate: samples per second of the device (a mouse about 125, a tablet pen 200 or more)
+- jitter: standard deviation of noise, in pixels (a shaky hand, a noisy digitizer)
+- pauses: the pointer is held still (at t, for milliseconds): no events, a gap in timestamps
+As a device does, no event is generated when the position is unchanged.
+
+An overloaded OS loses events, the gaps in the pointer path (see freehand.py):
+- coalesce(): an app busy handling each event gets only the latest position when free
+- drop(): each event is lost independently, with a probability
+
+A SyntheticStroke feeds:
+- the incremental pipe, event by event: feed(tracer), any Tracer (e.g. a FreehandTool)
+- the batch tracer: trace() (core.batch), or arrayTrace.trace(stroke.pairs(), stroke.timestamps)
+Random choices are from a random.Random(seed): same seed, same stroke.
+'''
+
+import math
+import random
+
+from ..generator.curveGenerator import CurveGeneratorMixin
+from ..type.pointerPoint import PointerPoint
+from . import batch
+
+
+'''
+Parameter: default samples per second (a mouse.)
+'''
+RATE = 125
+
+
+
+class SyntheticStroke(object):
+  '''
+  positions: list of PointerPoint, device CS, the first is where the pointer was pressed
+  timestamps: list of milliseconds, one per position
+  '''
+
+  def __init__(self, positions, timestamps):
+    assert len(positions) == len(timestamps)
+    self.positions = positions
+    self.timestamps = timestamps
+
+
+  def __len__(self):
+    return len(self.positions)
+
+
+  def pairs(self):
+    ''' Positions as (x, y) int pairs, e.g. for arrayTrace.trace(). '''
+    return [(position.x(), position.y()) for position in self.positions]
+
+
+  def pauses(self, pauseTimeout):
+    ''' List of Bool, one per position, True after a position where the pointer paused (as in Tracer.trace().) '''
+    last = len(self.timestamps) - 1
+    return [0 < ordinal < last and self.timestamps[ordinal + 1] - self.timestamps[ordinal] > pauseTimeout
+            for ordinal in range(len(self.timestamps))]
+
+
+  def feed(self, tracer, pauseTimeout=None):
+    '''
+    Feed the incremental (live) pipe: pointerPress, pointerMove and pointerPause (as the timer would), pointerRelease.
+
+    tracer: any Tracer whose segment string is set (e.g. a FreehandTool.)
+    pauseTimeout: default tracer.PAUSE_TIMEOUT.
+    Returns tracer.
+    '''
+    if pauseTimeout is None:
+      pauseTimeout = tracer.PAUSE_TIMEOUT
+    tracer.pointerPress(self.positions[0])
+    for position, isPause in zip(self.positions[1:], self.pauses(pauseTimeout)[1:]):
+      tracer.pointerMove(position)
+      if isPause:
+        tracer.pointerPause()
+    tracer.pointerRelease()
+    return tracer
+
+
+  def trace(self, alphamax=CurveGeneratorMixin.ALPHAMAX):
+    ''' Trace by the batch tracer (core.batch), with pauses from timestamps.  Returns (segments, cuspness). '''
+    return batch.trace(self.positions, self.timestamps, alphamax)
+
+
+  def subset(self, ordinals):
+    ''' SyntheticStroke of the events at ordinals (ascending.) '''
+    return _withoutRepeats([self.positions[ordinal] for ordinal in ordinals],
+                           [self.timestamps[ordinal] for ordinal in ordinals])
+
+
+
+def _withoutRepeats(positions, timestamps):
+  ''' SyntheticStroke without positions same as the previous: a device generates no event. '''
+  keptPositions, keptTimestamps = [positions[0]], [timestamps[0]]
+  for position, timestamp in zip(positions[1:], timestamps[1:]):
+    if position != keptPositions[-1]:
+      keptPositions.append(position)
+      keptTimestamps.append(timestamp)
+  return SyntheticStroke(keptPositions, keptTimestamps)
+
+
+
+def synthesize(curve, duration, rate=RATE, jitter=0.0, pauses=(), seed=None):
+  '''
+  SyntheticStroke: curve sampled at rate (per second) over duration (milliseconds of motion.)
+
+  The pointer moves at constant speed in t.
+  pauses: sequence of (t, milliseconds): the pointer is held still at curve(t), no jitter.
+  The stroke lasts duration plus the pauses.
+  '''
+  assert duration > 0 and rate > 0
+  rnd = random.Random(seed)
+  pauses = sorted(pauses)
+  interval = 1000.0 / rate
+  elapsed = duration + sum(milliseconds for _, milliseconds in pauses)
+  positions, timestamps = [], []
+  for ordinal in range(int(elapsed / interval) + 1):
+    timestamp = ordinal * interval
+    t, isHeld = _curveTime(timestamp, duration, pauses)
+    x, y = curve(t)
+    if jitter and not isHeld:
+      x += rnd.gauss(0, jitter)
+      y += rnd.gauss(0, jitter)
+    positions.append(PointerPoint(int(round(x)), int(round(y))))
+    timestamps.append(timestamp)
+  return _withoutRepeats(positions, timestamps)
+
+
+def _curveTime(timestamp, duration, pauses):
+  ''' (t, isHeld) of the pointer at timestamp, given pauses. '''
+  held = 0
+  for t, milliseconds in pauses:
+    start = t * duration + held
+    if timestamp < start:
+      break
+    if timestamp < start + milliseconds:
+      return t, True
+    held += milliseconds
+  return min(1.0, (timestamp - held) / duration), False
+
+
+
+def coalesce(stroke, handling):
+  '''
+  SyntheticStroke as delivered to an app busy handling each event for handling milliseconds.
+
+  As an OS coalesces pointer motion: events arriving while the app is busy are replaced by the latest,
+  delivered (with its timestamp) when the app is free.
+  The first and last events are delivered.
+  '''
+  timestamps = stroke.timestamps
+  count = len(timestamps)
+  ordinals = [0]
+  free = timestamps[0] + handling
+  ordinal = 1
+  while ordinal < count:
+    # Latest to arrive by the time the app is free, else the next to arrive
+    latest = ordinal
+    while latest + 1 < count and timestamps[latest + 1] <= free:
+      latest += 1
+    ordinals.append(latest)
+    free = max(free, timestamps[latest]) + handling
+    ordinal = latest + 1
+  return stroke.subset(ordinals)
+
+
+def drop(stroke, probability, seed=None):
+  ''' SyntheticStroke, each event lost with probability, except the first and last. '''
+  rnd = random.Random(seed)
+  last = len(stroke) - 1
+  return stroke.subset([ordinal for ordinal in range(len(stroke))
+                        if ordinal in (0, last) or rnd.random() >= probability])
+
+
+
+def line(start, end):
+  ''' Curve: straight from start to end, (x, y) pairs. '''
+  return lambda t: (start[0] + t * (end[0] - start[0]), start[1] + t * (end[1] - start[1]))
+
+
+def circle(center=(0, 0), radius=200, turns=1.0):
+  ''' Curve: turns of a circle, starting on its right. '''
+  return lambda t: (center[0] + radius * math.cos(2 * math.pi * turns * t),
+                    center[1] + radius * math.sin(2 * math.pi * turns * t))
+
+
+def spiral(center=(0, 0), inner=10, outer=300, turns=4.0):
+  ''' Curve: outward spiral, curvature decreasing. '''
+  def curve(t):
+    radius = inner + t * (outer - inner)
+    return (center[0] + radius * math.cos(2 * math.pi * turns * t),
+            center[1] + radius * math.sin(2 * math.pi * turns * t))
+  return curve
+
+
+def zigzag(start=(0, 0), length=1000, amplitude=40, teeth=20):
+  ''' Curve: straight runs and sharp corners (cusps), rightward. '''
+  def curve(t):
+    phase = (t * teeth) % 1.0
+    return (start[0] + t * length, start[1] + amplitude * (1 - abs(2 * phase - 1)))
+  return curve
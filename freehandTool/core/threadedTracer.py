@@ -0,0 +1,199 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Tracing on a worker thread.
+
+The pipe of filters (an AffineTracer) runs on a worker thread, fed by a bounded queue of commands
+(press, move, moves, pause, release) in the order the GUI thread calls them.
+So stroke start, pause flush, and release keep their order with respect to positions.
+
+Segments come back in batches: the worker collects them in a SegmentSink,
+and when it has no more commands waiting (or after a pause or release) it delivers the batch
+and calls notify() (on the worker thread.)
+The GUI thread then takes delivered batches (takeDelivered()) and appends them to its SegmentString:
+Qt objects (SegmentString, ghost, view) are touched only on the GUI thread.
+
+The worker maps from device CS to Scene CS by a transform, given at press
+(FreehandTool.viewTransform(), since the worker may not call the view.)
+
+Python threads share the GIL: tracing on a worker does not trace faster,
+but the GUI thread returns sooner from pointer events, and can repaint and receive events while the worker traces.
+'''
+
+import queue
+import threading
+
+from .affineTracer import AffineTracer
+from .segmentSink import SegmentSink
+
+
+
+class ThreadedTracer(object):
+  '''
+  Algebra of the API (from the GUI thread), as for Tracer:
+  threadedTracer := create use* stop
+  use := pointerPress (pointerMove | pointerMoves | pointerPause | takeDelivered)* pointerRelease sync takeDelivered raiseError
+
+  An exception in the pipe (on the worker) is raised by raiseError(),
+  and the worker ignores commands until the next pointerPress.
+  (Not raised by takeDelivered(), which a GUI calls from a slot, where an exception would abort the app.)
+  '''
+
+  '''
+  Parameter: capacity of queue of commands.  When full, the GUI thread waits for the worker (back pressure.)
+  '''
+  QUEUE_CAPACITY = 4096
+
+  def __init__(self, notify=None):
+    '''
+    notify: callable, called on the worker thread after delivering a batch,
+    e.g. to emit a Qt signal (queued to the GUI thread.)
+    '''
+    self.notify = notify
+    self.commands = queue.Queue(self.QUEUE_CAPACITY)
+    self.tracer = AffineTracer()
+    self._lock = threading.Lock()
+    self._delivered = []
+    self._error = None
+    self._isBroken = False
+    self.thread = threading.Thread(target=self._run, name='FreehandTracer')
+    self.thread.daemon = True
+    self.thread.start()
+
+
+  # GUI thread
+
+  def setInstrument(self, instrument):
+    '''
+    Instrument the pipe on the worker (call between strokes), see module instrument.
+    Only stages of the pipe are recorded on the worker:
+    its appends (to a SegmentSink) and ghost (a NullGhost) are not the GUI's, which records its own.
+    '''
+    self.tracer.setInstrument(None if instrument is None else PipeStages(instrument))
+
+
+  def pointerPress(self, position, transform):
+    ''' transform: map from device CS to Scene CS, see AffineTracer. '''
+    self.commands.put(('press', position, transform))
+
+  def pointerMove(self, position):
+    self.commands.put(('move', position))
+
+  def pointerMoves(self, positions):
+    self.commands.put(('moves', list(positions)))
+
+  def pointerPause(self):
+    self.commands.put(('pause',))
+
+  def pointerRelease(self):
+    self.commands.put(('release',))
+
+
+  def sync(self):
+    ''' Wait until the worker has executed all commands (and delivered their segments.) '''
+    self.commands.join()
+
+
+  def takeDelivered(self):
+    '''
+    List of batches delivered since last call, oldest first.
+    A batch is (segments, cuspness, lastEndPointGenerated), where lastEndPointGenerated is None after release.
+    '''
+    with self._lock:
+      result = self._delivered
+      self._delivered = []
+    return result
+
+
+  def raiseError(self):
+    ''' Raise the exception of the pipe on the worker, if any since the last call. '''
+    with self._lock:
+      error = self._error
+      self._error = None
+    if error is not None:
+      raise error
+
+
+  def stop(self):
+    ''' Stop the worker (after it executes queued commands.) '''
+    self.commands.put(None)
+    self.thread.join()
+
+
+  # Worker thread
+
+  def _run(self):
+    while True:
+      command = self.commands.get()
+      try:
+        if command is None:
+          return
+        self._execute(command)
+        if command[0] in ('pause', 'release') or self.commands.empty():
+          self._deliver()
+      finally:
+        self.commands.task_done()
+
+
+  def _execute(self, command):
+    kind = command[0]
+    if kind == 'press':
+      self._isBroken = False
+      self.tracer.transform = command[2]
+      self.tracer.setSegmentString(SegmentSink())
+    if self._isBroken:
+      return
+    try:
+      if kind == 'press':
+        self.tracer.pointerPress(command[1])
+      elif kind == 'move':
+        self.tracer.pointerMove(command[1])
+      elif kind == 'moves':
+        self.tracer.pointerMoves(command[1])
+      elif kind == 'pause':
+        self.tracer.pointerPause()
+      else:
+        self.tracer.pointerRelease()
+    except Exception as exception:
+      self.tracer.logger.critical("Exception in ThreadedTracer worker")
+      self._isBroken = True
+      self.tracer._abandonFilterPipe()
+      self.tracer._resetState()
+      with self._lock:
+        self._error = exception
+
+
+  def _deliver(self):
+    ''' Deliver segments collected since the last delivery, as a batch. '''
+    sink = self.tracer.path
+    if sink is None or sink.countSegments() == 0:
+      return
+    self.tracer.path = SegmentSink()
+    with self._lock:
+      self._delivered.append((sink.segments, sink.segmentCuspness(), self.tracer.lastEndPointGenerated))
+    if self.notify is not None:
+      self.notify()
+
+
+
+class PipeStages(object):
+  ''' Instrument that passes to another instrument only the stages of the pipe: turn, line, curve. '''
+
+  STAGES = ('turn', 'line', 'curve')
+
+  def __init__(self, instrument):
+    self.instrument = instrument
+    self.clock = instrument.clock
+
+
+  def beginStroke(self):
+    self.instrument.beginStroke()
+
+
+  def record(self, stage, input, output, elapsed):
+    if stage in self.STAGES:
+      self.instrument.record(stage, input, output, elapsed)
@@ -0,0 +1,347 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Incremental tracer without a GUI toolkit.
+
+The pipe of filters (TurnGenerator, LineGenerator, CurveGenerator), fed by positions,
+writing segments to a sink.
+See freehand.py for discussion of the pipe and of tracing.
+
+FreehandTool (freehand.py) is a thin adapter of this to Qt:
+it feeds pointer events, runs the pause timer, maps View CS to Scene CS,
+and writes to a SegmentString (a QGraphicsPathItem.)
+
+Here:
+- positions are PointerPoints, in device CS
+- the map from device CS to the tracer's internal CS is identity (override mapFromDeviceToScene())
+- the segment string is any object with the API of SegmentString used by CurveGenerator, e.g. SegmentSink
+- the ghost is any object with the API of PointerTrackGhost, by default a NullGhost
+- the pause that flushes the pipe is the caller's call to pointerPause() (no timer.)
+
+Batch tracing
+=============
+A recorded PointerPath (all positions known before you begin) can be traced with trace().
+It calls the same filters (the bodies of the generators) in a loop, without coroutines.
+The pauses that flush the pipe come from timestamps of the positions, instead of a timer.
+See also module batch.
+'''
+
+from ..generator.turnGenerator import TurnGeneratorMixin
+from ..generator.lineGenerator import LineGeneratorMixin
+from ..generator.curveGenerator import CurveGeneratorMixin
+from ..type.pathLine import PathLine
+from ..type.pointerPoint import PointerPoint
+from ..type.freehandPoint import FreehandPoint
+from ..logger import logger
+from .nullGhost import NullGhost
+from .segmentSink import SegmentSink
+
+
+
+class Tracer(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin):
+  '''
+  Algebra of the API:
+  tracer := create use*    # A tracer can be reused, zero or more times.
+  use := setSegmentString  pointerPress (pointerMove | pointerMoves | pointerPause)* pointerRelease
+
+  Same algebra as FreehandTool, see there.
+  
+  Or, for a recorded PointerPath:
+  use := setSegmentString trace
+  '''
+  
+  '''
+  Parameter: milliseconds without a new position that is a pause, which flushes the pipe.
+  '''
+  PAUSE_TIMEOUT = 300
+
+  def __init__(self):
+    # Cooperative: a subclass may also inherit a GUI toolkit class e.g. QObject
+    super(Tracer, self).__init__()
+    # See below: _initFilterPipe creates self.turnGenerator, etc.
+    self._resetState()
+    self.path = None  # Do not reset, i.e. keep this reference to old path, for testing
+    self.instrument = None  # See setInstrument()
+    self.nestedElapsed = 0.0  # Milliseconds of stages 'append' and 'ghost', subtracted from stage 'curve'
+    self.lagMeter = None  # See setLagMeter()
+
+    self.logger = logger
+    self.logger.debug("Init Tracer")
+
+
+  def _resetState(self):
+
+    self.pathHeadGhost = None # None until setSegmentString
+
+    # API state
+    self._wasSetSegment = False
+    self._wasPointerPress = False
+    self._wasPointerMove = False
+
+    '''
+    Cache last point generated.  CurveGenerator uses this.  In frame (CS) of CurveGenerator
+    Alternative is to get it from SegmentString,
+    but that might suffer loss of precision from coordinate transformations between frames.
+    '''
+    self.lastEndPointGenerated = None
+
+    # Last position fed to pipe, resent (forced) on pointerPause()
+    self.lastSentPosition = None
+
+    # While pointerMoves(), a SegmentSink collecting segments, else None
+    self.segmentBatch = None
+
+
+  def setSegmentString(self, segmentString, pathHeadGhost=None, scenePosition=None):
+    '''
+    Client call to initialize: tell tracer the segment string it should operate upon.
+    Tracer starts writing into segmentString after pointerPress().
+    '''
+    self.path = segmentString
+    self._wasSetSegment = True
+    if pathHeadGhost is None:
+      pathHeadGhost = NullGhost()
+    self.pathHeadGhost = pathHeadGhost
+    self.pathHeadGhost.showAt(scenePosition)
+
+
+  def setInstrument(self, instrument):
+    '''
+    Optional: instrument the stages of the pipe, e.g. a freehandTool.instrument.TraceBuffer.  None: not instrumented.
+    See module instrument.  Only the incremental pipe is instrumented, not trace().
+    '''
+    self.instrument = instrument
+
+
+  def setLagMeter(self, lagMeter):
+    '''
+    Optional: measure the lag of the pipe, a core.lagMeter.LagMeter.  None: not measured.
+    '''
+    self.lagMeter = lagMeter
+
+
+  def _appendSegments(self, segments, cuspness):
+    ''' Append to segment string: stage 'append' of instrument. '''
+    if self.instrument is None:
+      self.path.appendSegments(segments, segmentCuspness=cuspness)
+    else:
+      start = self.instrument.clock()
+      self.path.appendSegments(segments, segmentCuspness=cuspness)
+      elapsed = self.instrument.clock() - start
+      self.nestedElapsed += elapsed
+      self.instrument.record('append', (segments, cuspness), None, elapsed)
+
+
+  def _updateGhost(self, update, point):
+    ''' Call update (pathHeadGhost.updateStart or updateEnd) with point: stage 'ghost' of instrument. '''
+    if self.instrument is None:
+      update(point)
+    else:
+      start = self.instrument.clock()
+      update(point)
+      elapsed = self.instrument.clock() - start
+      self.nestedElapsed += elapsed
+      self.instrument.record('ghost', point, None, elapsed)
+
+
+  def _initFilterPipe(self, startPosition):
+    '''
+    Initialize pipe of filters.
+    They feed to each other in same order of creation.
+     '''
+    self.turnGenerator = self.TurnGenerator(startPosition) # call to generator function returns a generator
+    self.turnGenerator.send(None) # Execute preamble of generator and pause at first yield
+    self.lineGenerator = self.LineGenerator(startPosition)
+    self.lineGenerator.send(None)
+    self.curveGenerator = self.CurveGenerator(PathLine.nullPathLine(startPosition))
+    self.curveGenerator.send(None)
+    self.setGenerating(True)
+
+
+  def _closeFilterPipe(self):
+    '''
+    Close generators.
+    They will finally generate SOME of final objects (i.e. turn, PathLine) to current PointerPoint.
+
+    close() is a built-in method of generators.
+
+    Closing a generator may cause it to yield, and thus invoke downstream generators in the pipeline.
+    Close generators in their order in the pipeline.
+    '''
+    self.turnGenerator.close()
+    self.lineGenerator.close()
+    self.curveGenerator.close()
+
+
+  def _abandonFilterPipe(self):
+    '''
+    Drop generators without flushing them, e.g. after an exception in the pipe.
+
+    Otherwise a generator left suspended would flush when collected (replaced by the next _initFilterPipe),
+    into the pipe and segment string of the next stroke.
+    Closed in reverse order: a flush finds its downstream generator closed, so generates nothing.
+    '''
+    for name in ('curveGenerator', 'lineGenerator', 'turnGenerator'):
+      generator = getattr(self, name, None)
+      if generator is not None:
+        try:
+          generator.close()
+        except Exception:
+          pass  # e.g. a flush sending to a closed generator
+      setattr(self, name, None)
+
+
+  def pointerPress(self, position):
+    ''' Start tracing at position (a PointerPoint.) '''
+    assert not self._wasPointerPress, 'Consecutive pointerPress'
+    assert self._wasSetSegment, 'No prior call to setSegmentString.'
+    self._initFilterPipe(position)
+    self._wasPointerPress = True
+    if self.instrument is not None:
+      self.instrument.beginStroke()
+    if self.lagMeter is not None:
+      self.lagMeter.beginStroke(position)
+
+
+  def pointerMove(self, position):
+    '''
+    Feed position (a PointerPoint) into the pipe, not forced.
+
+    Quietly ignored without prior pointerPress.
+    '''
+    if not self._wasPointerPress:
+      return
+    self.setGenerating(True)
+    if self.lagMeter is not None:
+      self.lagMeter.observeInput(position)
+    self.turnGenerator.send((position, False))
+    self.lastSentPosition = position
+
+
+  def pointerMoves(self, positions):
+    '''
+    Feed a batch of positions (PointerPoints, e.g. coalesced pointer events) into the pipe, not forced.
+
+    Same segments as pointerMove() of each position,
+    but appended to the segment string in one call, and the ghost updated once, after the batch.
+    Quietly ignored without prior pointerPress.
+    '''
+    if not self._wasPointerPress or len(positions) == 0:
+      return
+    self.setGenerating(True)
+    self.segmentBatch = SegmentSink()
+    try:
+      send = self.turnGenerator.send
+      if self.lagMeter is None:
+        for position in positions:
+          send((position, False))
+      else:
+        for position in positions:
+          self.lagMeter.observeInput(position)
+          send((position, False))
+    finally:
+      # Put what was generated, even if the pipe raised
+      batch = self.segmentBatch
+      self.segmentBatch = None
+      if batch.countSegments() > 0:
+        self._appendSegments(batch.segments, batch.segmentCuspness())
+        self._updateGhost(self.pathHeadGhost.updateStart, self.lastEndPointGenerated)
+    self.lastSentPosition = positions[-1]
+
+
+  def pointerPause(self):
+    '''
+    The pointer has paused: resend (forced) the last position sent, which flushes the pipe.
+
+    See freehand.py: FreehandTool calls this on timeout of its timer.
+    '''
+    self.turnGenerator.send((self.lastSentPosition, True))
+
+
+  def pointerRelease(self):
+    ''' End tracing. '''
+    assert self._wasPointerPress
+    if self.isGenerating():
+      # Don't close unless generating, since it flushes and creates at least one segment
+      self._closeFilterPipe()
+    else:
+      # leave pipe in initial state
+      assert self.path.countSegments() == 0
+
+    self.pathHeadGhost.hide() # Hide.  Client knows about it but shouldn't be concerned with hiding, and may be reusing it.
+    if self.lagMeter is not None:
+      self.lagMeter.endStroke()
+    self._resetState()
+
+
+  def trace(self, positions, timestamps=None):
+    '''
+    Trace a recorded PointerPath: same result as pointerPress, pointerMove (and pointerPause)..., pointerRelease.
+    
+    positions is a sequence of PointerPoint or (x, y) int pairs, the first is the pointerPress.
+    timestamps (milliseconds) is None or a sequence, same length as positions.
+    A pause is when the next position is more than PAUSE_TIMEOUT later.
+    As with a timer started by pointerMove, there is no pause after the pointerPress or last position.
+    
+    No coroutines: the bodies of the filters are called directly.
+    '''
+    assert self._wasSetSegment, 'No prior call to setSegmentString.'
+    assert not self._wasPointerPress, 'trace during pointerPress'
+    positions = [position if isinstance(position, PointerPoint) else PointerPoint(*position)
+                 for position in positions]
+    assert len(positions) > 0
+    assert timestamps is None or len(timestamps) == len(positions)
+    
+    startPosition = positions[0]
+    turnHistory = self._initTurnGenerator(startPosition)
+    lineHistory = self._initLineGenerator(startPosition)
+    curveHistory = self._initCurveGenerator(PathLine.nullPathLine(startPosition))
+    
+    lastOrdinal = len(positions) - 1
+    for ordinal in range(1, lastOrdinal + 1):
+      position = positions[ordinal]
+      turn = self._turnFromPosition(turnHistory, position, False)
+      if turn is not None:
+        line = self._lineFromTurn(lineHistory, turn, False)
+        if line is not None:
+          self._fitLine(curveHistory, line, False)
+      
+      if timestamps is not None and ordinal < lastOrdinal \
+          and timestamps[ordinal + 1] - timestamps[ordinal] > self.PAUSE_TIMEOUT:
+        # Pause: resend position, forced
+        turn = self._turnFromPosition(turnHistory, position, True)
+        line = self._lineFromTurn(lineHistory, turn, True)
+        self._fitLine(curveHistory, line, True)
+    
+    # Close, in same order as _closeFilterPipe
+    turn = self._flushedTurn(turnHistory)
+    if turn is not None:
+      self._fitLine(curveHistory, self._lineFromTurn(lineHistory, turn, True), True)
+    self._fitLine(curveHistory, self._flushedLine(lineHistory), True)
+    self.flushCurveGenerator(curveHistory)
+    
+    self.pathHeadGhost.hide()
+    self._resetState()
+  
+  
+  def isGenerating(self):
+    ''' Is pointer button down and at least one pointer position received. '''
+    return self._wasPointerMove
+
+  def setGenerating(self, truth):
+    ''' Set flag indicating closed generators, not accepting positions. '''
+    self._wasPointerMove = truth
+
+
+  def mapFromDeviceToScene(self, pointVCS):
+    '''
+    Map from device coords (pipeline input) to tracer internal CS.
+
+    Here identity, from int to real.
+    Returns FreehandPoint.
+    '''
+    return FreehandPoint(pointVCS.x(), pointVCS.y())
@@ -262,14 +262,20 @@ GUI toolkit adaption
 ====================
 As written, FreehandTool uses Qt.
 It could be adapted for other toolkits.
-From Qt we use:
-- QPointF for points and vectors.
-- QLineF for lines
+
+The pipe of filters does not use Qt: see package core.
+core.tracer.Tracer feeds the pipe and core.segmentSink.SegmentSink receives its segments.
+Points and lines (PointerPoint, FreehandPoint, PathLine) are plain Python.
+That lets you trace without a display (e.g. recorded strokes on a server.)
+
+FreehandTool is a thin adapter of Tracer. From Qt we use:
+- QTimer to know when the user has paused (or timers of a core.replayClock.ReplayClock, to replay)
 - view and scheme with an API for converting global coords to scheme coords
  and for adding graphic items to scheme
 - QGraphicPathItem for the generated drawable graphic (comprising line and curve elements),
 to represent user's stroke, 
 - OR a set of QGraphicItems for lines and segments
+Adapters convert points to QPoint/QPointF at their boundary.
 
 
 Coordinate systems (CS)
@@ -289,18 +295,16 @@ Segments are converted to Local CS (float) of SegmentString when appended.
 # !!! QTime for timing of paused forcing
 # !!! This not depend on QtGui.  SegmentString depends on QtGui.
 try:
-  from PyQt5.QtCore import QObject, QTimer
+  from PyQt5.QtCore import QObject, QTimer, QPoint, pyqtSignal as Signal
 except ImportError:
-  from PySide.QtCore import QObject, QTimer
+  from PySide.QtCore import QObject, QTimer, QPoint, Signal
 
 
 
-from .generator.turnGenerator import TurnGeneratorMixin
-from .generator.lineGenerator import LineGeneratorMixin
-from .generator.curveGenerator import CurveGeneratorMixin
-from .type.pathLine import PathLine
+from .core.tracer import Tracer
+from .core.positionQueue import PositionQueue
+from .core.threadedTracer import ThreadedTracer
 from .type.freehandPoint import FreehandPoint
-from .logger import logger
 
 
 
@@ -312,16 +316,20 @@ A generator filter is a mixin'ed method of FreeHand class.
 A generator method name is capitalized because method *appears* to be a class.
 
 !!! Note generator mixins call logger.debug() and so forth, so that must be defined in this class.
+
+The pipe itself is in core.tracer.Tracer, which does not depend on Qt.
+FreehandTool adapts it to Qt: pointer events, a timer for pauses, and a view that maps View CS to Scene CS.
 '''
 
 # Need QObject for QTime
-class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin, QObject):
+class FreehandTool(Tracer, QObject):
   '''
   Algebra of the API:
   tool := create use*    # A tool can be reused, zero or more times.
-  use := setSegmentString  pointerPressEvent pointerMoveEvent* pointerReleaseEvent
+  use := setSegmentString  pointerPressEvent (pointerMoveEvent | pointerMoveEvents)* pointerReleaseEvent
   
   pointerMoveEvent can be called zero or more times.
+  pointerMoveEvents (a batch of positions, e.g. coalesced events) is the same as pointerMoveEvent for each.
   If called zero times, the segment string will be empty.
   If called only one time, at the same position as pointerPressEvent ???
   If called only two times, the second time at the same position as pointerPressEvent (jitter.) ???
@@ -334,79 +342,131 @@ class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin,
   Call pointerReleaseEvent more than once ???
   Call pointerReleaseEvent without a prior pointerPressEvent: assertion exception.
   TODO write doctests for these
+  
+  Deferred mode (see setDeferred() and core.positionQueue):
+  pointerMoveEvent only queues the position (and moves the ghost head to the raw position.)
+  The queue is drained into the pipe when the event loop is idle, within DRAIN_BUDGET per drain.
+  A pause (timeout) or pointerReleaseEvent first drains the whole queue, so the order of positions, pauses, and release is kept.
+  
+  Threaded mode (see setThreaded() and core.threadedTracer):
+  the pipe runs on a worker thread, fed in order (press, positions, pauses, release.)
+  Segments are delivered in batches to the GUI thread (segmentsDelivered signal, deliverSegments())
+  which appends them to the SegmentString and updates the ghost.
+  pointerReleaseEvent waits for the worker, so the SegmentString is complete on return, as when not threaded.
+  
+  Profiling (see setInstrument() and module instrument):
+  with a StageProfile, the tool counts and times each stage, including appending to the SegmentString and updating the ghost.
+  
+  Lag (see setLagMeter() and core.lagMeter): pixels, positions, and milliseconds the traced path lags the pointer.
+  Measured where the pipe is fed: in deferred mode, positions still in the queue are not counted;
+  in threaded mode, measured on the worker thread (lag() can be read on the GUI thread.)
+  
+  Replay (see setClock(), replayStroke() and core.replayClock): timers on a virtual clock instead of QTimers,
+  so a recorded stroke replays at unlimited speed, its pauses flushing the pipe at the recorded timestamps.
+  '''
+  
+  # Emitted on the worker thread, received (queued) on the GUI thread
+  segmentsDelivered = Signal()
+  
+  '''
+  Parameter: capacity of queue of deferred positions.
+  When full, a pointerMoveEvent drains the queue (without a budget) and counts an overflow.
   '''
+  QUEUE_CAPACITY = 1024
+  
+  '''
+  Parameter: milliseconds per drain of queue of deferred positions, before yielding to the event loop.
+  '''
+  DRAIN_BUDGET = 4
 
   def __init__(self, view):
     super(FreehandTool, self).__init__()
-    # See below: _initFilterPipe creates self.turnGenerator, etc.
-    self._resetState()
+    self.clock = None
     self.createTimer()
-    self.path = None  # Do not reset, i.e. keep this reference to old path, for testing
-    
-    self.logger = logger
     self.logger.debug("Init FreehandTool")
     
     self.view = view
+    self.recorder = None
+    self.positionQueue = None
+    self.threadedTracer = None
+    self.governor = None
     
     
-  def _resetState(self):
-
-    self.pathHeadGhost = None # None until setSegmentString
+  def setGovernor(self, governor):
+    '''
+    Optional: adapt ALPHAMAX, frequency of ghost updates, and PAUSE_TIMEOUT to latency of pointer events and gaps.
+    governor has the API of core.governor.QualityGovernor, or is None (fixed parameters.)
+    The governor observes each position where it is fed to the pipe, with its latency: what the pipe spends on it
+    (per pointerMoveEvent, a share of a pointerMoveEvents batch, or in deferred mode a share of a drain.)
+    Not in threaded mode: the pipe runs on the worker, not measured here.
+    '''
+    assert governor is None or self.threadedTracer is None, 'setGovernor in threaded mode'
+    self.governor = governor
+    if governor is None:
+      # Class defaults
+      self.__dict__.pop('ALPHAMAX', None)
+      self.__dict__.pop('PAUSE_TIMEOUT', None)
     
-    # API state
-    self._wasSetSegment = False
-    self._wasPointerPress = False
-    self._wasPointerMove = False
     
+  def setThreaded(self, isThreaded):
     '''
-    Cache last point generated.  CurveGenerator uses this.  In frame (CS) of CurveGenerator
-    Alternative is to get it from SegmentString,
-    but that might suffer loss of precision from coordinate transformations between frames.
+    Set threaded mode (see above.)  Call between strokes.
+    Independent of deferred mode: a drain feeds the worker thread.
+    Not with a governor (see setGovernor().)
     '''
-    self.lastEndPointGenerated = None
+    assert not self._wasPointerPress, 'setThreaded during a stroke'
+    assert not isThreaded or self.governor is None, 'setThreaded with a governor'
+    if isThreaded and self.threadedTracer is None:
+      self.threadedTracer = ThreadedTracer(notify=self.segmentsDelivered.emit)
+      self.segmentsDelivered.connect(self.deliverSegments)
+    elif not isThreaded and self.threadedTracer is not None:
+      self.segmentsDelivered.disconnect(self.deliverSegments)
+      self.threadedTracer.stop()
+      self.threadedTracer = None
     
     
-  def setSegmentString(self, segmentString, pathHeadGhost, scenePosition):
+  def setDeferred(self, isDeferred):
     '''
-    Client call to initialize: tell tool the SegmentString it should operate upon.
-    Client should add segmentString graphics item to scene.
-    Tool starts writing into segmentString after pointerPressEvent().
+    Set deferred mode (see above.)  Call between strokes.
+    Statistics of the queue: self.positionQueue.statistics()
     '''
-    self.path = segmentString
-    self._wasSetSegment = True
-    self.pathHeadGhost = pathHeadGhost
-    self.pathHeadGhost.showAt(scenePosition)
-
+    assert not self._wasPointerPress, 'setDeferred during a stroke'
+    if isDeferred:
+      self.positionQueue = PositionQueue(self.QUEUE_CAPACITY)
+      self.drainTimer = self._newTimer(self.handleDrain)
+    else:
+      self.positionQueue = None
     
-  def _initFilterPipe(self, startPosition):
-    ''' 
-    Initialize pipe of filters.
-    They feed to each other in same order of creation.
-     '''
-    self.turnGenerator = self.TurnGenerator(startPosition) # call to generator function returns a generator
-    self.turnGenerator.send(None) # Execute preamble of generator and pause at first yield
-    self.lineGenerator = self.LineGenerator(startPosition) 
-    self.lineGenerator.send(None) 
-    self.curveGenerator = self.CurveGenerator(PathLine.nullPathLine(startPosition))
-    self.curveGenerator.send(None)
-    self.setGenerating(True)
-  
-  
-  def _closeFilterPipe(self):
+    
+  def setClock(self, clock):
+    '''
+    Optional: clock of the timers (pause and drain), with the API of core.replayClock.ReplayClock,
+    or None (real time, QTimers.)  Call between strokes.
+    With a ReplayClock, replayStroke() replays at unlimited speed, pausing as recorded.
     '''
-    Close generators. 
-    They will finally generate SOME of final objects (i.e. turn, PathLine) to current PointerPoint.
-    Assume we already received a pointerMoveEvent at same coords of pointerReleaseEvent.
+    assert not self._wasPointerPress, 'setClock during a stroke'
+    self.clock = clock
+    self.createTimer()
+    if self.positionQueue is not None:
+      self.drainTimer = self._newTimer(self.handleDrain)
     
-    close() is a built-in method of generators.
     
-    Closing a generator may cause it to yield, and thus invoke downstream generators in the pipeline.
-    Close generators in their order in the pipeline.
+  def setRecorder(self, recorder):
+    '''
+    Optional: record raw input (positions, timestamps, pauses, and map from View CS to Scene CS) of each stroke.
+    recorder has the API of core.strokeRecording.StrokeRecorder, or is None (not recording.)
     '''
-    self.turnGenerator.close()
-    self.lineGenerator.close()
-    self.curveGenerator.close()
+    self.recorder = recorder
+    
     
+  def setSegmentString(self, segmentString, pathHeadGhost, scenePosition):
+    '''
+    Client call to initialize: tell tool the SegmentString it should operate upon.
+    Client should add segmentString graphics item to scene.
+    Tool starts writing into segmentString after pointerPressEvent().
+    '''
+    super(FreehandTool, self).setSegmentString(segmentString, pathHeadGhost, scenePosition)
+  
   
 
   def pointerMoveEvent(self, pointerEvent):
@@ -420,10 +480,35 @@ class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin,
     if not self._wasPointerPress:
       return   # Quietly ignore this API error
     
-    self.setGenerating(True)
+    if self.governor is None or self.positionQueue is not None:
+      # Deferred: governed where the queue drains into the pipe
+      self._feedMoveEvent(pointerEvent)
+    else:
+      start = self.governor.clock()
+      self._feedMoveEvent(pointerEvent)
+      self._observe(self.governor.clock() - start, [pointerEvent.viewPos])
+  
+  
+  def _observe(self, latency, positions):
+    ''' Governor observes positions fed to the pipe in latency (milliseconds), each its share.  Take its choices. '''
+    share = latency / len(positions)
+    for position in positions:
+      self.governor.observe(share, position)
+    self.ALPHAMAX = self.governor.alphamax
+    self.PAUSE_TIMEOUT = self.governor.pauseTimeout
+  
+  
+  def _feedMoveEvent(self, pointerEvent):
+    if self.positionQueue is not None:
+      self._deferPosition(pointerEvent.viewPos)
+      self._updateGhostEnd(pointerEvent.scenePos)
+      return
+    
     try:
       position = pointerEvent.viewPos
-      self.turnGenerator.send((position, False))  # Feed pipe, not forced
+      self.pointerMove(position)  # Feed pipe, not forced
+      if self.recorder is not None:
+        self.recorder.recordPosition(position)
       self.restartTimer(position)
       assert self.timer.isActive()
     except StopIteration:
@@ -435,7 +520,39 @@ class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin,
       '''
       raise
     else: # else no exception
-      self.pathHeadGhost.updateEnd(FreehandPoint(pointerEvent.scenePos))
+      self._updateGhostEnd(pointerEvent.scenePos)
+  
+  
+  def _updateGhostEnd(self, scenePos):
+    ''' Update ghost to scenePos (QPointF), or not if the governor skips this event. '''
+    if self.governor is None or self.governor.isGhostDue():
+      self._updateGhost(self.pathHeadGhost.updateEnd, FreehandPoint(scenePos.x(), scenePos.y()))
+  
+  
+  def pointerMoveEvents(self, positions):
+    '''
+    Client feeds a batch of positions (PointerPoints in View CS, e.g. from coalesced or tablet events) into the pipe.
+    
+    Same as pointerMoveEvent for each position, but cheaper per position:
+    no PointerEvent, segments appended to the SegmentString once,
+    timer restarted once, and the ghost updated once (to the last position, mapped to Scene CS.)
+    '''
+    if not self._wasPointerPress or len(positions) == 0:
+      return   # Quietly ignore
+    
+    if self.positionQueue is not None:
+      for position in positions:
+        self._deferPosition(position)
+      self._updateGhost(self.pathHeadGhost.updateEnd, self.mapFromDeviceToScene(positions[-1]))
+      return
+    
+    self._feedPositions(positions)  # Feed pipe, not forced.  Raises StopIteration as does pointerMove
+    if self.recorder is not None:
+      for position in positions:
+        self.recorder.recordPosition(position)
+    lastPosition = positions[-1]
+    self.restartTimer(lastPosition)
+    self._updateGhost(self.pathHeadGhost.updateEnd, self.mapFromDeviceToScene(lastPosition))
   
   
   """
@@ -450,60 +567,48 @@ class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin,
     
   def pointerPressEvent(self, pointerEvent):
     ''' Client call to start freehand drawing. '''
-    assert not self._wasPointerPress, 'Consecutive pointerPressEvent'
-    assert self._wasSetSegment, 'No prior call to setSegmentString.'
-    self._initFilterPipe(pointerEvent.viewPos)
-    self._wasPointerPress = True
+    self.pointerPress(pointerEvent.viewPos)
+    if self.governor is not None:
+      self.governor.beginStroke(pointerEvent.viewPos)
+    if self.recorder is not None:
+      self.recorder.beginStroke(pointerEvent.viewPos, self.viewTransform())
     # Do not start timer until pointerMoveEvent
-    # Do not setGenerating(True) until pointerMoveEvents
 
   
   def pointerReleaseEvent(self, pointerEvent):
     ''' Client call to end freehand drawing. '''
-    assert self._wasPointerPress
     self.stopTimer()  # Can stop even if not started.
-    if self.isGenerating():
-      # Don't close unless generating, since it flushes and creates at least one segment
-      self._closeFilterPipe()
-    else:
-      # leave pipe in initial state
-      assert self.path.countSegments == 0
-      pass
-    
-    self.pathHeadGhost.hide() # Hide.  Client knows about it but shouldn't be concerned with hiding, and may be reusing it.
+    self._drainAll()
+    self.pointerRelease()
+    if self.recorder is not None:
+      self.recorder.endStroke()
     #print "Final segment count", self.path.countSegments()
-    self._resetState()
     
     
   
-  def isGenerating(self):
-    ''' Is pointer button down and at least one pointerEvent received. '''
-    return self._wasPointerMove
-  
-  def setGenerating(self, truth):
-    ''' Set flag indicating closed generators, not accepting pointerEvents. '''
-    self._wasPointerMove = truth
-  
-  
   '''
   Timer
   
-  If elapsed time in milliseconds between pointer moves is greater, flush pipeline 
-  TODO make this a parameter, and use it below.
-  MAX_POINTER_ELAPSED_FOR_SMOOTH = 100
+  If elapsed time in milliseconds between pointer moves is greater than PAUSE_TIMEOUT (see Tracer), flush pipeline 
   '''
   def createTimer(self):
-    self.timer = QTimer()
-    self.timer.setSingleShot(True)
-    self.timer.timeout.connect(self.handleTimeout)
+    self.timer = self._newTimer(self.handleTimeout)
+  
+  def _newTimer(self, callback):
+    ''' Single shot timer calling callback: a QTimer, or a timer of self.clock. '''
+    if self.clock is not None:
+      return self.clock.createTimer(callback)
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(callback)
+    return timer
     
   def restartTimer(self, position):
     '''
     Start a timer showing how long we have been at position (without receiving another position.)
     '''
-    self.lastSentPosition = position
     self.timer.stop()
-    self.timer.start(300)
+    self.timer.start(self.PAUSE_TIMEOUT)
   
   def stopTimer(self):
     self.timer.stop()
@@ -522,8 +627,130 @@ class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin,
     '''
     #print("Timeout")
     # Resend lastSentPosition, forced (flush)
-    self.turnGenerator.send((self.lastSentPosition, True))
+    self._drainAll()
+    self.pointerPause()
+    if self.recorder is not None:
+      self.recorder.recordPause()
+
+
+  def replayStroke(self, pointerEvents, timestamps):
+    '''
+    Replay a recorded stroke: pointerPressEvent, pointerMoveEvent..., pointerReleaseEvent (at the last event.)
+
+    pointerEvents: sequence of PointerEvent.  timestamps: milliseconds, one per event.
+    Requires a ReplayClock (see setClock()), advanced to each timestamp before its event:
+    timers due meanwhile fire as they would have live (handleTimeout() where the pointer paused.)
+    Deterministic, and as fast as the pipe.
+    '''
+    assert self.clock is not None, 'replayStroke without setClock'
+    assert len(pointerEvents) > 0 and len(pointerEvents) == len(timestamps)
+    self.clock.advance(timestamps[0])
+    self.pointerPressEvent(pointerEvents[0])
+    for pointerEvent, timestamp in zip(pointerEvents[1:], timestamps[1:]):
+      self.clock.advance(timestamp)
+      self.pointerMoveEvent(pointerEvent)
+    self.pointerReleaseEvent(pointerEvents[-1])
+
+
+  '''
+  Threaded mode: feeding the pipe (Tracer API) is sending commands to the worker thread.
+  '''
+  def pointerPress(self, position):
+    if self.threadedTracer is None:
+      return super(FreehandTool, self).pointerPress(position)
+    assert not self._wasPointerPress, 'Consecutive pointerPress'
+    assert self._wasSetSegment, 'No prior call to setSegmentString.'
+    # Worker is idle between strokes (see pointerRelease)
+    self.threadedTracer.tracer.ALPHAMAX = self.ALPHAMAX
+    self.threadedTracer.setInstrument(self.instrument)  # Records on the worker thread
+    self.threadedTracer.tracer.setLagMeter(self.lagMeter)
+    self.threadedTracer.pointerPress(position, self.viewTransform())
+    if self.instrument is not None:
+      # Instrument begins stroke on the worker before the GUI thread records (e.g. ghost) into it
+      self.threadedTracer.sync()
+    self._wasPointerPress = True
+  
+  def pointerMove(self, position):
+    if self.threadedTracer is None:
+      return super(FreehandTool, self).pointerMove(position)
+    if self._wasPointerPress:
+      self.threadedTracer.pointerMove(position)
+      self.lastSentPosition = position
+  
+  def pointerMoves(self, positions):
+    if self.threadedTracer is None:
+      return super(FreehandTool, self).pointerMoves(positions)
+    if self._wasPointerPress and len(positions) > 0:
+      self.threadedTracer.pointerMoves(positions)
+      self.lastSentPosition = positions[-1]
+  
+  def pointerPause(self):
+    if self.threadedTracer is None:
+      return super(FreehandTool, self).pointerPause()
+    self.threadedTracer.pointerPause()
+  
+  def pointerRelease(self):
+    if self.threadedTracer is None:
+      return super(FreehandTool, self).pointerRelease()
+    assert self._wasPointerPress
+    self.threadedTracer.pointerRelease()
+    self.threadedTracer.sync()  # Wait for worker to flush the pipe
+    try:
+      self.deliverSegments()
+      self.threadedTracer.raiseError()
+    finally:
+      self.pathHeadGhost.hide()
+      self._resetState()
+  
+  def deliverSegments(self):
+    ''' On the GUI thread: append segments delivered by the worker, in one call, and update the ghost once. '''
+    batches = self.threadedTracer.takeDelivered()
+    if not batches:
+      return
+    segments = []
+    cuspness = []
+    for batchSegments, batchCuspness, lastEndPoint in batches:
+      segments.extend(batchSegments)
+      cuspness.extend(batchCuspness)
+    self._appendSegments(segments, cuspness)
+    if lastEndPoint is not None:
+      self.lastEndPointGenerated = lastEndPoint
+      self._updateGhost(self.pathHeadGhost.updateStart, lastEndPoint)
+    
     
+  '''
+  Deferred mode: queue of positions, drained in idle time.
+  '''
+  def _deferPosition(self, position):
+    ''' Put position in queue (or if full, drain it first), restart timers. '''
+    if not self.positionQueue.put(position):
+      self._drainAll()
+      self.positionQueue.put(position)
+    if self.recorder is not None:
+      self.recorder.recordPosition(position)
+    self.restartTimer(position)
+    if not self.drainTimer.isActive():
+      self.drainTimer.start(0)  # Zero: timeout when event loop is idle
+  
+  def handleDrain(self):
+    ''' Event loop is idle: feed queued positions to the pipe, within budget.  Continue at next idle if not empty. '''
+    if not self.positionQueue.drain(self._feedPositions, self.DRAIN_BUDGET):
+      self.drainTimer.start(0)
+  
+  def _drainAll(self):
+    ''' Feed all queued positions to the pipe (before a pause or release.) '''
+    if self.positionQueue is not None:
+      self.drainTimer.stop()
+      self.positionQueue.drainAll(self._feedPositions)
+  
+  def _feedPositions(self, positions):
+    ''' Feed a batch of positions to the pipe (pointerMoves), observed by the governor if any. '''
+    if self.governor is None:
+      self.pointerMoves(positions)
+    else:
+      start = self.governor.clock()
+      self.pointerMoves(positions)
+      self._observe(self.governor.clock() - start, positions)
     
     
   """
@@ -586,14 +813,10 @@ class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin,
   def mapFromDeviceToScene(self, pointVCS):
     '''
     Map from device coords (pipeline input) to freehandTool internal CS (which is Scene CS.)
-    Result is real valued, mappable to Local CS of SegmentString.
+    Result is real valued FreehandPoint, mappable to Local CS of SegmentString.
     
     Depends on Qt.
     '''
-    '''
-    Can't: assert isinstance(pointVCS, PointerPoint), str(pointVCS),
-    since PathLine.p1(), p2() methods return QPoint.
-    '''
     assert isinstance(pointVCS.x(), int)
     assert isinstance(pointVCS.y(), int)
     
@@ -602,6 +825,19 @@ class FreehandTool(TurnGeneratorMixin, LineGeneratorMixin, CurveGeneratorMixin,
     Hack: tool knows segmentString which knows scene which knows view which can map VCS to SCS
     result = self.path.scene().views()[0].mapToScene(pointVCS)
     """
-    result = self.view.mapToScene(pointVCS) # self knows it's view which maps
-    #assert isinstance(result, QPointF)
-    return result
+    result = self.view.mapToScene(QPoint(pointVCS.x(), pointVCS.y())) # self knows it's view which maps
+    return FreehandPoint(result.x(), result.y())
+  
+  
+  def viewTransform(self):
+    '''
+    Map from View CS to Scene CS, as affine coefficients (m11, m12, m21, m22, dx, dy) (as Qt QTransform.)
+    
+    Found by mapping three points, since the view need only have mapToScene().
+    '''
+    origin = self.view.mapToScene(QPoint(0, 0))
+    unitX = self.view.mapToScene(QPoint(1, 0))
+    unitY = self.view.mapToScene(QPoint(0, 1))
+    return (unitX.x() - origin.x(), unitX.y() - origin.y(),
+            unitY.x() - origin.x(), unitY.y() - origin.y(),
+            origin.x(), origin.y())
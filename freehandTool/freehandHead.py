@@ -18,9 +18,9 @@ so that it follows the pointer track with more fidelity.
 try:
   from PyQt5.QtWidgets import QGraphicsPathItem
   from PyQt5.QtGui import QPainterPath
-  from PyQt5.QtCore import QPoint
+  from PyQt5.QtCore import QPoint, QPointF
 except ImportError:
-  from PySide.QtCore import QPoint
+  from PySide.QtCore import QPoint, QPointF
   from PySide.QtGui import QGraphicsPathItem, QPainterPath
 
 from .type.freehandPoint import FreehandPoint
@@ -86,10 +86,14 @@ class PointerTrackGhost(QGraphicsPathItem):
   def _replacePath(self):
     ''' Completely abandon the working path and replace it with a new path, from cached start/end '''
     self.path = QPainterPath()
-    self.path.moveTo(self.start)  # OLD self.floatSceneFromIntViewPoint(pointVCS))
-    self.path.lineTo(self.end)
+    self.path.moveTo(self._qPoint(self.start))  # OLD self.floatSceneFromIntViewPoint(pointVCS))
+    self.path.lineTo(self._qPoint(self.end))
     self.setPath(self.path)
     
+  def _qPoint(self, point):
+    ''' QPointF from a QPointF (from the app) or a FreehandPoint (from FreehandTool.) '''
+    return QPointF(point.x(), point.y())
+    
     
   def updateEnd(self, point):
     '''
@@ -98,7 +102,7 @@ class PointerTrackGhost(QGraphicsPathItem):
     #print "updateEnd"
     assert isinstance(point, FreehandPoint)
     self.end = point
-    self.path.lineTo(point)
+    self.path.lineTo(self._qPoint(point))
     self.setPath(self.path)
     
     
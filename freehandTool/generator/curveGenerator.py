@@ -9,10 +9,10 @@ This is free software, covered by the GNU General Public License.
 from ..segmentString.segment import LineSegment, CurveSegment
 from ..type.pathLine import PathLine
 from ..type.freehandPoint import FreehandPoint
-from ..type.pointerPoint import PointerPoint
 from ..exception import FreehandNullSegmentError
 
 from .utils.history import History
+from ..logger import DEBUG_FREEHAND
 
 
 
@@ -24,6 +24,7 @@ class CurveGeneratorMixin(object):
   >4/3 : no cusps, all splines
   potrace defaults to 1, which seems suitable for bitmap images.
   For freehand drawing, defaults to 1.2
+  An instance may override it (e.g. batch tracing with another degree of smoothing.)
   '''
   ALPHAMAX = 1.2
   
@@ -39,49 +40,20 @@ class CurveGeneratorMixin(object):
     !!! InitialLine is NullPathLine and might receive a NullPathLine as part of flushing.
     Don't assume any yielded line is not null, i.e. a very short line, from a point to the same point.
     '''
-    assert initialLine.isNullPathLine()
-    history = History(initialLine)
+    history = self._initCurveGenerator(initialLine)
     
     try:
       while True:
         newPathLine, isLineForced = (yield)
-        assert isinstance(newPathLine, PathLine), "input is a PathLine"
-        if isLineForced:
-          ''' 
-          Forced line from: 1) User pointer pause or 2) closing generators. 
-          Make cusp-like fit, regardless of angle between PathLines.
-          newPathLine is not necessarily NullPathLine.
-          '''
-          if history.end.isNullPathLine():
-            '''
-            Either never generated any segments, or already flushed by a prior user pointer pause.
-            '''
-            if newPathLine.isNullPathLine():
-              self.logger.debug("Already flushed, or empty")
-              ''' !!! This is not a return which is StopIteration: it might be a pause, followed by close. '''
-              pass
-            else:
-              segments, pathEndPoint, cuspness = self.segmentsFromLineEndToEnd(history.end, newPathLine)
-              history.updateEnd(PathLine.nullPathLine(PointerPoint(newPathLine.p2())))
-              self._putSegments(segments, pathEndPoint, cuspness)
-          else:
-            segments, pathEndPoint, cuspness = self.segmentsFromLineMidToEnd(history.end, newPathLine)
-            '''
-            !!! next element from midpoint of nullLine
-            at end point of path, but as a PointerPoint
-            not as pathEndPoint, which is a FreehandPoint
-            '''
-            # Make history show null pathLine created here, not yielded
-            history.updateEnd(PathLine.nullPathLine(PointerPoint(newPathLine.p2()))) # pathEndPoint) 
-            
-            self._putSegments(segments, pathEndPoint, cuspness)
+        if self.instrument is None:
+          self._fitLine(history, newPathLine, isLineForced)
         else:
-          ''' Fit to path, possibly a cusp. '''
-          segments, pathEndPoint, cuspness = self.segmentsFromLineMidToMid(history.end, newPathLine)  
-          # segments = nullcurveFromLines(history.end, newPathLine) # TEST
-          history.updateEnd(newPathLine)
-          # don't roll up the following stmt and stmt above, we want distinct traceback on errors
-          self._putSegments(segments, pathEndPoint, cuspness)
+          # Net of stages 'append' and 'ghost' nested in _fitLine, see Tracer.nestedElapsed
+          self.nestedElapsed = 0.0
+          start = self.instrument.clock()
+          segments = self._fitLine(history, newPathLine, isLineForced)
+          elapsed = self.instrument.clock() - start - self.nestedElapsed
+          self.instrument.record('curve', (newPathLine, isLineForced), segments, elapsed)
        
     except Exception:
       # !!! GeneratorExit is a BaseException, not an Exception
@@ -92,6 +64,74 @@ class CurveGeneratorMixin(object):
       self.flushCurveGenerator(history)
 
 
+  '''
+  The body of the generator, as methods.
+  Also called directly (without a coroutine) by batch tracing: see core.tracer.Tracer.trace()
+  '''
+  
+  def _initCurveGenerator(self, initialLine):
+    ''' Return new history (of PathLines.) '''
+    assert initialLine.isNullPathLine()
+    return History(initialLine)
+  
+  
+  def _fitLine(self, history, newPathLine, isLineForced):
+    '''
+    Fit segments for newPathLine and put them.
+    Returns the segments put, or None.
+    '''
+    assert isinstance(newPathLine, PathLine), "input is a PathLine"
+    if isLineForced:
+      ''' 
+      Forced line from: 1) User pointer pause or 2) closing generators. 
+      Make cusp-like fit, regardless of angle between PathLines.
+      newPathLine is not necessarily NullPathLine.
+      '''
+      if history.end.isNullPathLine():
+        '''
+        Either never generated any segments, or already flushed by a prior user pointer pause.
+        '''
+        if newPathLine.isNullPathLine():
+          self.logger.debug("Already flushed, or empty")
+          ''' !!! This is not a return which is StopIteration: it might be a pause, followed by close. '''
+          return None
+        else:
+          segments, pathEndPoint, cuspness = self.segmentsFromLineEndToEnd(history.end, newPathLine)
+          history.updateEnd(PathLine.nullPathLine(newPathLine.p2()))
+          self._putSegments(segments, pathEndPoint, cuspness)
+      else:
+        segments, pathEndPoint, cuspness = self.segmentsFromLineMidToEnd(history.end, newPathLine)
+        '''
+        !!! next element from midpoint of nullLine
+        at end point of path, but as a PointerPoint
+        not as pathEndPoint, which is a FreehandPoint
+        '''
+        # Make history show null pathLine created here, not yielded
+        history.updateEnd(PathLine.nullPathLine(newPathLine.p2())) # pathEndPoint) 
+        
+        self._putSegments(segments, pathEndPoint, cuspness)
+    else:
+      ''' Fit to path, possibly a cusp. '''
+      segments, pathEndPoint, cuspness = self.segmentsFromLineMidToMid(history.end, newPathLine)  
+      # segments = nullcurveFromLines(history.end, newPathLine) # TEST
+      history.updateEnd(newPathLine)
+      # don't roll up the following stmt and stmt above, we want distinct traceback on errors
+      self._putSegments(segments, pathEndPoint, cuspness)
+    if self.lagMeter is not None:
+      self._observeTraced(newPathLine, isLineForced)
+    return segments
+
+
+  def _observeTraced(self, newPathLine, isLineForced):
+    ''' Tell lag meter the end (device CS) of the segments fit to newPathLine: its end if forced, else its midpoint. '''
+    p1 = newPathLine.p1()
+    p2 = newPathLine.p2()
+    if isLineForced:
+      self.lagMeter.observeTraced(FreehandPoint(p2.x(), p2.y()))
+    else:
+      self.lagMeter.observeTraced(FreehandPoint((p1.x() + p2.x()) / 2.0, (p1.y() + p2.y()) / 2.0))
+
+
   def flushCurveGenerator(self, history):
     '''
     Assert my feeding generators have been flushed.
@@ -120,10 +160,17 @@ class CurveGeneratorMixin(object):
     '''
     Append segments and other updating.
     This is equivalent to 'send' of other generators.
+    
+    While the tracer is batching (see Tracer.pointerMoves()) append to the batch instead,
+    and defer updating the ghost.
     '''
-    self.path.appendSegments(segments, segmentCuspness=cuspness)
+    if self.segmentBatch is not None:
+      self.segmentBatch.appendSegments(segments, segmentCuspness=cuspness)
+      self.lastEndPointGenerated = pathEndPoint
+      return
+    self._appendSegments(segments, cuspness)
     self.lastEndPointGenerated = pathEndPoint # !!! global cache
-    self.pathHeadGhost.updateStart(pathEndPoint)
+    self._updateGhost(self.pathHeadGhost.updateStart, pathEndPoint)
     
   
   def segmentsFromLineMidToMid(self, line1, line2):
@@ -136,9 +183,9 @@ class CurveGeneratorMixin(object):
     
     # aliases for three points defined by two abutting PathLines
     # !!! Here we being real valued math, in a new CS (e.g. Scene)
-    point1 = FreehandPoint(self.mapFromDeviceToScene(line1.p1()))
-    point2 = FreehandPoint(self.mapFromDeviceToScene(line1.p2()))
-    point3 = FreehandPoint(self.mapFromDeviceToScene(line2.p2()))
+    point1 = self.mapFromDeviceToScene(line1.p1())
+    point2 = self.mapFromDeviceToScene(line1.p2())
+    point3 = self.mapFromDeviceToScene(line2.p2())
     
     # midpoints of PathLines
     midpoint1 = point2.interval(point1, 1/2.0)  # needed if creating QGraphicPathItem directly
@@ -154,7 +201,7 @@ class CurveGeneratorMixin(object):
     else:
         alpha = 4/3.0
 
-    if alpha > CurveGeneratorMixin.ALPHAMAX:
+    if alpha > self.ALPHAMAX:
       return self.segmentsForCusp(cuspPoint=point2, endPoint=midpoint2)
     else:
       alpha = self.clampAlpha(alpha)
@@ -163,7 +210,8 @@ class CurveGeneratorMixin(object):
       as second control point for previous spline,
       said control points are colinear and joint between consecutive splines is smooth.
       '''
-      self.logger.debug("mid to mid curve")
+      if DEBUG_FREEHAND:
+        self.logger.debug("mid to mid curve")
       return ([CurveSegment(startPoint=midpoint1,
                             controlPoint1=point1.interval(point2, 0.5+0.5*alpha), 
                             controlPoint2=point3.interval(point2, 0.5+0.5*alpha), 
@@ -183,7 +231,7 @@ class CurveGeneratorMixin(object):
     - [curve, line], cuspness = [False, True]
     '''
     midToMidsegments, endOfMidToMid, cuspness = self.segmentsFromLineMidToMid(line1, line2)
-    finalEndPoint = FreehandPoint(self.mapFromDeviceToScene(line2.p2()))  # line2.p2()
+    finalEndPoint = self.mapFromDeviceToScene(line2.p2())  # line2.p2()
     self.logger.debug("Mid to end")
     midToEnd = LineSegment(endOfMidToMid, finalEndPoint)
     return midToMidsegments + [midToEnd], finalEndPoint, cuspness + [True]
@@ -200,8 +248,8 @@ class CurveGeneratorMixin(object):
     when line1 is the initial line (a null line.)
     
     '''
-    startPoint = FreehandPoint(self.mapFromDeviceToScene(line1.p2()))
-    endPoint = FreehandPoint(self.mapFromDeviceToScene(line2.p2()))
+    startPoint = self.mapFromDeviceToScene(line1.p2())
+    endPoint = self.mapFromDeviceToScene(line2.p2())
     segment = LineSegment(startPoint, endPoint)
     # end of line2 is a cusp
     result = [segment, ], endPoint, [True, ]
@@ -219,7 +267,8 @@ class CurveGeneratorMixin(object):
     Note we already generated segment to first midpoint,
     and will subsequently generate segment from second midpoint.
     '''
-    self.logger.debug("cusp")
+    if DEBUG_FREEHAND:
+      self.logger.debug("cusp")
     try:
       # !!! Here is where we use cache
       firstSegment = LineSegment(self.lastEndPointGenerated, cuspPoint)
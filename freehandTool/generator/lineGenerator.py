@@ -9,6 +9,7 @@ This is free software, covered by the GNU General Public License.
 from ..type.pathLine import PathLine
 from .utils.constraints import Constraints
 from .utils.history import History
+from ..logger import DEBUG_FREEHAND
 
 
 
@@ -26,8 +27,7 @@ class LineGeneratorMixin(object):
     - on startup, history.isCollapsed()
     - updates history.end every iter, instead of on send().
     '''
-    turnHistory = History(initialPosition)
-    self.constraints = Constraints()
+    turnHistory = self._initLineGenerator(initialPosition)
     # directions = Directions()
     
     #turnClock = QTime.currentTime()  # note restart returns elapsed
@@ -38,28 +38,14 @@ class LineGeneratorMixin(object):
         #turnElapsedTime = turnClock.restart()
         #self.logger.debug("Turn elapsed %d", turnElapsedTime)
         #line = self.smallestLineFromPath(turnHistory.end, newTurn) # TEST 
-        
-        ##if positionElapsedTime > LineGeneratorMixin.MAX_POINTER_ELAPSED_FOR_SMOOTH:
-        if isForced:
-          self._flushUpToNewTurn(newTurn, turnHistory)
-          # assert turnHistory was updated by _flushUpToNewTurn()
+        if self.instrument is None:
+          line = self._lineFromTurn(turnHistory, newTurn, isForced)
         else:
-          line = self._lineFromPath(turnHistory, newTurn, self.constraints) # ,directions)
-          if line is not None:  # if newTurn not satisfied by vector
-            self.curveGenerator.send((line, False))
-            # self.labelLine(str(positionElapsedTime), newTurn)
-            turnHistory.roll()
-            turnHistory.updateEnd(newTurn)
-            # sent a pathLine to oldHistory.end, new turnHistory is (oldHistory.end, newTurn)
-          else: # current path (all turns) still satisfied by a PathLine.
-            # Don't send any lines, but discard intermediate turns
-            turnHistory.updateEnd(newTurn)
-            # new turnHistory is (oldHistory.start, newTurn)
-          
-          '''
-          Cannot assert not turnHistory.isCollapsed():
-          Diagonal jitter may send consecutive turns ending where we started (without violating constraints.)
-          '''
+          start = self.instrument.clock()
+          line = self._lineFromTurn(turnHistory, newTurn, isForced)
+          self.instrument.record('line', (newTurn, isForced), line, self.instrument.clock() - start)
+        if line is not None:
+          self.curveGenerator.send((line, isForced))
         
     except Exception:
       # !!! GeneratorExit is a BaseException, not an Exception
@@ -71,6 +57,47 @@ class LineGeneratorMixin(object):
       
   
   
+  '''
+  The body of the generator, as methods.
+  Also called directly (without a coroutine) by batch tracing: see core.tracer.Tracer.trace()
+  '''
+  
+  def _initLineGenerator(self, initialPosition):
+    ''' Return new history (of turns.)  Also create Constraints. '''
+    turnHistory = History(initialPosition)
+    self.constraints = Constraints()
+    return turnHistory
+  
+  
+  def _lineFromTurn(self, turnHistory, newTurn, isForced):
+    '''
+    PathLine to send to CurveGenerator for newTurn, or None.
+    
+    A forced turn always yields a (forced) PathLine.
+    '''
+    ##if positionElapsedTime > LineGeneratorMixin.MAX_POINTER_ELAPSED_FOR_SMOOTH:
+    if isForced:
+      line = self._flushUpToNewTurn(newTurn, turnHistory)
+      # assert turnHistory was updated by _flushUpToNewTurn()
+    else:
+      line = self._lineFromPath(turnHistory, newTurn, self.constraints) # ,directions)
+      if line is not None:  # if newTurn not satisfied by vector
+        # self.labelLine(str(positionElapsedTime), newTurn)
+        turnHistory.roll()
+        turnHistory.updateEnd(newTurn)
+        # sent a pathLine to oldHistory.end, new turnHistory is (oldHistory.end, newTurn)
+      else: # current path (all turns) still satisfied by a PathLine.
+        # Don't send any lines, but discard intermediate turns
+        turnHistory.updateEnd(newTurn)
+        # new turnHistory is (oldHistory.start, newTurn)
+      
+      '''
+      Cannot assert not turnHistory.isCollapsed():
+      Diagonal jitter may send consecutive turns ending where we started (without violating constraints.)
+      '''
+    return line
+  
+  
   """
   In this design, we only send one forcing line, to flush.
   It may be a null line.
@@ -83,15 +110,16 @@ class LineGeneratorMixin(object):
     '''
     Flush self from history up to newTurn.
     
-    User paused, send a forced PathLine which subsequently makes cusp-like graphic
+    User paused, return a forced PathLine (for caller to send) which subsequently makes cusp-like graphic
     Effectively, eliminate pipeline lag by generating a LinePathElement.
     '''
-    self.logger.debug("_flushUpToNewTurn %s", str(newTurn))
+    if DEBUG_FREEHAND:
+      self.logger.debug("_flushUpToNewTurn %s", newTurn)
     forcedLine = self._forcedLineFromPath(turnHistory, newTurn, self.constraints)
     # _forcedLineFromPath revised turnHistory
-    self._sendForcedLine(forcedLine)
     ##print("Forced line")
     ## For debug: self.labelLine("F" + str(positionElapsedTime), newTurn)
+    return forcedLine
     
   
   def flushLineGenerator(self, turnHistory):
@@ -100,11 +128,17 @@ class LineGeneratorMixin(object):
     Send a forced line to cause CurveGenerator to generate a segment to turnHistory.end Turn, which is the end of the PointerTrack.
     Note history is abandoned (not updated.)
     '''
+    self._sendForcedLine(self._flushedLine(turnHistory))
+    # Assert sent exactly one forcing line.
+  
+  
+  def _flushedLine(self, turnHistory):
+    ''' Forced PathLine to send when closing. Never None, but may be null. '''
     self.logger.debug("flush")
     if not turnHistory.isCollapsed():
       ''' Have turn not sent. Fabricate a PathLine and send() it now. '''
       self.logger.debug("_sendForceLine non-null line from history")
-      self._sendForcedLine(PathLine(turnHistory.start, turnHistory.end))
+      return PathLine(turnHistory.start, turnHistory.end)
     else:
       '''
       Cases where turnHistory isCollapsed()==True:
@@ -114,8 +148,7 @@ class LineGeneratorMixin(object):
       We must send a line to force the curveGenerator, but it is null.
       '''
       self.logger.debug("_sendForceLine nullPathLine")
-      self._sendForcedLine(PathLine.nullPathLine(turnHistory.end))
-    # Assert sent exactly one forcing line.
+      return PathLine.nullPathLine(turnHistory.end)
   
   
   
@@ -175,7 +208,8 @@ class LineGeneratorMixin(object):
     vectorViaAllTurns = currentTurn - history.start
       
     if constraints.isViolatedBy(vector=vectorViaAllTurns):
-      self.logger.debug("Line for constraint violation") # , constraints, "vector", vectorViaAllTurns
+      if DEBUG_FREEHAND:
+        self.logger.debug("Line for constraint violation") # , constraints, "vector", vectorViaAllTurns
       result = self._interpolateConstraintViolating(history, firstNonsatisfingTurn=currentTurn)
       # reset
       constraints.__init__()
@@ -214,7 +248,8 @@ class LineGeneratorMixin(object):
     else: # Current turn is different from history.start
       # Better to send two lines??
       result = PathLine(history.start, currentTurn)
-      self.logger.debug( "Force PathLine %s %s", str(history.start), str(currentTurn))
+      if DEBUG_FREEHAND:
+        self.logger.debug( "Force PathLine %s %s", history.start, currentTurn)
       history.collapse(currentTurn)
     # Forcing makes history collapsed on the currentTurn.
     assert history.isCollapsed()
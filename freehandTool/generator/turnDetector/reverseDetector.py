@@ -8,7 +8,7 @@ from copy import copy
 
 from .turnDetector import TurnDetector
 from ..utils.axis import Axis
-from ...logger import logger
+from ...logger import logger, DEBUG_FREEHAND
 
 
 
@@ -41,7 +41,8 @@ class ReverseDetector(TurnDetector):
     print("extreme " + str(self.extremePosition) + " isGrowingLower", str(self.isGrowingLower))
     
   def _resetToAxisUnknown(self, newStartPosition):
-    logger.debug("_resetToAxisUnknown %s", str(newStartPosition))
+    if DEBUG_FREEHAND:
+      logger.debug("_resetToAxisUnknown %s", newStartPosition)
     self._resetGrowthParameters()
     self.axis.reset(newStartPosition)
     # Can't 'assert self._size() == 1' because limits are None
@@ -138,7 +139,8 @@ class ReverseDetector(TurnDetector):
           result = None
       else:
         result = None
-    logger.debug("detectReversal %s returns %s", str(newPosition), str(result))
+    if DEBUG_FREEHAND:
+      logger.debug("detectReversal %s returns %s", newPosition, result)
     return result
   
   """
@@ -248,7 +250,8 @@ class ReverseDetector(TurnDetector):
     
     ##if result == True:
     ##  self.dumpState()
-    logger.debug("_isReversal %s returns %s", str(value), str(result))
+    if DEBUG_FREEHAND:
+      logger.debug("_isReversal %s returns %s", value, result)
     return result
       
       
@@ -8,7 +8,7 @@ This is free software, covered by the GNU General Public License.
 from turnDetector import TurnDetector
 from ..utils.axis import Axis
 from ..utils.orthogonal import areOrthogonal
-from ...logger import logger
+from ...logger import logger, DEBUG_FREEHAND
 
 
 
@@ -48,9 +48,11 @@ class SimpleTurnDetector(TurnDetector):
     Return newPosition if not on horiz or vert axis with referencePosition, else return None. 
     '''
     if not areOrthogonal(newPosition, referencePosition):
-      logger.debug("Turn %s", str(newPosition))
+      if DEBUG_FREEHAND:
+        logger.debug("Turn %s", newPosition)
       return newPosition
     else:
-      logger.debug("Not turn %s", str(newPosition))
+      if DEBUG_FREEHAND:
+        logger.debug("Not turn %s", newPosition)
       return None
 
@@ -31,41 +31,75 @@ class TurnGeneratorMixin(object):
     
     close() may come before the first send() e.g if user just clicks pointer without moving it.
     '''
-    # See below: history.start is position the last turn was generated, history.end is most recent position
-    history = History(initialPosition)
-    
     """
     positionClock = QTime.currentTime()  # note restart returns elapsed
     positionClock.restart()
     # I also tried countPositionsSinceTurn to solve lag for cusp-like
     """
     
-    self.turnDetector = TurnDetector(initialPosition)
+    history = self._initTurnGenerator(initialPosition)
     
     try:
       while True:
         newPosition, isForced = (yield) # 2nd entry point of this coroutine
-        # !!! not assert newPosition is different from any prior position, including initialPosition
-        
-        if isForced:
-          # Flush
-          self.lineGenerator.send((newPosition, True))
-          history.collapse(newPosition)
+        if self.instrument is None:
+          turn = self._turnFromPosition(history, newPosition, isForced)
         else:
-          turn = self.turnDetector.detect(newPosition, referencePosition=history.start)
-          if turn is not None:
-            self.lineGenerator.send((turn, False))
-            history.collapse(newPosition)
-          else: # path is still on an axis with history.start: wait
-            history.updateEnd(newPosition)
+          start = self.instrument.clock()
+          turn = self._turnFromPosition(history, newPosition, isForced)
+          self.instrument.record('turn', (newPosition, isForced), turn, self.instrument.clock() - start)
+        if turn is not None:
+          self.lineGenerator.send((turn, isForced))
     # Not catching general exceptions, have not found a need for it.
     except GeneratorExit:
       self.flushTurnGenerator(history)
   
+  
+  '''
+  The body of the generator, as methods.
+  Also called directly (without a coroutine) by batch tracing: see core.tracer.Tracer.trace()
+  '''
+  
+  def _initTurnGenerator(self, initialPosition):
+    ''' Return new history.  Also create TurnDetector. '''
+    # See below: history.start is position the last turn was generated, history.end is most recent position
+    history = History(initialPosition)
+    self.turnDetector = TurnDetector(initialPosition)
+    return history
+  
+  
+  def _turnFromPosition(self, history, newPosition, isForced):
+    '''
+    Turn to send to LineGenerator for newPosition, or None.
     
+    A forced position (a flush) is always sent, as a forced turn.
+    '''
+    # !!! not assert newPosition is different from any prior position, including initialPosition
+    if isForced:
+      # Flush
+      turn = newPosition
+      history.collapse(newPosition)
+    else:
+      turn = self.turnDetector.detect(newPosition, referencePosition=history.start)
+      if turn is not None:
+        history.collapse(newPosition)
+      else: # path is still on an axis with history.start: wait
+        history.updateEnd(newPosition)
+    return turn
+  
+  
   def flushTurnGenerator(self, history):
+    turn = self._flushedTurn(history)
+    if turn is not None:
+      self.lineGenerator.send((turn, True)) # force a Turn
+  
+  
+  def _flushedTurn(self, history):
+    ''' Forced turn to send when closing, or None. '''
     self.logger.debug("Flush turn generator")  
     if not history.isCollapsed():
       ''' Have position not sent. Send a turn at last known position. '''
-      self.lineGenerator.send((history.end, True)) # force a Turn 
+      return history.end
+    else:
+      return None 
 
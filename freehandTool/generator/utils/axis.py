@@ -6,7 +6,7 @@ This is free software, covered by the GNU General Public License.
 from copy import copy
 
 from .orthogonal import areOrthogonal, areVerticallyAligned, areHorizontallyAligned
-from ...logger import logger
+from ...logger import logger, DEBUG_FREEHAND
 
 
 class Axis():
@@ -65,7 +65,8 @@ class Axis():
       self.orientation = 'V'
     else:
       raise RuntimeError('Cannot determine axis.orientation from diagonal points.')
-    logger.debug('determine returns %s', str(self.orientation))
+    if DEBUG_FREEHAND:
+      logger.debug('determine returns %s', self.orientation)
     assert self.isOrientationKnown()
     
     
@@ -110,7 +111,8 @@ class Axis():
       result = not self.isOnKnownAxis(position)
     else:
       result = self.isDiagonalToStart(position)
-    logger.debug("isPositionDiagonal %s returns %s", str(position), str(result))
+    if DEBUG_FREEHAND:
+      logger.debug("isPositionDiagonal %s returns %s", position, result)
     return result
 
   def isDiagonalToStart(self, position):
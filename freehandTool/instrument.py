@@ -0,0 +1,154 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+'''
+Instrumentation of the pipe of filters, enabled at runtime (compare logger, enabled by DEBUG_FREEHAND before running.)
+
+A tracer (core.tracer.Tracer, or FreehandTool) has an instrument, None by default.
+When None, each stage of the pipe costs one test of an attribute, nothing else.
+When set (Tracer.setInstrument()), each stage calls instrument.record(stage, input, output, elapsed):
+- stage: 'turn' (TurnGenerator), 'line' (LineGenerator), 'curve' (CurveGenerator),
+  'append' (SegmentString.appendSegments), 'ghost' (PointerTrackGhost.updateStart or updateEnd)
+- input: what the stage received: (position, isForced), (turn, isForced), (pathLine, isForced),
+  (segments, cuspness), point
+- output: what the stage generated: a turn, a PathLine, a list of segments (or None); None for 'append' and 'ghost'
+- elapsed: milliseconds in the stage, not including later stages
+  (nor 'append' and 'ghost' called from within 'curve', see Tracer.nestedElapsed.)
+And the tracer calls instrument.beginStroke() at pointerPress.
+
+Objects are recorded, not formatted: formatting is only when reading events (e.g. dump()).
+
+In threaded mode (FreehandTool.setThreaded()) stages 'turn', 'line', 'curve' record on the worker thread.
+
+Instruments:
+- TraceBuffer keeps the most recent events in a ring buffer, for debugging production strokes.
+- StageProfile keeps counts and times per stage, to find which stage lags, and to catch regressions.
+'''
+
+from collections import deque, namedtuple
+import json
+import math
+import sys
+
+from .core.replayClock import milliseconds
+
+
+
+TraceEvent = namedtuple('TraceEvent', 'time stage input output elapsed')
+
+
+
+class TraceBuffer(object):
+  '''
+  Instrument keeping the last capacity TraceEvents (older events are discarded.)
+  '''
+
+  '''
+  Parameter: default capacity, count of events.
+  '''
+  CAPACITY = 4096
+
+  def __init__(self, capacity=None):
+    self.clock = milliseconds
+    self._events = deque(maxlen=capacity or self.CAPACITY)
+
+
+  def beginStroke(self):
+    pass  # Events of previous strokes are kept
+
+
+  def record(self, stage, input, output, elapsed):
+    self._events.append(TraceEvent(self.clock(), stage, input, output, elapsed))
+
+
+  def events(self, stage=None):
+    ''' List of TraceEvents, oldest first, optionally only of a stage. '''
+    if stage is None:
+      return list(self._events)
+    return [event for event in self._events if event.stage == stage]
+
+
+  def clear(self):
+    self._events.clear()
+
+
+  def dump(self, stream=None):
+    ''' Print events, one per line. '''
+    for event in self._events:
+      print("%.3f %s %s -> %s (%.3f ms)" % (event.time, event.stage, event.input, event.output, event.elapsed),
+            file=stream)
+
+
+
+class StageProfile(object):
+  '''
+  Instrument keeping, per stage: count of calls, total and percentile elapsed, count of objects emitted.
+
+  Of the current stroke (reset at beginStroke), or if not isPerStroke, since creation or reset().
+  Keeps every elapsed time of a stage, for exact percentiles: for a stroke or a benchmark, not for a session.
+  '''
+
+  '''
+  Parameter: percentiles reported by statistics().
+  '''
+  PERCENTILES = (50, 90, 99)
+
+  def __init__(self, isPerStroke=True):
+    self.clock = milliseconds
+    self.isPerStroke = isPerStroke
+    self.reset()
+
+
+  def reset(self):
+    self._elapsed = {}  # stage -> list of elapsed
+    self._emitted = {}  # stage -> count of objects generated
+    self.cusps = 0
+
+
+  def beginStroke(self):
+    if self.isPerStroke:
+      self.reset()
+
+
+  def record(self, stage, input, output, elapsed):
+    times = self._elapsed.get(stage)
+    if times is None:
+      times = self._elapsed[stage] = []
+      self._emitted[stage] = 0
+    times.append(elapsed)
+    if stage == 'append':
+      segments, cuspness = input
+      self._emitted[stage] += len(segments)
+      self.cusps += list(cuspness).count(True)
+    elif output is not None:
+      self._emitted[stage] += len(output) if stage == 'curve' else 1
+
+
+  def statistics(self):
+    '''
+    Dictionary, per stage (key 'stages'): calls, emitted (turns, PathLines, segments, segments appended; 0 for ghost),
+    time (total), max, and percentiles e.g. 'p90'.  Times in milliseconds.
+    And 'cusps': count of segments appended that are cusps.
+    '''
+    stages = {}
+    for stage, times in self._elapsed.items():
+      ordered = sorted(times)
+      stats = {'calls': len(ordered), 'emitted': self._emitted[stage], 'time': sum(ordered), 'max': ordered[-1]}
+      for percent in self.PERCENTILES:
+        stats['p%d' % percent] = _percentile(ordered, percent)
+      stages[stage] = stats
+    return {'stages': stages, 'cusps': self.cusps}
+
+
+  def dump(self, stream=None):
+    ''' Write statistics() as JSON. '''
+    json.dump(self.statistics(), stream or sys.stdout, indent=2, sort_keys=True)
+
+
+
+def _percentile(ordered, percent):
+  ''' Nearest rank percentile of a sorted, non empty list. '''
+  return ordered[max(0, int(math.ceil(percent / 100.0 * len(ordered))) - 1)]
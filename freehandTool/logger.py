@@ -10,6 +10,10 @@ The reason we do that is: the logging module is heavyweight, we don't want it on
 
 Formerly, many modules imported logging, and we disabled by:
 logging.disable(logging.WARNING)
+
+Debug calls in the pipe (called per position) are guarded, 'if DEBUG_FREEHAND: logger.debug(...)',
+and pass objects, not formatted strings, so when not debugging they cost one test.
+To inspect a running app without debugging, see module instrument.
 '''
 DEBUG_FREEHAND = False
 
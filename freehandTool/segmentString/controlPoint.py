@@ -31,23 +31,15 @@ class ControlPoint(object):
   
   def __init__(self, parentSegment, indexInParent):
     self.coordinate = None
-    self.isTraversed = False
+    self.traversalEpoch = None  # Traversal of parent SegmentString in which self was last traversed
     self.parentSegment = parentSegment
     self.indexInParent = indexInParent
   
   
-  def __eq__(self, other):
-    return self.coordinate == other.coordinate
-  
-  
-  def __hash__(self):
-    ''' 
-    Python3: if eq is defined, hash must be defined so object usable as key in hashable collection.
-    
-    indexInParent defines type? so include it in hashing.
-    Otherwise two controlpoints with same coordinate hash identically.
-    '''
-    return hash((self.coordinate.x(), self.coordinate.y(), self.indexInParent ))
+  '''
+  Equality and hash are by identity (object's default), not by coordinate:
+  a ControlPoint is mutable, and two ControlPoints (e.g. TiedTo Anchors) can be coincident.
+  '''
   
   
   def getCoordinate(self):
@@ -69,10 +61,11 @@ class ControlPoint(object):
     
     
   def getTraversed(self):
-    return self.isTraversed
+    ''' Traversed in the current traversal of the parent SegmentString (see SegmentString.clearTraversal().) '''
+    return self.traversalEpoch == self.parentSegment.parentString.traversalEpoch
   
   def setTraversed(self, value):
-    self.isTraversed = value
+    self.traversalEpoch = self.parentSegment.parentString.traversalEpoch if value else None
   
   
 
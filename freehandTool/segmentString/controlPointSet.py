@@ -0,0 +1,53 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+
+
+class ControlPointSet(object):
+  '''
+  Sequence of the ControlPoints of a SegmentString: four per segment, in order (see Segment.controlPointIter().)
+
+  Lazy: a Segment (and its ControlPoints) is instantiated when one of its ControlPoints is first got,
+  and kept, so the same index always gets the same instance.
+  So getting a ControlPointSet is O(1), and memory is in proportion to the ControlPoints an editor touches.
+  '''
+
+  CONTROL_POINTS_PER_SEGMENT = 4
+
+  def __init__(self, segmentString):
+    self.segmentString = segmentString
+    self.segments = {}  # ordinal -> Segment
+
+
+  def __len__(self):
+    return ControlPointSet.CONTROL_POINTS_PER_SEGMENT * self.segmentString.countSegments()
+
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return [self[i] for i in range(*index.indices(len(self)))]
+    if index < 0:
+      index += len(self)
+    if index < 0 or index >= len(self):
+      raise IndexError('ControlPointSet index out of range')
+    ordinal, indexInSegment = divmod(index, ControlPointSet.CONTROL_POINTS_PER_SEGMENT)
+    return self.getSegment(ordinal).controlPoints[indexInSegment]
+
+
+  def __iter__(self):
+    for ordinal in range(self.segmentString.countSegments()):
+      for controlPoint in self.getSegment(ordinal).controlPointIter():
+        yield controlPoint
+
+
+  def getSegment(self, ordinal):
+    ''' Segment instance at ordinal, instantiated once. '''
+    try:
+      return self.segments[ordinal]
+    except KeyError:
+      segment = self.segmentString._getSegmentAt(ordinal * self.segmentString.ENCODED_ELEMENTS_PER_SEGMENT)
+      self.segments[ordinal] = segment
+      return segment
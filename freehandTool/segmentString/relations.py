@@ -4,60 +4,123 @@ Copyright 2012 Lloyd Konneker
 This is free software, covered by the GNU General Public License.
 '''
 
+from .segment import TIED_TO, OPPOSITE_TO, ARM_TO
+
 
 class Relations(object):
   '''
-  Binary, symmetric relations of objects to other objects.
-  
-  Binary: relation between two objects (not three objects) 
+  Binary, symmetric relations of ControlPoints of a cubic SegmentString to other ControlPoints.
+
+  Binary: relation between two objects (not three objects)
   Symmetric: relation is commutative, A related to B implies B related to A
-  
-  Implemented as dictionary of dictionary.
-  Stores many relationTypes in same data structure.
-  
+
+  Implemented by index of ControlPoint in its ControlPointSet (4 * ordinal of segment + index in segment.)
+  The standard relations of a cubic string are implicit, arithmetic on indexes:
+  - ArmTo: Anchor 0 and Direction 1, Direction 2 and Anchor 3, of a segment
+  - OppositeTo: Anchors 0 and 3 of a segment
+  - TiedTo: Anchor 3 of a segment and Anchor 0 of the next
+  Exceptions (relate() a pair other than the standard) are stored, by (index, relationType).
+  So nothing is stored per ControlPoint, and lookups are O(1), by identity (not by the mutable coordinate.)
+
   Responsibility:
   - accept relation element (relate instance to instance)
   - get related element (instance related to given instance)
   - return whether related (is instance related)
   - clear all relations
-  
+
   '''
+
+  CONTROL_POINTS_PER_SEGMENT = 4
+  RELATION_TYPES = (TIED_TO, OPPOSITE_TO, ARM_TO)
+
   def __init__(self):
-    self.relations = {}
-    
-    
+    self.controlPoints = ()  # ControlPointSet: ControlPoint instance by index
+    self.exceptions = {}  # (index, relationType) -> index of related, or None if not related
+
+
+  def setControlPoints(self, controlPoints):
+    '''
+    Relate controlPoints (a ControlPointSet, or a sequence, four per segment in order) by the standard relations.
+    Clears exceptions.
+    '''
+    self.controlPoints = controlPoints
+    self.exceptions = {}
+
+
   def relate(self, instance1, instance2, relationType):
     '''
     Store relation between two instances.
     '''
     if instance1 is None or instance2 is None:
       return
-    # Forward relation
-    if not instance1 in self.relations:
-      self.relations[instance1] = {}
-    self.relations[instance1][relationType] = instance2
-    # Backward relation
-    if not instance2 in self.relations:
-      self.relations[instance2] = {}
-    self.relations[instance2][relationType] = instance1
-    
-    
+    index1 = self._indexOf(instance1)
+    index2 = self._indexOf(instance2)
+    assert index1 is not None and index2 is not None, 'Relate ControlPoints not in the ControlPointSet'
+    self.exceptions[(index1, relationType)] = index2
+    self.exceptions[(index2, relationType)] = index1
+
+
   def getRelatedInstance(self, instance, relationType ):
     ''' Get instance related to given instance by relationType or None. '''
-    try:
-      return self.relations[instance][relationType]
-    except KeyError:
+    index = self._indexOf(instance)
+    if index is None:
+      return None
+    relatedIndex = self._relatedIndex(index, relationType)
+    if relatedIndex is None:
       return None
-  
-  
+    return self.controlPoints[relatedIndex]
+
+
   def isRelated(self, instance, relationType):
-    return relationType in self.relations[instance]
-  
+    index = self._indexOf(instance)
+    return index is not None and self._relatedIndex(index, relationType) is not None
+
   def isSolelyRelated(self, instance, relationType):
-    return relationType in self.relations[instance] \
-      and len(self.relations[instance]) == 1
-    
+    index = self._indexOf(instance)
+    if index is None:
+      return False
+    return all((self._relatedIndex(index, otherType) is not None) == (otherType == relationType)
+               for otherType in self._relationTypes(relationType))
+
   def clear(self):
-    del self.relations
-    self.relations = {}
-  
\ No newline at end of file
+    self.controlPoints = ()
+    self.exceptions = {}
+
+
+  def _indexOf(self, instance):
+    ''' Index of ControlPoint instance in self.controlPoints, or None if it is not there (e.g. of a former set.) '''
+    segment = instance.parentSegment
+    if segment.parentString is None:
+      return None
+    index = Relations.CONTROL_POINTS_PER_SEGMENT * segment.getOrdinalInString() + instance.indexInParent
+    if index >= len(self.controlPoints) or self.controlPoints[index] is not instance:
+      return None
+    return index
+
+
+  def _relatedIndex(self, index, relationType):
+    ''' Index related to index by relationType, or None. '''
+    try:
+      return self.exceptions[(index, relationType)]
+    except KeyError:
+      pass
+    indexInSegment = index % Relations.CONTROL_POINTS_PER_SEGMENT
+    if relationType == ARM_TO:
+      return index ^ 1  # 0 with 1, 2 with 3
+    elif relationType == OPPOSITE_TO:
+      if indexInSegment == 0:
+        return index + 3
+      elif indexInSegment == 3:
+        return index - 3
+    elif relationType == TIED_TO:
+      # Not the start of the string nor the end
+      if indexInSegment == 0 and index > 0:
+        return index - 1
+      elif indexInSegment == 3 and index + 1 < len(self.controlPoints):
+        return index + 1
+    return None
+
+
+  def _relationTypes(self, relationType):
+    ''' Standard types, and types of exceptions, and relationType. '''
+    return set(Relations.RELATION_TYPES).union(key[1] for key in self.exceptions).union((relationType,))
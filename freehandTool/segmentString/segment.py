@@ -33,8 +33,8 @@ class Segment(object):
   Responsibilities:
   - produce representation as sequence of points
   - know index in parent SegmentString
-  - create ControlPoints and Relations between them (on instantiation)
-  - know relations between ControlPoints and order them
+  - create ControlPoints (on instantiation)
+  - order ControlPoints (the order that Relations depend on)
   - know endPoint and whether a ControlPoint is that endPoint
   - relay controlPointChanged
   
@@ -61,7 +61,7 @@ class Segment(object):
     Is segment in fact a point, a segment of zero length? 
     Float equality a problem?
     '''
-    result = self.controlPoints[0] == self.controlPoints[3]
+    result = self.controlPoints[0].getCoordinate() == self.controlPoints[3].getCoordinate()
     #print "isNull", result
     return result
   
@@ -83,20 +83,8 @@ class Segment(object):
   def getIndexInString(self):
     return self.indexOfSegmentInString
   
-  
-  def createRelations(self, relations, previousEndAnchor=None):
-    '''
-    Set standard relations between control points of a Bezier curve.
-    
-    Depends on segmentRole (Start, Middle, End)
-    '''
-    # Left anchor OppositeTo right anchor.
-    relations.relate(self.controlPoints[0], self.controlPoints[3], OPPOSITE_TO)
-    # Left anchor ArmTo left direction, similarly for right.
-    relations.relate(self.controlPoints[0], self.controlPoints[1], ARM_TO)
-    relations.relate(self.controlPoints[2], self.controlPoints[3], ARM_TO)
-    # Anchor of previous segment (if any) TiedTo to anchor of next segment.
-    relations.relate(self.controlPoints[0], previousEndAnchor, TIED_TO)
+  def getOrdinalInString(self):
+    return self.indexOfSegmentInString // self.parentString.ENCODED_ELEMENTS_PER_SEGMENT
     
     
   def getEndControlPoint(self):
@@ -0,0 +1,60 @@
+'''
+Copyright 2013 Lloyd Konneker
+
+This is free software, covered by the GNU General Public License.
+'''
+
+try:
+  from PyQt5.QtGui import QPainterPath
+  from PyQt5.QtCore import QPointF
+  from PyQt5.QtWidgets import QGraphicsPathItem
+except ImportError:
+  from PySide.QtCore import QPointF
+  from PySide.QtGui import QPainterPath, QGraphicsPathItem
+
+
+
+class SegmentChunk(QGraphicsPathItem):
+  '''
+  Child item of a SegmentString that paints a run of its segments (at most SegmentString.CHUNK_SEGMENTS.)
+
+  Has its own path and bounding rect, so Qt repaints, re-tessellates and hit-tests it alone
+  when its segments change.
+  In the Local CS of the SegmentString (no transform of its own.)
+
+  Its path is a working copy: appended to or rebuilt, then setPath() to self by flush().
+  '''
+
+  def __init__(self, parentString, firstOrdinal, startPointLCS):
+    super(SegmentChunk, self).__init__(parentString)
+    self.firstOrdinal = firstOrdinal  # Of its first segment in the SegmentString
+    self.count = 0
+    self.workingPath = QPainterPath(startPointLCS)
+    self.isDirty = False
+    self.setPen(parentString.pen())
+    self.setBrush(parentString.brush())
+
+
+  def appendCubic(self, pointsLCS):
+    ''' Append a segment: its three encoded points (two Direction ControlPoints, end Anchor.) '''
+    self.workingPath.cubicTo(*pointsLCS)
+    self.count += 1
+    self.isDirty = True
+
+
+  def rebuild(self, coordinates):
+    ''' Rebuild working path from coordinates of the SegmentString (see SegmentString.coordinates.) '''
+    offset = 6 * self.firstOrdinal
+    path = QPainterPath(QPointF(coordinates[offset], coordinates[offset + 1]))
+    for offset in range(offset + 2, offset + 2 + 6 * self.count, 6):
+      path.cubicTo(coordinates[offset], coordinates[offset + 1], coordinates[offset + 2],
+                   coordinates[offset + 3], coordinates[offset + 4], coordinates[offset + 5])
+    self.workingPath = path
+    self.isDirty = True
+
+
+  def flush(self):
+    ''' Show working path (Qt copies it, at most a chunk of segments.) '''
+    if self.isDirty:
+      self.setPath(self.workingPath)
+      self.isDirty = False
@@ -49,24 +49,29 @@ Segments stored internally in Local CS of QGraphicsPathItem.
 FIXME:
 ======
 
-Using indexes into QPainterPath as ID of Segment instances is fragile.
-It currently depends on all segments being the same type having the same count of elements in QPP.
+Using indexes into the internal representation (of elements, see SegmentString) as ID of Segment instances is fragile.
+It currently depends on all segments being the same type having the same count of elements.
 
 Cuspness deserialized.
 '''
 
+from array import array
+
 try:
   from PyQt5.QtGui import QPainterPath
-  from PyQt5.QtCore import QPointF
+  from PyQt5.QtCore import QPointF, QRectF, Qt
   from PyQt5.QtWidgets import QGraphicsPathItem
 except ImportError:
-  from PySide.QtCore import QPointF
+  from PySide.QtCore import QPointF, QRectF, Qt
   from PySide.QtGui import QPainterPath, QGraphicsPathItem
 
 from .segment import CurveSegment
+from ..type.freehandPoint import FreehandPoint
 from .relations import Relations
+from .controlPointSet import ControlPointSet
 from .segmentActions import segmentStringActions
 from .cuspness import Cuspness
+from .segmentChunk import SegmentChunk
 
 
 '''
@@ -104,20 +109,35 @@ class SegmentString(QGraphicsPathItem):
   ========
   
   !!! Note that appendSegments() doesn't store references to Segments passed as parameters.
-  This stores segments in an internal format (currently QPainterPath), not as Segment instances.
-  getControlPointSet() returns ControlPoint instances which refer to Segment instances,
+  This stores segments in an internal format (an array of coordinates), not as Segment instances.
+  getControlPointSet() returns a ControlPointSet whose ControlPoint instances refer to Segment instances,
   and all those persist as long as you keep the ControlPointSet.
-  
-  Internal format using QPainterPath
-  ==================================
-  A QPainterPath is a sequence of QPathElements having a PathElementType.
-  For a cubic curve, there are three consecutive QPathElements of type CubicTo.
-  QPainterPath is not updateable, only appendable.
-  
-  !!! Here, the first QPathElement is type MoveTo, followed by 3-tuples of PathElements of type CubicTo.
-  !!! Currently, no support for other PathElementTypes (i.e. no LineTo)
-  !!! Our segment is extracted as a 4-tuple comprising the last PathElement (the endPoint)
-  of one 3-tuple and three PathElements of the next 3-tuple.
+  Relations between ControlPoints are by index in the ControlPointSet (see Relations), not stored per ControlPoint.
+  
+  Internal format: array of coordinates
+  =====================================
+  self.coordinates is a growable array of float, (x, y) of elements, in Local CS.
+  It is the source of truth.  Appending is amortized O(1), and an element is updateable in place.
+  
+  Elements are run-encoded as in a QPainterPath:
+  !!! the first element is the start point (a MoveTo), followed by 3-tuples of elements (a CubicTo):
+  two Direction ControlPoints and the end Anchor ControlPoint.
+  !!! Currently, no support for other types (i.e. no LineTo)
+  !!! Our segment is extracted as a 4-tuple comprising the last element (the endPoint)
+  of one 3-tuple and three elements of the next 3-tuple.
+  
+  Painting in chunks
+  ==================
+  This item paints nothing itself.  Child items (SegmentChunk) each paint a run of CHUNK_SEGMENTS segments,
+  with their own QPainterPath and bounding rect.
+  Appending touches only the tail chunk; updating a segment rebuilds only its chunk
+  (and the next, when the segment's end Anchor starts the next chunk.)
+  So Qt repaints, re-tessellates and hit-tests in proportion to the changed area, not to the length of self.
+  
+  Pen and brush of self apply to its chunks.  A hit test (e.g. QGraphicsScene.items()) finds chunks:
+  their parentItem() is self.  A hit test of self (contains(), collidesWithPath()) does not union the chunks (shape()):
+  it asks only the chunks whose bounding rect intersects the point or path.
+  The bounding rect of self is the union of control points appended or updated (it does not shrink.)
   
   ControlPoint Roles and Types
   ============================
@@ -151,6 +171,12 @@ class SegmentString(QGraphicsPathItem):
   ELEMENTS_PER_SEGMENT = 4
   ENCODED_ELEMENTS_PER_SEGMENT = 3
   
+  '''
+  Parameter: count of segments per chunk (child item) painted.
+  Larger: fewer items.  Smaller: less to copy and re-tessellate per change.
+  '''
+  CHUNK_SEGMENTS = 32
+  
   def __init__(self):
     super(SegmentString, self).__init__()
     self.actions = segmentStringActions # singleton
@@ -163,8 +189,16 @@ class SegmentString(QGraphicsPathItem):
     
     self.cachedEndFreehandPoint = None
     
-    self.setPath(QPainterPath(self.origin()))
-    # ensure: path has been set, self.myPath() returns "MoveTo(0,0)"
+    origin = self.origin()
+    self.coordinates = array('d', (origin.x(), origin.y()))
+    self.chunks = []
+    self._dirtyChunks = []
+    self._staleChunks = []  # Chunks to rebuild from self.coordinates
+    self._editDepth = 0  # Nesting of beginEdit()
+    self._changedSegments = {}  # index of segment -> Segment, changed in the current edit
+    self.traversalEpoch = 0
+    self._bounds = [origin.x(), origin.y(), origin.x(), origin.y()]  # left, top, right, bottom
+    # ensure: self.myPath() returns "MoveTo(0,0)"
   
   
   '''
@@ -172,10 +206,10 @@ class SegmentString(QGraphicsPathItem):
   '''
   def myPath(self):
     '''
-    QPainterPath i.e. internal representation.
+    QPainterPath of self, in Local CS.
     
-    Explicitly calls QGraphicsPathItem.path(), since a class that inherits this class
-    may reimplement path(), and then a call from this module to self.path() would
+    Not QGraphicsPathItem.path(), which this does not set.
+    A class that inherits this class may reimplement path(), and then a call from this module to self.path() would
     find the reimplemented method via the MRO.
     (For example, a class that inherits may redefine path() to return a one pixel larger path, etc.)
     
@@ -183,8 +217,100 @@ class SegmentString(QGraphicsPathItem):
     
     Public since importers of this module (library) may want it,
     but note that it is a copy, not updateable to any effect.
+    Built from self.coordinates: O(segments.)
     '''
-    return super(SegmentString, self).path()
+    coordinates = self.coordinates
+    path = QPainterPath(QPointF(coordinates[0], coordinates[1]))
+    for offset in range(2, len(coordinates), 6):
+      path.cubicTo(coordinates[offset], coordinates[offset + 1], coordinates[offset + 2],
+                   coordinates[offset + 3], coordinates[offset + 4], coordinates[offset + 5])
+    return path
+  
+  
+  def path(self):
+    ''' Reimplemented: QGraphicsPathItem.path() is not set, see myPath(). '''
+    return self.myPath()
+  
+  
+  '''
+  Painting (reimplemented QGraphicsPathItem): chunks paint.
+  '''
+  def paint(self, painter, styleOption, widget=None):
+    pass
+  
+  def boundingRect(self):
+    # Half the pen outside the control points (at least half a pixel for a cosmetic pen)
+    margin = max(self.pen().widthF(), 1.0) / 2
+    left, top, right, bottom = self._bounds
+    return QRectF(left - margin, top - margin, right - left + 2 * margin, bottom - top + 2 * margin)
+  
+  def shape(self):
+    '''
+    Union of shapes of chunks: O(segments.)
+    Not used by hit tests of self (see contains(), collidesWithPath()), only when another item tests collision with self.
+    '''
+    result = QPainterPath()
+    for chunk in self.chunks:
+      result.addPath(chunk.shape())
+    return result
+  
+  def contains(self, pointLCS):
+    return any(chunk.contains(pointLCS) for chunk in self.chunks if chunk.boundingRect().contains(pointLCS))
+  
+  def collidesWithPath(self, path, mode=Qt.IntersectsItemShape):
+    '''
+    Reimplemented: as QGraphicsItem, without shape() of self.
+    Asks only the chunks whose bounding rect intersects path's (chunks are in the Local CS of self.)
+    '''
+    if mode in (Qt.IntersectsItemBoundingRect, Qt.ContainsItemBoundingRect):
+      return super(SegmentString, self).collidesWithPath(path, mode)
+    if not self.chunks:
+      return False
+    if mode == Qt.ContainsItemShape:
+      # Shape of self is contained if shape of every chunk is
+      return all(chunk.collidesWithPath(path, mode) for chunk in self.chunks)
+    rect = path.controlPointRect()
+    return any(chunk.collidesWithPath(path, mode) for chunk in self.chunks if chunk.boundingRect().intersects(rect))
+  
+  def setPen(self, pen):
+    super(SegmentString, self).setPen(pen)
+    for chunk in self.chunks:
+      chunk.setPen(pen)
+  
+  def setBrush(self, brush):
+    super(SegmentString, self).setBrush(brush)
+    for chunk in self.chunks:
+      chunk.setBrush(brush)
+  
+  def _tailChunk(self, startPointLCS):
+    ''' Chunk to append a segment to: the last, or a new one (starting at startPointLCS) if it is full. '''
+    if not self.chunks or self.chunks[-1].count >= SegmentString.CHUNK_SEGMENTS:
+      self.chunks.append(SegmentChunk(self, self.countSegments(), startPointLCS))
+    return self.chunks[-1]
+  
+  def _markDirty(self, chunk):
+    if not chunk.isDirty:
+      self._dirtyChunks.append(chunk)
+  
+  def _flushChunks(self):
+    ''' Show changes of chunks (once per call of appendSegments(), moveRelated() etc., not per segment.) '''
+    for chunk in self._staleChunks:
+      self._markDirty(chunk)
+      chunk.rebuild(self.coordinates)
+    self._staleChunks = []
+    for chunk in self._dirtyChunks:
+      chunk.flush()
+    self._dirtyChunks = []
+  
+  def _includeInBounds(self, pointsLCS):
+    ''' Grow bounding rect to include pointsLCS. '''
+    xs = [point.x() for point in pointsLCS]
+    ys = [point.y() for point in pointsLCS]
+    left, top, right, bottom = self._bounds
+    bounds = [min(left, min(xs)), min(top, min(ys)), max(right, max(xs)), max(bottom, max(ys))]
+    if bounds != self._bounds:
+      self.prepareGeometryChange()
+      self._bounds = bounds
 
 
   '''
@@ -253,8 +379,7 @@ class SegmentString(QGraphicsPathItem):
     Note elementAt returns type Element in PyQt, and PyQt complains later (PySide did not.)
     Convert to QPointF.  Note Element.x is a property, not a method.
     '''
-    startElement = self.myPath().elementAt(0)
-    return QPointF(startElement.x, startElement.y)
+    return QPointF(self.coordinates[0], self.coordinates[1])
   
   
   '''
@@ -263,10 +388,13 @@ class SegmentString(QGraphicsPathItem):
   Self is a QGraphicsItem which knows how to map from Local to Scene.
   '''
   def _mapFromSceneToLocal(self, pointSCS):
-    return self.mapFromScene(pointSCS)
+    ''' FreehandPoint in Scene CS to QPointF in Local CS. '''
+    return self.mapFromScene(QPointF(pointSCS.x(), pointSCS.y()))
   
   def _mapFromLocalToScene(self, pointLCS):
-    return self.mapToScene(pointLCS)
+    ''' QPointF in Local CS to FreehandPoint in Scene CS. '''
+    pointSCS = self.mapToScene(pointLCS)
+    return FreehandPoint(pointSCS.x(), pointSCS.y())
     
     
     
@@ -311,11 +439,7 @@ class SegmentString(QGraphicsPathItem):
     
     cuspness is [Bool,] equal in length to segments and tells whether each segment is a cusp.
     
-    !!! The QPainterPath instance returned by QGraphicsPathItem.path() is a copy
-    and when appended to does not change the display.
-    IOW QGraphicsPathItem keeps a copy when you call setPath()
-    
-    FUTURE might be faster to union existing path with new path.
+    Amortized O(1) per segment: appends to self.coordinates and to the painting path, repaints once.
     '''
     ##print "Append segments", segments
     
@@ -328,15 +452,10 @@ class SegmentString(QGraphicsPathItem):
     if len(segments) <= 0:
       return
 
-    pathCopy = self.myPath()
-    inSegmentOrdinal = 0
-    previousSegmentCount = self.countSegments()
-    for segment in segments:
-      self._appendSegmentToPath(segment, pathCopy)
-      newSegmentCount = self.countSegments()
-      if  newSegmentCount == previousSegmentCount + 1 :
+    for segment, isCusp in zip(segments, segmentCuspness):
+      if self._appendSegment(segment):
         # was effective, remember cuspness
-        if segmentCuspness[inSegmentOrdinal]:
+        if isCusp:
           # !!! Store cuspness indexed by segment ordinal, NOT index
           self.cuspness.setCuspness(self.countSegments() - 1)
       else:
@@ -345,25 +464,33 @@ class SegmentString(QGraphicsPathItem):
         It doesn't matter visually, or to the generators.
         '''
         pass
-      previousSegmentCount = newSegmentCount
-      inSegmentOrdinal += 1
-      
-    # !!! pathCopy is NOT an alias for self.myPath() now, they differ.  Hence:
-    self.setPath(pathCopy)
+    self._flushChunks()
     
     '''
     NOT ensure self.countSegments() == previousSegmentCount + len(segments)
-		since SegmentString may have refused to append a segment.
-		'''
-    
-    # TEST try to alter the path: has no effect, QPathElements are constants??
-    #pathCopy.elementAt(1).x += 20
-    #self.setPath(pathCopy)
+    since SegmentString may have refused to append a segment.
+    '''
+
+
+  def appendControlPoints(self, controlPoints, segmentCuspness):
+    '''
+    Append segments given as packed control points (e.g. from batch tracing, see core.arrayTrace.)
+
+    controlPoints is a sequence (e.g. numpy array shape (n, 4, 2)) of four (x, y) per segment, in Scene CS.
+    segmentCuspness is a sequence of Bool, equal in length.
+    Same as appendSegments(), without Segment instances.
+    '''
+    for points, isCusp in zip(controlPoints, segmentCuspness):
+      # As in appendSegments(), a null segment (after coordinate conversion) is refused
+      if self.appendInternalRepr([self._mapFromSceneToLocal(FreehandPoint(x, y)) for x, y in points]) and isCusp:
+        # Ordinal of appended segment
+        self.cuspness.setCuspness(self.countSegments() - 1)
+    self._flushChunks()
 
 
-  def _appendSegmentToPath(self, segment, path):
+  def _appendSegment(self, segment):
     ''' 
-    Append Segment instance to path, converting to Local CS.
+    Append Segment instance, converting to Local CS.  Returns whether effective.
     
     assert Segment in VCS !!!
     Not assert Segment coordinates are integers, since freehand works in float.
@@ -377,21 +504,34 @@ class SegmentString(QGraphicsPathItem):
     '''
     !!! Now the segment might be null, due to floating point errors.
     So this may not be effective: may not append anything.
-    If caller requires effectiveness, caller must check that path is increased.
     '''
-    self.appendInternalRepr(path, pointsLCS)
+    return self.appendInternalRepr(pointsLCS)
     
     
-  def appendInternalRepr(self, path, pointsLCS):
+  def appendInternalRepr(self, pointsLCS):
     '''
-    Append internal repr of segment for given pointsLCS.
+    Append internal repr of segment for given pointsLCS.  Returns whether effective.
     
     !!! This should be the only place where we know that internal repr is cubicTo (even for straight lines.)
     !!! and cubicTo has 3 points of Segment's 4 points.
+    
+    As QPainterPath.cubicTo(), refuses a null segment: all points at the current end point.
     '''
     assert len(pointsLCS) == SegmentString.ELEMENTS_PER_SEGMENT
     #print "appendInternalRep", pointsLCS
-    path.cubicTo(*pointsLCS[1:])
+    coordinates = self.coordinates
+    endX, endY = coordinates[-2], coordinates[-1]
+    points = pointsLCS[1:]
+    if all(point.x() == endX and point.y() == endY for point in points):
+      return False
+    chunk = self._tailChunk(QPointF(endX, endY))
+    for point in points:
+      coordinates.append(point.x())
+      coordinates.append(point.y())
+    self._markDirty(chunk)
+    chunk.appendCubic(points)
+    self._includeInBounds(points)
+    return True
   
   
   def segmentChanged(self, segment, indexOfSegmentInString):
@@ -407,28 +547,69 @@ class SegmentString(QGraphicsPathItem):
     '''
     Update drawable with changed segment.
     
-    Understands that internal format self.myPath() is not updateable.
-    Thus it is copy into new, with one changed segment in the middle.
-    IE copies prefix, appends changed Segment, copies suffix.
+    At once, or in an edit (see beginEdit()), when the edit is committed:
+    a segment changed many times in an edit is updated once, from its last state.
     '''
-    # startingPoint same as existing path, NOT origin()
+    self.beginEdit()
+    self._changedSegments[indexOfSegmentInString] = segment
+    self.commitEdit()
+  
+  
+  def _writeSegment(self, segment, indexOfSegmentInString):
     '''
-    Wierdness: Qt docs not show constructor QPainterPath(QPainterPathElement) 
-    but QPainterPathElement is duck-typed to QPointF.
+    Write the three encoded elements of segment in place (the start point is the previous segment's end.)
+    Returns its points in Local CS.  Marks stale the chunk holding the segment, and the next chunk if it starts at the segment's end.
+    
+    An updated segment may be null: it is kept (unlike an appended null segment), so cuspness stays one-to-one.
     '''
-
-    # !!! TODO check that appending is effective.
-    # The updated segment may be null to its predecessor or successor.
-    # Then cuspness is whack
-    startPoint = self.getStartPointLCS()
-    newPath = QPainterPath(startPoint)  # self.myPath().elementAt(0))
-    for segmentIndex in self._segmentIndexGenerator():
-      if segmentIndex == indexOfSegmentInString:
-        self._appendSegmentToPath(segment, newPath)
-      else:
-        self._copySegmentPathToPath(sourcePath=self.myPath(), destinationPath=newPath, segmentIndex=segmentIndex)
-    # Invariant: SegmentString.getEndPoint is correct even case last segment updated
-    self.setPath(newPath)
+    pointsLCS = list(map(self._mapFromSceneToLocal, segment.asPointsScene()))[1:]
+    offset = 2 * (indexOfSegmentInString + 1)
+    for point in pointsLCS:
+      self.coordinates[offset] = point.x()
+      self.coordinates[offset + 1] = point.y()
+      offset += 2
+    ordinal = indexOfSegmentInString // SegmentString.ENCODED_ELEMENTS_PER_SEGMENT
+    chunkOrdinal = ordinal // SegmentString.CHUNK_SEGMENTS
+    chunkOrdinals = [chunkOrdinal]
+    if (ordinal + 1) % SegmentString.CHUNK_SEGMENTS == 0 and chunkOrdinal + 1 < len(self.chunks):
+      chunkOrdinals.append(chunkOrdinal + 1)
+    for chunkOrdinal in chunkOrdinals:
+      chunk = self.chunks[chunkOrdinal]
+      if chunk not in self._staleChunks:
+        self._staleChunks.append(chunk)
+    return pointsLCS
+  
+  
+  '''
+  Edits: transactions that coalesce changes of many ControlPoints into one update.
+  
+  Algebra of the API:
+  edit := beginEdit (ControlPoint.updateCoordinate | moveRelated | moveSelection | edit)* commitEdit
+  
+  Edits nest: only the outermost commitEdit() updates.
+  Until then, self.coordinates (and so myPath(), shape() etc.) are as before the edit: the Segments and ControlPoints are current.
+  On commit: each changed segment is written once, the bounding rect changes at most once (one prepareGeometryChange()),
+  and each changed chunk is rebuilt and repainted once.
+  '''
+  def beginEdit(self):
+    self._editDepth += 1
+  
+  
+  def commitEdit(self):
+    assert self._editDepth > 0, 'commitEdit without beginEdit'
+    self._editDepth -= 1
+    if self._editDepth > 0 or not self._changedSegments:
+      return
+    pointsLCS = []
+    for index, segment in self._changedSegments.items():
+      pointsLCS.extend(self._writeSegment(segment, index))
+    self._changedSegments = {}
+    self._includeInBounds(pointsLCS)
+    self._flushChunks()
+  
+  
+  def isEditing(self):
+    return self._editDepth > 0
         
       
   def _segmentIndexGenerator(self):
@@ -455,14 +636,16 @@ class SegmentString(QGraphicsPathItem):
     2              7              3
     3              10             6
     '''
-    # Truncate float
-    result = int(self.myPath().elementCount()/SegmentString.ENCODED_ELEMENTS_PER_SEGMENT)
-    return result
+    return self._countElements() // SegmentString.ENCODED_ELEMENTS_PER_SEGMENT
+  
+  
+  def _countElements(self):
+    return len(self.coordinates) // 2
   
   
   def _indexOfLastSegment(self):
     # assert self.countSegments() > 0
-    result = self.myPath().elementCount() - SegmentString.ELEMENTS_PER_SEGMENT
+    result = self._countElements() - SegmentString.ELEMENTS_PER_SEGMENT
     if result < 0:
       return None
     else:
@@ -476,34 +659,24 @@ class SegmentString(QGraphicsPathItem):
     Used for example to approximately graphics pick a segment.
     '''
     for index in self._segmentIndexGenerator():
-      segmentPoints = self._pointsLCSInPathForSegment(self.myPath(), index)
+      segmentPoints = self._pointsLCSForSegment(index)
       # First and last points are start and end
       yield segmentPoints[0], segmentPoints[3]
       
   
-  def _copySegmentPathToPath(self, sourcePath, destinationPath, segmentIndex):
-    ''' Use elements of a segment from sourcePath to append a segment to destinationPath. '''
-    pointsLCS = self._pointsLCSInPathForSegment(sourcePath,segmentIndex)
-    self.appendInternalRepr(path=destinationPath, pointsLCS=pointsLCS)
-  
-  
-  def _pointsLCSInPathForSegment(self, path, segmentIndex):
+  def _pointsLCSForSegment(self, segmentIndex):
     ''' 
-    Return list of QPointF for QPathElements of segment.
+    Return list of QPointF for elements of segment.
     Points are in LCS
     !!! This is a 4-tuple, for creating Segment, one extra for creating internal repr
     '''
-    result = []
-    for i in range(0, SegmentString.ELEMENTS_PER_SEGMENT):
-      result.append(self._unmappedPointForPathElement(element = path.elementAt(segmentIndex + i)))
-    return result
-    
-  def _unmappedPointForPathElement(self, element):
-    ''' Point in LCS for element. '''
-    return QPointF(element.x, element.y)
+    coordinates = self.coordinates
+    offset = 2 * segmentIndex
+    return [QPointF(coordinates[offset + 2 * i], coordinates[offset + 2 * i + 1])
+            for i in range(0, SegmentString.ELEMENTS_PER_SEGMENT)]
   
-  def _pointsSCSInPathForSegment(self, path, segmentIndex):
-    return map(self._mapFromLocalToScene, self._pointsLCSInPathForSegment(path, segmentIndex))
+  def _pointsSCSForSegment(self, segmentIndex):
+    return map(self._mapFromLocalToScene, self._pointsLCSForSegment(segmentIndex))
   
     
   '''
@@ -513,22 +686,14 @@ class SegmentString(QGraphicsPathItem):
   '''
   def getControlPointSet(self):
     '''
-    Instantiate for self:
-    - ControlPoints
-    - Segments
-    - Relations (among ControlPoints)
-    Returns list of ControlPoint.
+    A new ControlPointSet for self: sequence of ControlPoint, four per segment.
+    Relations (among ControlPoints) are of that set.
+    
+    O(1): ControlPoints and Segments are instantiated as got (see ControlPointSet), and Relations are implicit.
     '''
     # NOT assert self.controlPointSet is None
-    self.relations.clear()
-    result = []
-    previousEndControlPoint = None
-    for segmentIndex in self._segmentIndexGenerator():
-      segment = self._getSegmentAt(segmentIndex)
-      for controlPoint in segment.controlPointIter():
-        result.append(controlPoint)
-      segment.createRelations(relations=self.relations, previousEndAnchor=previousEndControlPoint)
-      previousEndControlPoint = segment.getEndControlPoint()
+    result = ControlPointSet(self)
+    self.relations.setControlPoints(result)
     self.controlPointSet = result # Remember my own ControlPoint set
     # FIXME: above does NOT allow for many views of same SegmentString
     return result
@@ -546,7 +711,7 @@ class SegmentString(QGraphicsPathItem):
     assert segmentIndex >= 0 and segmentIndex <= self._indexOfLastSegment()
     assert self.countSegments() > 0
     
-    pointsFromPath = self._pointsSCSInPathForSegment(self.myPath(), segmentIndex)
+    pointsFromPath = self._pointsSCSForSegment(segmentIndex)
     # assert points are Scene CS
     segment = CurveSegment(*pointsFromPath)
     # assert ControlPoints were created and refer to segment
@@ -556,9 +721,12 @@ class SegmentString(QGraphicsPathItem):
   
   
   def clearTraversal(self):
-    ''' Clear traversal flags to prepare for new traversal. '''
-    for controlPoint in self.controlPointSet:
-      controlPoint.setTraversed(False)
+    '''
+    Clear traversal flags to prepare for new traversal.
+    
+    O(1): begins a new traversal (epoch); a ControlPoint is traversed only if marked in the current one.
+    '''
+    self.traversalEpoch += 1
   
   
   '''
@@ -566,22 +734,50 @@ class SegmentString(QGraphicsPathItem):
   '''
   
   def moveRelated(self, controlPoint, deltaCoordinate, alternateMode):
-    ''' Move (translate) controlPoint and set of related controlPoints. '''
+    '''
+    Move (translate) controlPoint and set of related controlPoints.
+    
+    Cost depends on the count of ControlPoints moved, not on the length of self:
+    an edit (see beginEdit()), updated once on return.
+    '''
     self.clearTraversal() # movement by traversal of relations
-    # delegate to strategy/policy
-    self.actions.moveRelated(self.relations, controlPoint, deltaCoordinate, alternateMode)
+    self.beginEdit()
+    try:
+      # delegate to strategy/policy
+      self.actions.moveRelated(self.relations, controlPoint, deltaCoordinate, alternateMode)
+    finally:
+      self.commitEdit()
+  
+  
+  def moveSelection(self, controlPoints, deltaCoordinate, alternateMode):
+    '''
+    Move (translate) many controlPoints (e.g. a multi-selection, or every Anchor), each with its set of related controlPoints.
+    
+    One traversal: a ControlPoint related to several selected is moved once, and a selected ControlPoint
+    already moved as related to another is not moved again.
+    One edit: updated once on return.
+    '''
+    self.clearTraversal()
+    self.beginEdit()
+    try:
+      for controlPoint in controlPoints:
+        if not controlPoint.getTraversed():
+          self.actions.moveRelated(self.relations, controlPoint, deltaCoordinate, alternateMode)
+    finally:
+      self.commitEdit()
   
   
   '''
   6. maintain cusps and return cuspness of a segment
   '''
   def isSegmentCusp(self, segmentIndex):
-    # FIXME index are confused with ordinals
-    assert segmentIndex >= 0 and segmentIndex < self.countSegments()
-    return self.cuspness.isCusp(segmentIndex)
+    ''' segmentIndex is an index (see _segmentIndexGenerator()), not an ordinal.  Cuspness is by ordinal. '''
+    segmentOrdinal = segmentIndex // SegmentString.ENCODED_ELEMENTS_PER_SEGMENT
+    assert segmentOrdinal >= 0 and segmentOrdinal < self.countSegments()
+    return self.cuspness.isCusp(segmentOrdinal)
     
   def setSegmentCuspness(self, segmentIndex):
-    self.cuspness.setCuspness(segmentIndex)
+    self.cuspness.setCuspness(segmentIndex // SegmentString.ENCODED_ELEMENTS_PER_SEGMENT)
 
 
   
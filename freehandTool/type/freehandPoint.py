@@ -3,10 +3,6 @@ Copyright 2012 Lloyd Konneker
 
 This is free software, covered by the GNU General Public License.
 '''
-try:
-  from PyQt5.QtCore import QPointF
-except ImportError:
-  from PySide.QtCore import QPointF
 
 
 def sign(x):
@@ -19,35 +15,81 @@ def sign(x):
       return 0
 
 
-class FreehandPoint(QPointF):
+def fuzzyEqual(a, b):
+  '''
+  Equality of floats, with the same tolerance as Qt's QPointF operator==
+  (qFuzzyCompare, or qFuzzyIsNull when either operand is zero.)
+
+  So that results (e.g. which segments are null) are the same as when FreehandPoint wrapped QPointF.
+  '''
+  if a == 0.0 or b == 0.0:
+    return abs(a - b) <= 0.000000000001
+  else:
+    return abs(a - b) * 1000000000000.0 <= min(abs(a), abs(b))
+
+
+class FreehandPoint(object):
   '''
   Real valued point.
   Used in CurveGenerator, where math is real.
   "Freehand" here means: internal to freehand tool, but also real valued.
-    
+
   Methods also return real valued points.
-  
-  Thin wrapper of implementation in Qt.
-  
+
+  Plain Python, so that the tracing pipeline does not depend on a GUI toolkit.
+  (Formerly a thin wrapper of Qt QPointF: same API, x() and y() methods, and same fuzzy equality.)
+  Adapters to the GUI toolkit convert at their boundary.
+
   This module doesn't care what coordinate system (CS or frame) points are in
   (but in Freehand, they are all be in the same frame.)
   '''
-  
+
+  __slots__ = ('_x', '_y')
+
+  def __init__(self, x=0.0, y=0.0):
+    self._x = float(x)
+    self._y = float(y)
+
+  def x(self):
+    return self._x
+
+  def y(self):
+    return self._y
+
+
+  def __eq__(self, other):
+    return fuzzyEqual(self._x, other.x()) and fuzzyEqual(self._y, other.y())
+
+  def __ne__(self, other):
+    return not self.__eq__(other)
+
+  # Fuzzy equality is not compatible with hashing by value
+  __hash__ = None
+
+  def __add__(self, other):
+    return FreehandPoint(self._x + other.x(), self._y + other.y())
+
+  def __sub__(self, other):
+    return FreehandPoint(self._x - other.x(), self._y - other.y())
+
+  def __repr__(self):
+    return "FreehandPoint(" + repr(self._x) + ", " + repr(self._y) + ")"
+
+
   def interval(self, other, fraction):
-    ''' 
-    Return point fractionally along line from self to other 
+    '''
+    Return point fractionally along line from self to other
     I.E. fractional sect (eg bisect) between vectors.
     '''
-    return FreehandPoint( self.x() + fraction * (other.x() - self.x()),
-                    self.y() + fraction * (other.y() - self.y())  )
+    return FreehandPoint( self._x + fraction * (other.x() - self._x),
+                    self._y + fraction * (other.y() - self._y)  )
 
 
   def cardinalDirectionLeft90(self, other):
     '''
     Return unit (length doesn't matter?), real, vector 90 degrees counterclockwise from other-self,
-    but clamped to one of eight cardinal direction (n, nw, w, etc) 
+    but clamped to one of eight cardinal direction (n, nw, w, etc)
     '''
-    return FreehandPoint(-sign(other.y()-self.y()), sign(other.x()-self.x()))
-  
-  
-  
\ No newline at end of file
+    return FreehandPoint(-sign(other.y()-self._y), sign(other.x()-self._x))
+
+
@@ -3,43 +3,57 @@ Copyright 2012 Lloyd Konneker
 
 This is free software, covered by the GNU General Public License.
 '''
-try:
-  from PyQt5.QtCore import QLine
-except ImportError:
-  from PySide.QtCore import QLine
 from .pointerPoint import PointerPoint
 
-class PathLine(QLine):
+class PathLine(object):
   '''
   Line defined by two PointerPoint.
-  
-  Thin wrapper of implementation in Qt.
-  
+
+  Plain Python (formerly a thin wrapper of Qt QLine: same API, p1(), p2(), dx(), dy().)
+
   PathLines are int valued.
   PathLines are in device CS (Qt View.)
   '''
-  
+
+  __slots__ = ('_p1', '_p2')
+
   @classmethod
   def nullPathLine(self, point):
-    ''' 
+    '''
     Zero length PathLine at a point.
-    
+
     Sent to CurveGenerator in these cases:
     - initial send
     - forced (flushing) send
     - final (flushing) send
-    
+
     '''
     assert isinstance(point, PointerPoint), str(point)
     return PathLine(point, point)
-  
+
   def __init__(self, point1, point2):
     '''
     No substantive change, just check types.
     '''
     assert isinstance(point1, PointerPoint)
     assert isinstance(point2, PointerPoint)
-    super(PathLine, self).__init__(point1, point2)
-    
+    self._p1 = point1
+    self._p2 = point2
+
+  def __repr__(self):
+    return "PathLine(" + repr(self._p1) + ", " + repr(self._p2) + ")"
+
+  def p1(self):
+    return self._p1
+
+  def p2(self):
+    return self._p2
+
+  def dx(self):
+    return self._p2.x() - self._p1.x()
+
+  def dy(self):
+    return self._p2.y() - self._p1.y()
+
   def isNullPathLine(self):
-    return self.dx() == 0 and self.dy() == 0
\ No newline at end of file
+    return self.dx() == 0 and self.dy() == 0
@@ -3,32 +3,63 @@ Copyright 2012 Lloyd Konneker
 
 This is free software, covered by the GNU General Public License.
 '''
-try:
-  from PyQt5.QtCore import QPoint
-except ImportError:
-  from PySide.QtCore import QPoint
 
 
 
-class PointerPoint(QPoint):
+class PointerPoint(object):
   '''
   Integer valued point.
-  
-  Thin wrapper of implementation in Qt.
-  
+
+  Plain Python, so that the tracing pipeline does not depend on a GUI toolkit.
+  (Formerly a thin wrapper of Qt QPoint: same API, x() and y() methods.)
+
   In device CS (Qt View.)
-  
+
+  Treat as immutable: arithmetic returns new instances.
+
   !!! Note we are actually using vector interpretation of point (having a direction) especially the crossProduct()
   '''
-  
+
+  __slots__ = ('_x', '_y')
+
+  def __init__(self, x=0, y=0):
+    self._x = x
+    self._y = y
+
+  def x(self):
+    return self._x
+
+  def y(self):
+    return self._y
+
+
+  def __eq__(self, other):
+    return self._x == other.x() and self._y == other.y()
+
+  def __ne__(self, other):
+    return not self.__eq__(other)
+
+  def __hash__(self):
+    return hash((self._x, self._y))
+
+  def __add__(self, other):
+    return PointerPoint(self._x + other.x(), self._y + other.y())
+
+  def __sub__(self, other):
+    return PointerPoint(self._x - other.x(), self._y - other.y())
+
+  def __repr__(self):
+    return "PointerPoint(" + str(self._x) + ", " + str(self._y) + ")"
+
+
   def crossProduct(self, other):
-    ''' 
-    vector cross product. QPoint does not define. 
-    
+    '''
+    vector cross product.
+
     Assert result is integer, with no loss of precision.
     '''
-    return self.x()*other.y() - self.y()*other.x()
-  
+    return self._x*other.y() - self._y*other.x()
+
 
   def __copy__(self):
-    return PointerPoint(self.x(), self.y())
\ No newline at end of file
+    return PointerPoint(self._x, self._y)
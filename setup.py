@@ -9,6 +9,7 @@ setup(name='freehandTool',
       author_email='bootch@nc.rr.com',
       url='https://github.com/bootchk/freehandTool',
       packages=['freehandTool',
+                'freehandTool.core',
                 'freehandTool.generator',
                 'freehandTool.generator.turnDetector',
                 'freehandTool.generator.utils',